@@ -0,0 +1,128 @@
+""" Fixtures of the pytest-benchmark suite, run against mongomock with synthetic documents.
+
+    python -m pytest benchmarks [--benchmark-json=results.json]
+
+Besides the timings, each benchmark records the Mongo commands and the peak
+memory (tracemalloc) of one extra run in its extra_info
+"""
+
+import tracemalloc
+
+from functools import wraps
+
+import pytest
+
+from mongoengine import connect, disconnect
+from mongomock.collection import Collection
+
+from graphene_mongoengine.tests.models import Crontab, Interval, Owner, PeriodicTask, Tag
+
+TASK_COUNT = 1000
+OWNER_COUNT = 20
+TAG_COUNT = 20
+
+COUNTED_METHODS = ('find', 'find_one', 'aggregate', 'count_documents', 'estimated_document_count')
+
+measurements = []
+
+
+@pytest.fixture(scope='session', autouse=True)
+def mongomock_connection():
+    connect('graphene-mongoengine-benchmark', host='mongomock://localhost')
+    yield
+    disconnect()
+
+
+@pytest.fixture(scope='session')
+def periodic_tasks(mongomock_connection):
+    """ Stores TASK_COUNT periodic tasks with an owner, watchers and tags each """
+    for document in (Owner, Tag, PeriodicTask):
+        document.drop_collection()
+
+    owners = [Owner(name=f'owner-{index}', email=f'owner-{index}@example.com').save() for index in range(OWNER_COUNT)]
+    tags = [Tag(label=f'tag-{index}').save() for index in range(TAG_COUNT)]
+
+    PeriodicTask.objects.insert([
+        PeriodicTask(
+            name=f'task-{index:05}', task='tasks.run', description='Benchmark task',
+            enabled=index % 2 == 0, total_run_count=index % 50, max_run_count=index,
+            interval=Interval(every=index, period='seconds') if index % 2 else None,
+            crontab=Crontab(minute=str(index % 60)) if not index % 2 else None,
+            args=[index], kwargs={'index': index},
+            owner=owners[index % OWNER_COUNT],
+            watchers=[owners[(index + offset) % OWNER_COUNT] for offset in range(3)],
+            tags=[tags[(index + offset) % TAG_COUNT] for offset in range(4)],
+        )
+        for index in range(TASK_COUNT)
+    ], load_bulk=False)
+
+    yield list(PeriodicTask.objects.order_by('pk'))
+
+    for document in (Owner, Tag, PeriodicTask):
+        document.drop_collection()
+
+
+@pytest.fixture(scope='session')
+def mongo_commands():
+    """ Counts the collection reads, calls made by mongomock itself are not counted """
+    commands = []
+    depth = [0]
+
+    def counting(name, method):
+        @wraps(method)
+        def counted(*args, **kwargs):
+            if not depth[0]:
+                commands.append(name)
+            depth[0] += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return counted
+
+    originals = {name: getattr(Collection, name) for name in COUNTED_METHODS}
+    for name, method in originals.items():
+        setattr(Collection, name, counting(name, method))
+
+    yield commands
+
+    for name, method in originals.items():
+        setattr(Collection, name, method)
+
+
+@pytest.fixture
+def measure(benchmark, mongo_commands):
+    """ Benchmarks a function, then runs it once more recording its
+    Mongo commands and its peak memory
+    """
+
+    def measure(function, *args, **kwargs):
+        result = benchmark(function, *args, **kwargs)
+
+        del mongo_commands[:]
+        tracemalloc.start()
+        try:
+            function(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        benchmark.extra_info['mongo_commands'] = len(mongo_commands)
+        benchmark.extra_info['peak_memory_kb'] = round(peak / 1024, 1)
+        measurements.append((benchmark.name, benchmark.extra_info))
+        return result
+
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not measurements:
+        return
+
+    terminalreporter.section('mongo commands and peak memory')
+    width = max(len(name) for name, _ in measurements)
+    terminalreporter.write_line(f'{"":{width}} {"commands":>9} {"peak KiB":>10}')
+    for name, extra_info in measurements:
+        terminalreporter.write_line(
+            f'{name:{width}} {extra_info["mongo_commands"]:9} {extra_info["peak_memory_kb"]:10.1f}'
+        )
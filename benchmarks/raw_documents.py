@@ -0,0 +1,72 @@
+""" Times a list query of the test schema against Document and as_pymongo (raw) nodes.
+
+    python benchmarks/raw_documents.py [document count] [repeats]
+"""
+
+import gc
+import sys
+import time
+
+from mongoengine import connect, disconnect
+
+from graphene_mongoengine.tests.models import Interval, PeriodicTask
+from graphene_mongoengine.tests.types import schema
+
+QUERY = '''
+{
+    %s(first: %d) {
+        edges { node {
+            name task description enabled totalRunCount maxRunCount
+            queue routingKey args kwargs
+            interval { every period }
+        } }
+    }
+}
+'''
+
+
+def create_tasks(count):
+    """ Stores count periodic tasks """
+    PeriodicTask.objects.insert([
+        PeriodicTask(
+            name=f'task-{index:05}', task='tasks.run', description='Benchmark task',
+            enabled=index % 2 == 0, total_run_count=index, max_run_count=count,
+            queue='default', routing_key='tasks', args=[index, 'arg'], kwargs={'index': index},
+            interval=Interval(every=index, period='seconds'),
+        )
+        for index in range(count)
+    ], load_bulk=False)
+
+
+def time_query(field_name, count, repeats):
+    """ Returns the best time of running the query for field_name repeats times """
+    query = QUERY % (field_name, count)
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        result = schema.execute(query, context_value={})
+        times.append(time.perf_counter() - start)
+        assert not result.errors, result.errors
+        assert len(result.data[field_name]['edges']) == count
+    return min(times)
+
+
+def main(count=500, repeats=5):
+    connect('graphene-mongoengine-benchmark', host='mongomock://localhost', alias='default')
+    try:
+        create_tasks(count)
+
+        print(f'{count} documents, best of {repeats}')
+        results = {}
+        for field_name in ('periodicTasks', 'rawPeriodicTasks'):
+            results[field_name] = time_query(field_name, count, repeats)
+            print(f'{field_name:20} {results[field_name]:7.3f}s')
+
+        print(f'raw speedup: {results["periodicTasks"] / results["rawPeriodicTasks"]:.2f}x')
+    finally:
+        disconnect()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,104 @@
+""" Times building a schema with many MongoEngineObjectTypes,
+with and without the field conversion cache.
+
+    python benchmarks/schema_build.py [document count] [variants per document]
+"""
+
+import gc
+import sys
+import time
+
+from graphene import Field, ObjectType, Schema
+
+from mongoengine import Document, EmbeddedDocument, fields
+
+from graphene_mongoengine import MongoEngineObjectType
+from graphene_mongoengine.converter import clear_conversion_cache
+from graphene_mongoengine.registry import Registry
+
+
+def create_documents(count):
+    """ Creates count synthetic Document classes with an embedded document each """
+    documents = []
+    for index in range(count):
+        embedded = type(f'Embedded{index}', (EmbeddedDocument,), {
+            'every': fields.IntField(),
+            'period': fields.StringField(),
+            'labels': fields.ListField(fields.StringField()),
+        })
+        attrs = {
+            'meta': {'collection': f'document_{index}'},
+            'embedded': fields.EmbeddedDocumentField(embedded),
+            'embedded_list': fields.ListField(fields.EmbeddedDocumentField(embedded)),
+            'scores': fields.ListField(fields.ListField(fields.IntField())),
+            'payload': fields.DictField(),
+        }
+        for field_index in range(5):
+            attrs[f'name_{field_index}'] = fields.StringField(description='Name')
+            attrs[f'count_{field_index}'] = fields.IntField(description='Count')
+            attrs[f'date_{field_index}'] = fields.DateTimeField(description='Date')
+            attrs[f'flag_{field_index}'] = fields.BooleanField(description='Flag')
+        documents.append((type(f'Document{index}', (Document,), attrs), embedded))
+    return documents
+
+
+def create_types(documents, variants, cached):
+    """ Creates the object types for documents, variants extra types per document """
+    registry = Registry()
+    query_fields = {}
+
+    def create_type(name, document, **meta):
+        if not cached:
+            clear_conversion_cache()
+        meta = dict(meta, document=document, registry=registry)
+        return type(name, (MongoEngineObjectType,), {'Meta': type('Meta', (), meta)})
+
+    for index, (document, embedded) in enumerate(documents):
+        create_type(f'Embedded{index}Type', embedded)
+        query_fields[f'document_{index}'] = Field(create_type(f'Document{index}Type', document))
+        for variant in range(variants):
+            exclude_fields = tuple(f'name_{field_index}' for field_index in range(variant + 1))
+            variant_type = create_type(
+                f'Document{index}Variant{variant}Type', document,
+                exclude_fields=exclude_fields, skip_registry=True,
+            )
+            query_fields[f'document_{index}_variant_{variant}'] = Field(variant_type)
+
+    return type('Query', (ObjectType,), query_fields)
+
+
+def time_build(documents, variants, cached, repeat=5):
+    """ Returns the best (types, schema) build times out of repeat runs """
+    timings = []
+    for _ in range(repeat):
+        clear_conversion_cache()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            query = create_types(documents, variants, cached)
+            types_built = time.perf_counter()
+            Schema(query=query)
+            timings.append((types_built - start, time.perf_counter() - types_built))
+        finally:
+            gc.enable()
+    return min(timings, key=sum)
+
+
+def main(document_count=200, variants=4):
+    documents = create_documents(document_count)
+
+    print(f'{document_count} documents, {variants + 1} types per document')
+    print(f'{"":20} {"types":>8} {"schema":>8} {"total":>8}')
+
+    results = {}
+    for cached in (False, True):
+        types_time, schema_time = results[cached] = time_build(documents, variants, cached)
+        label = 'cached conversion' if cached else 'uncached conversion'
+        print(f'{label:20} {types_time:7.3f}s {schema_time:7.3f}s {types_time + schema_time:7.3f}s')
+
+    print(f'type construction speedup: {results[False][0] / results[True][0]:.2f}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
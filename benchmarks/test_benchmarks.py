@@ -0,0 +1,129 @@
+""" Benchmarks of schema construction, connection paging, node lookups and reference fan-out """
+
+import pytest
+
+from graphql_relay import to_global_id
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+
+from schema_build import create_documents, create_types
+
+from graphene import Schema
+
+from graphene_mongoengine.converter import clear_conversion_cache
+from graphene_mongoengine.streaming import iter_ndjson
+from graphene_mongoengine.tests.types import PeriodicTaskType, schema
+
+
+def execute(query, **variables):
+    result = schema.execute(query, variable_values=variables, context_value={})
+    assert not result.errors, result.errors
+    return result.data
+
+
+@pytest.mark.parametrize('document_count', [10, 50])
+def test_schema_build(measure, document_count):
+    documents = create_documents(document_count)
+
+    def build():
+        clear_conversion_cache()
+        return Schema(query=create_types(documents, variants=1, cached=True))
+
+    measure(build)
+
+
+PAGE_QUERY = '''
+query Page($first: Int, $after: String) {
+    %s(first: $first, after: $after) {
+        edges { cursor node { name task enabled totalRunCount interval { every period } } }
+        pageInfo { hasNextPage }
+    }
+}
+'''
+
+
+@pytest.mark.parametrize('size', [10, 100])
+@pytest.mark.parametrize('depth', [0, 900])
+@pytest.mark.parametrize('field_name', ['periodicTasks', 'lazyPeriodicTasks', 'keysetPeriodicTasks'])
+def test_connection_page(measure, periodic_tasks, field_name, depth, size):
+    after = None
+    if depth and field_name.startswith('keyset'):
+        after = execute(PAGE_QUERY % field_name, first=depth)[field_name]['edges'][-1]['cursor']
+    elif depth:
+        after = offset_to_cursor(depth - 1)
+
+    data = measure(execute, PAGE_QUERY % field_name, first=size, after=after)
+
+    nodes = [edge['node'] for edge in data[field_name]['edges']]
+    assert nodes[0]['name'] == f'task-{depth:05}'
+    assert len(nodes) == size
+
+
+NODE_QUERY = '''
+query Node($id: ID!) {
+    node(id: $id) { ... on PeriodicTaskType { name owner { name } } }
+}
+'''
+
+NODES_QUERY = '''
+query Nodes($ids: [ID!]!) {
+    nodes(ids: $ids) { ... on PeriodicTaskType { name owner { name } } }
+}
+'''
+
+
+def test_node_lookup(measure, periodic_tasks):
+    node_id = to_global_id('PeriodicTaskType', str(periodic_tasks[500].pk))
+
+    data = measure(execute, NODE_QUERY, id=node_id)
+
+    assert data['node']['name'] == 'task-00500'
+
+
+@pytest.mark.parametrize('count', [10, 100])
+def test_nodes_lookup(measure, periodic_tasks, count):
+    ids = [to_global_id('PeriodicTaskType', str(task.pk)) for task in periodic_tasks[::-1][:count]]
+
+    data = measure(execute, NODES_QUERY, ids=ids)
+
+    assert len(data['nodes']) == count
+
+
+FAN_OUT_QUERY = '''
+query FanOut($first: Int) {
+    %s(first: $first) {
+        edges { node {
+            name
+            owner { name email }
+            watchers { edges { node { name } } }
+            tags { label }
+        } }
+    }
+}
+'''
+
+
+@pytest.mark.parametrize('size', [10, 100])
+@pytest.mark.parametrize('field_name', ['periodicTasks', 'aggregatedPeriodicTasks'])
+def test_reference_fan_out(measure, periodic_tasks, field_name, size):
+    data = measure(execute, FAN_OUT_QUERY % field_name, first=size)
+
+    nodes = [edge['node'] for edge in data[field_name]['edges']]
+    assert len(nodes) == size
+    assert all(node['owner'] and len(node['watchers']['edges']) == 3 and len(node['tags']) == 4 for node in nodes)
+
+
+EXPORT_QUERY = '{ %s { edges { node { name task enabled kwargs interval { every period } } } } }'
+
+
+@pytest.mark.parametrize('field_name', ['periodicTasks', 'streamedPeriodicTasks'])
+def test_whole_collection_connection(measure, periodic_tasks, field_name):
+    data = measure(execute, EXPORT_QUERY % field_name)
+
+    assert len(data[field_name]['edges']) == len(periodic_tasks)
+
+
+def test_ndjson_export(measure, periodic_tasks):
+    def export():
+        return sum(1 for _ in iter_ndjson(PeriodicTaskType))
+
+    assert measure(export) == len(periodic_tasks)
@@ -4,10 +4,39 @@ from .types import (
     MongoEngineObjectType,
 )
 
+from .asynchronous import (
+    LocalAsyncDatabase,
+    MotorBackend,
+)
+
+from .cost import (
+    QueryCostBackend,
+)
+
 from .fields import (
+    MongoEngineConnection,
     MongoEngineConnectionField
 )
 
+from .cache import (
+    ResultCache,
+)
+
+from .instrumentation import (
+    InstrumentationListener,
+    InstrumentationMiddleware,
+    get_request_metrics,
+)
+
+from .parallel import (
+    ParallelExecutor,
+)
+
+from .nodes import (
+    NodeField,
+    NodesField,
+)
+
 from .utils import (
     get_query,
 )
@@ -17,6 +46,17 @@ __version__ = '1.0.0'
 __all__ = (
     '__version__',
     'MongoEngineObjectType',
+    'MongoEngineConnection',
     'MongoEngineConnectionField',
-    'get_query'
+    'InstrumentationListener',
+    'InstrumentationMiddleware',
+    'LocalAsyncDatabase',
+    'MotorBackend',
+    'NodeField',
+    'NodesField',
+    'ParallelExecutor',
+    'QueryCostBackend',
+    'ResultCache',
+    'get_query',
+    'get_request_metrics',
 )
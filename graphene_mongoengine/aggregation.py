@@ -0,0 +1,194 @@
+""" Aggregation pipelines answering a connection and its selected references in one round trip """
+
+from mongoengine import QuerySet
+from mongoengine.fields import CachedReferenceField, LazyReferenceField, ListField, ReferenceField
+
+from .identity import add_identity, get_identity_map
+from .projection import get_field_names, get_projection, get_selection_sets, get_type_names, iter_selected_fields
+from .references import build_document, get_stored_value
+from .resolvers import get_reference_pk, get_stored_field_names, is_stored_selection, STORED_REFERENCE_FIELDS
+from .utils import get_document_fields
+
+# pylint: disable=W0212
+
+LOOKUP_PREFIX = '_lookup_'
+
+
+class ReferenceLookup(object):
+    """ A $lookup stage joining the documents referenced by a document field """
+
+    def __init__(self, name, field, document, local_field, many=False):
+        self.name = name
+        self.field = field
+        self.document = document
+        self.local_field = local_field
+        self.many = many
+
+    @property
+    def alias(self):
+        """ Returns the field the referenced documents are joined into """
+        return f'{LOOKUP_PREFIX}{self.name}'
+
+    @property
+    def stage(self):
+        """ Returns the $lookup pipeline stage """
+        return {'$lookup': {
+            'from': self.document._get_collection_name(),
+            'localField': self.local_field,
+            'foreignField': '_id',
+            'as': self.alias,
+        }}
+
+    def hydrate(self, instance, joined, identity_map):
+        """ Sets the joined documents as the instance reference values, so they
+        are resolved without querying again. Missing documents resolve to None
+        """
+        references = {}
+        for son in joined:
+            document = self.document._from_son(son)
+            references[document.pk] = add_identity(identity_map, self.document, document)
+
+        value = get_stored_value(instance, self.name)
+        if value is None:
+            return
+
+        if self.many:
+            instance._data[self.name] = [references.get(get_reference_pk(item)) for item in value]
+        else:
+            instance._data[self.name] = references.get(get_reference_pk(value))
+
+
+def get_reference_lookup(name, field):
+    """ Returns the :ReferenceLookup: for a document field,
+    None when its references can not be joined with $lookup
+    """
+    db_field = field.db_field
+    many = isinstance(field, ListField)
+    if many:
+        field = field.field
+
+    # DBRef and generic references are not joinable on _id
+    if isinstance(field, (ReferenceField, LazyReferenceField)) and not field.dbref:
+        return ReferenceLookup(name, field, field.document_type, db_field, many)
+    if isinstance(field, CachedReferenceField) and not many:
+        return ReferenceLookup(name, field, field.document_type, f'{db_field}._id')
+    return None
+
+
+def is_stored_lookup(info, object_type, lookup, field_ast):
+    """ Whether the selection of a reference is answered by its stored value,
+    see :get_stored_reference:
+    """
+    if not isinstance(lookup.field, STORED_REFERENCE_FIELDS) or not field_ast.selection_set:
+        return False
+
+    reference_type = object_type._meta.registry.get_type_for_document(lookup.document)
+    if reference_type is None or not reference_type._meta.projection:
+        return False
+
+    projection = get_projection(info, reference_type, [field_ast.selection_set])
+    return is_stored_selection(projection, get_stored_field_names(lookup.field))
+
+
+def get_reference_lookups(info, object_type, path=()):
+    """ Returns the :ReferenceLookup: of the reference fields selected for object_type,
+    fields resolved by custom resolvers are left to them, and so are the
+    references whose selection is answered by their stored value
+    """
+    document_fields = get_document_fields(object_type._meta.document)
+    field_names = get_field_names(info, object_type)
+    type_names = get_type_names(object_type)
+
+    lookups = {}
+    for selection_set in get_selection_sets(info, path):
+        for field_ast in iter_selected_fields(info, selection_set, type_names):
+            name = field_names.get(field_ast.name.value)
+            if name in lookups or name not in document_fields or hasattr(object_type, f'resolve_{name}'):
+                continue
+
+            lookup = get_reference_lookup(name, document_fields[name])
+            if lookup is not None and not is_stored_lookup(info, object_type, lookup, field_ast):
+                lookups[name] = lookup
+
+    return list(lookups.values())
+
+
+class PipelineQuerySet(QuerySet):
+    """ QuerySet fetching its documents with an aggregation pipeline:
+    $match, $sort, $limit and $skip from the QuerySet, then a $lookup for each
+    reference lookup and a $project of the loaded fields. Anything else
+    (counts, slicing, filtering) behaves as in a regular QuerySet
+    """
+
+    def __init__(self, document, collection):
+        super(PipelineQuerySet, self).__init__(document, collection)
+        self._reference_lookups = ()
+        self._identity_map = None
+        self._pipeline_cursor = None
+
+    def _clone_into(self, new_qs):
+        new_qs = super(PipelineQuerySet, self)._clone_into(new_qs)
+        new_qs._reference_lookups = self._reference_lookups
+        new_qs._identity_map = self._identity_map
+        return new_qs
+
+    def get_pipeline(self):
+        """ Returns the stages run after the QuerySet $match, $sort, $limit and $skip """
+        pipeline = [lookup.stage for lookup in self._reference_lookups]
+
+        projection = self._loaded_fields.as_dict() if self._loaded_fields else None
+        if projection:
+            if all(projection.values()):
+                projection.update((lookup.alias, 1) for lookup in self._reference_lookups)
+            pipeline.append({'$project': projection})
+
+        return pipeline
+
+    def get_aggregation_pipeline(self):
+        """ Returns the whole pipeline, with the $match, $sort, $limit and $skip
+        stages QuerySet.aggregate adds in front of :get_pipeline:
+        """
+        pipeline = []
+        if self._query:
+            pipeline.append({'$match': self._query})
+        if self._ordering:
+            pipeline.append({'$sort': dict(self._ordering)})
+        if self._limit is not None:
+            pipeline.append({'$limit': self._limit + (self._skip or 0)})
+        if self._skip is not None:
+            pipeline.append({'$skip': self._skip})
+        return pipeline + self.get_pipeline()
+
+    def build_document(self, son):
+        """ Returns the document for a pipeline result, with its joined references """
+        joined = {lookup: son.pop(lookup.alias, ()) for lookup in self._reference_lookups}
+
+        instance = build_document(self._document, son, self._auto_dereference)
+        for lookup, documents in joined.items():
+            lookup.hydrate(instance, documents, self._identity_map)
+
+        return instance
+
+    def rewind(self):
+        self._pipeline_cursor = None
+        super(PipelineQuerySet, self).rewind()
+
+    def __next__(self):
+        if self._none or self._empty:
+            raise StopIteration
+
+        if self._pipeline_cursor is None:
+            options = {'batchSize': self._batch_size} if self._batch_size else {}
+            self._pipeline_cursor = self.aggregate(self.get_pipeline(), **options)
+
+        return self.build_document(next(self._pipeline_cursor))
+
+
+def get_pipeline_queryset(queryset, info, object_type, path=()):
+    """ Returns queryset as a :PipelineQuerySet: joining the references selected
+    for object_type, so they are fetched along with the documents
+    """
+    pipeline_queryset = queryset._clone_into(PipelineQuerySet(queryset._document, queryset._collection_obj))
+    pipeline_queryset._reference_lookups = tuple(get_reference_lookups(info, object_type, path))
+    pipeline_queryset._identity_map = get_identity_map(info.context)
+    return pipeline_queryset
@@ -0,0 +1,159 @@
+""" Asyncio execution of MongoEngine QuerySets, so independent fields
+resolved under Graphene's AsyncioExecutor run their queries concurrently
+"""
+
+import asyncio
+
+from itertools import islice
+
+from mongoengine.connection import get_db
+
+from .aggregation import PipelineQuerySet
+from .geo import get_count_query
+from .pagination import get_window_queryset
+from .references import build_document
+
+# pylint: disable=W0212
+
+
+class MotorBackend(object):
+    """ Runs QuerySets with an asyncio driver exposing Motor's API,
+    e.g. AsyncIOMotorClient(...)['database'] or a :LocalAsyncDatabase:.
+    The QuerySet filters, ordering, window and projection are sent as
+    they are, documents are built the same way the QuerySet builds them
+    """
+
+    def __init__(self, database):
+        self.database = database
+
+    def get_collection(self, queryset):
+        """ Returns the driver collection of the queryset document """
+        return self.database[queryset._document._get_collection_name()]
+
+    def get_ordering(self, queryset):
+        """ Returns the sort keys of queryset, the document default ordering when not ordered """
+        if queryset._ordering is None and queryset._document._meta['ordering']:
+            return queryset._get_order_by(queryset._document._meta['ordering'])
+        return queryset._ordering or None
+
+    async def fetch(self, queryset):
+        """ Returns the list of documents of queryset """
+        if queryset._none or queryset._empty:
+            return []
+
+        collection = self.get_collection(queryset)
+
+        if isinstance(queryset, PipelineQuerySet):
+            sons = await collection.aggregate(queryset.get_aggregation_pipeline()).to_list(None)
+            return [queryset.build_document(son) for son in sons]
+
+        cursor = collection.find(
+            queryset._query,
+            projection=queryset._loaded_fields.as_dict() or None,
+            sort=self.get_ordering(queryset),
+            skip=queryset._skip or 0,
+            limit=queryset._limit or 0,
+            batch_size=queryset._batch_size or 0,
+        )
+        sons = await cursor.to_list(None)
+
+        if queryset._as_pymongo:
+            return sons
+        return [build_document(queryset._document, son, queryset._auto_dereference) for son in sons]
+
+    async def count(self, queryset, estimated=False):
+        """ Returns the number of documents of queryset, see :count_documents: """
+        if queryset._none or queryset._empty:
+            return 0
+
+        collection = self.get_collection(queryset)
+        if estimated and not queryset._query:
+            return await collection.estimated_document_count()
+        return await collection.count_documents(get_count_query(queryset._query))
+
+
+async def fetch_list_slice(backend, queryset, start_offset, end_offset):
+    """ Async variant of :get_list_slice: for QuerySets """
+    if end_offset is not None and end_offset <= start_offset:
+        return []
+    return await backend.fetch(queryset[start_offset:end_offset])
+
+
+async def fetch_window(backend, queryset, limit):
+    """ Async variant of :fetch_window: """
+    return await backend.fetch(get_window_queryset(queryset, limit))
+
+
+class LocalAsyncCursor(object):
+    """ Cursor of a :LocalAsyncCollection:, evaluated on to_list """
+
+    def __init__(self, database, open_cursor):
+        self.database = database
+        self.open_cursor = open_cursor
+
+    async def to_list(self, length):
+        async with self.database.round_trip():
+            return list(islice(self.open_cursor(), length))
+
+
+class LocalAsyncCollection(object):
+    """ Collection of a :LocalAsyncDatabase: """
+
+    def __init__(self, database, collection):
+        self.database = database
+        self.collection = collection
+
+    def find(self, *args, **kwargs):
+        return LocalAsyncCursor(self.database, lambda: self.collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline, **kwargs):
+        return LocalAsyncCursor(self.database, lambda: self.collection.aggregate(pipeline, **kwargs))
+
+    async def count_documents(self, filter, **kwargs):  # pylint: disable=W0622
+        async with self.database.round_trip():
+            return self.collection.count_documents(filter, **kwargs)
+
+    async def estimated_document_count(self, **kwargs):
+        async with self.database.round_trip():
+            return self.collection.estimated_document_count(**kwargs)
+
+
+class LocalRoundTrip(object):
+    """ A simulated round trip of a :LocalAsyncDatabase: """
+
+    def __init__(self, database):
+        self.database = database
+
+    async def __aenter__(self):
+        database = self.database
+        database.round_trips += 1
+        database.in_flight += 1
+        database.max_in_flight = max(database.max_in_flight, database.in_flight)
+        await asyncio.sleep(database.latency)
+
+    async def __aexit__(self, *exc_info):
+        self.database.in_flight -= 1
+
+
+class LocalAsyncDatabase(object):
+    """ In-process stand-in for a Motor database, for tests and local runs:
+    the queries run on a synchronous (pymongo or mongomock) database, the
+    MongoEngine default one when not given, once a simulated round trip of
+    latency seconds yields to the event loop. Records the round trips made
+    and how many were in flight at once
+    """
+
+    def __init__(self, database=None, latency=0.0):
+        self.database = database
+        self.latency = latency
+        self.round_trips = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def round_trip(self):
+        """ Returns the async context of a simulated round trip """
+        return LocalRoundTrip(self)
+
+    def __getitem__(self, name):
+        database = self.database if self.database is not None else get_db()
+        return LocalAsyncCollection(self, database[name])
@@ -0,0 +1,222 @@
+""" Result cache shared by requests, for connection pages and node lookups.
+Entries of a collection are invalidated when its documents are saved, deleted or
+bulk inserted, through the MongoEngine signals (they need the blinker library)
+"""
+
+import hashlib
+import pickle
+import threading
+import time
+
+from collections import OrderedDict
+
+from mongoengine import signals
+
+# pylint: disable=W0212,C0103
+
+
+class MemoryCacheBackend(object):
+    """ In-process cache backend, holding up to max_size entries in least
+    recently used order, each one expiring ttl seconds after it is set.
+    Cached values are shared by the requests, they must not be modified
+    """
+
+    def __init__(self, max_size=1024, ttl=60, timer=time.monotonic):
+        assert max_size > 0, 'The cache max_size must be positive'
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """ Returns the value cached under key, None if it is missing or expired """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= self.timer():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """ Caches value under key, evicting the least recently used entries past max_size """
+        expires_at = self.timer() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key):
+        """ Returns the value of a counter, counters are never evicted """
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        """ Increments a counter and returns its new value """
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        """ Removes all the entries """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedCacheBackend(MemoryCacheBackend):
+    """ Local stand-in for a cache shared by processes (memcached, Redis).
+    Values are stored pickled, so each read returns a copy of the cached
+    documents as a network store would
+    """
+
+    def get(self, key):
+        value = super(SharedCacheBackend, self).get(key)
+        return None if value is None else pickle.loads(value)
+
+    def set(self, key, value):
+        super(SharedCacheBackend, self).set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+INVALIDATING_SIGNALS = ('post_save', 'post_delete', 'post_bulk_insert')
+
+
+def normalize_key_part(value):
+    """ Returns value with dicts as sorted item tuples and lists as tuples,
+    so equal queries have the same representation
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), normalize_key_part(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_key_part(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(normalize_key_part(item)) for item in value))
+    return value
+
+
+class ResultCache(object):
+    """ Caches the results of connection fields and node lookups, keyed on the
+    document collection, the query filter, the projection and the page window.
+    Hits and misses are counted for tuning the size and ttl.
+    With the default :MemoryCacheBackend:, every request hitting an entry gets
+    the same document instances: cached documents are read-only, resolvers must
+    not modify them. :SharedCacheBackend: returns a copy on each read instead
+    """
+
+    def __init__(self, backend=None, max_size=1024, ttl=60):
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_size, ttl)
+        self.hits = 0
+        self.misses = 0
+        # Requests share the cache across threads, see ParallelExecutor
+        self._stats_lock = threading.Lock()
+
+        assert signals.signals_available, 'The result cache needs the blinker library to be invalidated'
+        for name in INVALIDATING_SIGNALS:
+            getattr(signals, name).connect(self.on_documents_changed)
+
+    def disconnect(self):
+        """ Stops invalidating the cache entries on document changes """
+        for name in INVALIDATING_SIGNALS:
+            getattr(signals, name).disconnect(self.on_documents_changed)
+
+    def on_documents_changed(self, sender, **kwargs):
+        """ Signal receiver invalidating the entries of the sender document """
+        self.invalidate(sender)
+
+    @staticmethod
+    def get_generation_key(document):
+        """ Returns the counter bumped when the documents of a collection change """
+        return f'generation:{document._get_collection_name()}'
+
+    def invalidate(self, document):
+        """ Invalidates the entries of the collection of document, and of the
+        documents sharing it through inheritance
+        """
+        self.backend.incr(self.get_generation_key(document))
+
+    def get_key(self, kind, documents, *parts):
+        """ Returns the key of an entry depending on the collections of documents,
+        the first one gives its name. Invalidated entries are left to expire, keys
+        include the collection generations
+        """
+        generations = tuple(self.backend.get_counter(self.get_generation_key(document)) for document in documents)
+        digest = hashlib.sha1(repr((generations, normalize_key_part(parts))).encode()).hexdigest()
+        return f'{kind}:{documents[0]._get_collection_name()}:{digest}'
+
+    def get(self, key):
+        """ Returns the value cached under key, None on a miss """
+        value = self.backend.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """ Caches value under key """
+        self.backend.set(key, value)
+
+    def get_or_set(self, key, create):
+        """ Returns the value cached under key, calling create and caching its result on a miss """
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.set(key, value)
+        return value
+
+    @property
+    def stats(self):
+        """ Returns the hit and miss counts, along with the hit rate """
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self):
+        """ Resets the hit and miss counts """
+        with self._stats_lock:
+            self.hits = self.misses = 0
+
+    def clear(self):
+        """ Removes all the entries """
+        self.backend.clear()
+
+
+__default_result_cache = None
+
+
+def get_result_cache(cache):
+    """ Returns the :ResultCache: a cache option refers to: a ResultCache,
+    True for the default in-process cache, or None when caching is off
+    """
+    global __default_result_cache  # pylint: disable=W0603
+
+    if cache is True:
+        if __default_result_cache is None:
+            __default_result_cache = ResultCache()
+        return __default_result_cache
+    return cache or None
+
+
+class CachedPage(object):
+    """ A connection page stored in the result cache """
+
+    def __init__(self, nodes, cursors, has_previous_page, has_next_page):
+        self.nodes = nodes
+        self.cursors = cursors
+        self.has_previous_page = has_previous_page
+        self.has_next_page = has_next_page
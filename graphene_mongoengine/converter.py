@@ -4,12 +4,14 @@ from singledispatch import singledispatch
 
 from graphene import (
     String, Boolean, Int, Float, List,
-    ID, Dynamic, Field
+    ID, Dynamic, Field, Union
 )
 
 from graphene.types.json import JSONString
+from graphene.types.utils import get_field_as
 from graphene.types.datetime import DateTime
 
+from mongoengine.document import EmbeddedDocument
 from mongoengine.fields import (
     ObjectIdField,
     BooleanField, StringField, IntField, LongField, FloatField, DecimalField,
@@ -28,17 +30,51 @@ from mongoengine.fields import (
 )
 
 from .fields import create_connection_field
+from .geo import get_geo_type
 
 from .utils import (
-    get_field_description, field_is_document_list, field_is_required
+    get_field_description, field_is_document_list, field_is_generic_list, field_is_required
 )
 
-# pylint: disable=W0622
+# pylint: disable=W0622,C0103
+
+
+__conversion_cache = {}
 
 
 def convert_mongoengine_field(field, registry=None):
-    """ Wrapper method for :convert_mongoengine_type: """
-    return convert_mongoengine_type(field, registry)
+    """ Wrapper method for :convert_mongoengine_type:.
+    Conversions are memoized by field identity and registry, see :clear_conversion_cache:
+    """
+    registry_cache = __conversion_cache.setdefault(registry, {})
+    try:
+        return registry_cache[field]
+    except KeyError:
+        converted = registry_cache[field] = convert_mongoengine_type(field, registry)
+        return converted
+
+
+def convert_mongoengine_field_as(field, registry=None, _as=Field):
+    """ Returns :convert_mongoengine_field: result mounted as _as,
+    mounted fields are memoized along with the conversion
+    """
+    registry_cache = __conversion_cache.setdefault(registry, {})
+    key = (field, _as)
+    try:
+        return registry_cache[key]
+    except KeyError:
+        mounted = registry_cache[key] = get_field_as(convert_mongoengine_field(field, registry), _as)
+        return mounted
+
+
+def clear_conversion_cache(registry=None):
+    """ Clears memoized conversions made with registry, or all of them
+    if no registry is given. Needed when fields are modified after conversion
+    """
+    if registry is None:
+        __conversion_cache.clear()
+    else:
+        __conversion_cache.pop(registry, None)
 
 
 def get_data_from_field(field, **kwargs):
@@ -102,6 +138,11 @@ def convert_field_to_float(field, registry=None):
 @convert_mongoengine_type.register(DynamicField)
 @convert_mongoengine_type.register(DictField)
 @convert_mongoengine_type.register(MapField)
+def convert_field_to_jsonstring(field, registry=None):
+    """ Converts Mongoengine fields to Graphene JSONString type """
+    return JSONString(**get_data_from_field(field))
+
+
 @convert_mongoengine_type.register(GeoPointField)
 @convert_mongoengine_type.register(PolygonField)
 @convert_mongoengine_type.register(PointField)
@@ -109,20 +150,67 @@ def convert_field_to_float(field, registry=None):
 @convert_mongoengine_type.register(MultiPointField)
 @convert_mongoengine_type.register(MultiLineStringField)
 @convert_mongoengine_type.register(MultiPolygonField)
-def convert_field_to_jsonstring(field, registry=None):
-    """ Converts Mongoengine fields to Graphene JSONString type """
-    return JSONString(**get_data_from_field(field))
+def convert_field_to_geojson(field, registry=None):
+    """ Converts Mongoengine geo fields to their Graphene GeoJSON type """
+    return Field(get_geo_type(field), **get_data_from_field(field))
+
+
+def get_generic_types(field, registry):
+    """ Returns the types registered for the documents a generic field can hold,
+    restricted to the field choices when given
+    """
+    embedded = isinstance(field, GenericEmbeddedDocumentField)
+    choices = {
+        choice if isinstance(choice, str) else choice._class_name
+        for choice in field.choices or ()
+    }
+
+    return sorted(
+        (
+            object_type for object_type in registry.get_types()
+            if issubclass(object_type._meta.document, EmbeddedDocument) == embedded
+            and (not choices or object_type._meta.document._class_name in choices)
+        ),
+        key=lambda object_type: object_type._meta.name
+    )
+
+
+def get_union_type(types, registry=None):
+    """ Returns the Union of types, memoized along with the conversions made with registry """
+    registry_cache = __conversion_cache.setdefault(registry, {})
+    key = (Union, frozenset(types))
+    try:
+        return registry_cache[key]
+    except KeyError:
+        name = ''.join(object_type._meta.name for object_type in types) + 'Union'
+        union = registry_cache[key] = Union.create_type(name, types=tuple(types))
+        return union
+
+
+def get_generic_type(field, registry=None):
+    """ Returns the Union of the types a generic field can hold,
+    JSONString when none is registered
+    """
+    types = get_generic_types(field, registry)
+    if not types:
+        return JSONString
+    return get_union_type(types, registry)
 
 
 @convert_mongoengine_type.register(GenericEmbeddedDocumentField)
 @convert_mongoengine_type.register(GenericLazyReferenceField)
 @convert_mongoengine_type.register(GenericReferenceField)
-def convert_field_to_jsonstring(field, registry=None):
-    """ Converts Mongoengine fields to Graphene JSONString type.
-    Generic fields can have any document type, so the best that can be done is
-    to convert them to JSONString
+def convert_field_to_union(field, registry=None):
+    """ Converts Mongoengine generic fields to a Graphene Union of the types
+    registered for the documents they can hold, see :get_generic_type:
     """
-    return JSONString(**get_data_from_field(field))
+    field_data = get_data_from_field(field)
+
+    def type_factory():
+        """ Lazy type factory """
+        return Field(get_generic_type(field, registry), **field_data)
+
+    return Dynamic(type_factory)
 
 
 @convert_mongoengine_type.register(ReferenceField)
@@ -150,11 +238,22 @@ def convert_field_to_list(list_field, registry=None):
 
     if field_is_document_list(list_field):
         return convert_document_list(list_field, registry)
+    elif field_is_generic_list(list_field):
+        return convert_generic_list(list_field, registry)
     else:
-        if list_field.field is None:
+        inner_field = list_field.field
+        if inner_field is None:
             inner_type = String
         else:
-            inner_type = convert_mongoengine_field(list_field.field(), registry).__class__
+            if isinstance(inner_field, type):
+                inner_field = inner_field()
+            inner_type = convert_mongoengine_field(inner_field, registry)
+            # Nested lists keep their inner type, GeoJSON fields their object
+            # type, other types are used unmounted
+            if isinstance(inner_type, Field):
+                inner_type = inner_type.type
+            elif not isinstance(inner_type, List):
+                inner_type = inner_type.__class__
 
         return List(inner_type,  **get_data_from_field(list_field))
 
@@ -178,3 +277,16 @@ def convert_document_list(list_field, registry=None):
         return Field(List(doc_type), **field_data)
 
     return Dynamic(type_factory)
+
+
+def convert_generic_list(list_field, registry=None):
+    """ Converts a MongoEngine List based field wrapping a generic
+    field to a Graphene List of its :get_generic_type:
+    """
+    field_data = get_data_from_field(list_field)
+
+    def type_factory():
+        """ Lazy type factory """
+        return Field(List(get_generic_type(list_field.field, registry)), **field_data)
+
+    return Dynamic(type_factory)
@@ -0,0 +1,210 @@
+""" Query cost analysis, rejecting queries that could materialize too many documents
+before they are executed
+"""
+
+from functools import partial
+
+from graphene.utils.str_converters import to_camel_case
+
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.language import ast
+from graphql.type.definition import GraphQLList, GraphQLNonNull, get_named_type, is_composite_type
+
+# pylint: disable=W0212,C0103
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_LIST_SIZE = 10
+
+
+__graphene_fields = {}
+
+
+def get_graphene_field(schema, parent_type, field_name):
+    """ Returns the graphene Field of parent_type exposed as field_name,
+    None for fields not defined with graphene. Memoized
+    """
+    key = (parent_type, field_name)
+    if key not in __graphene_fields:
+        graphene_type = getattr(parent_type, 'graphene_type', None)
+        graphene_fields = getattr(getattr(graphene_type, '_meta', None), 'fields', None) or {}
+        auto_camelcase = getattr(schema, 'auto_camelcase', True)
+
+        __graphene_fields[key] = next((
+            field for name, field in graphene_fields.items()
+            if (getattr(field, 'name', None) or (to_camel_case(name) if auto_camelcase else name)) == field_name
+        ), None)
+
+    return __graphene_fields[key]
+
+
+def is_list_type(field_type):
+    """ Whether field_type is a (possibly non null) list """
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
+
+
+def get_page_size(options, args, default_page_size):
+    """ Returns the number of nodes a connection field returns at most for its arguments """
+    sizes = [args[name] for name in ('first', 'last') if isinstance(args.get(name), int)]
+    page_size = min(sizes) if sizes else None
+
+    if options.max_limit:
+        page_size = options.max_limit if page_size is None else min(page_size, options.max_limit)
+
+    return max(page_size if page_size is not None else default_page_size, 0)
+
+
+class QueryCost(object):
+    """ Walks the selections of an operation, counting the objects it can return.
+    Connection fields return their page size, lists of objects list_size items,
+    and the counts of nested fields are multiplied by them
+    """
+
+    def __init__(self, schema, fragments, variables, default_page_size=DEFAULT_PAGE_SIZE,
+                 list_size=DEFAULT_LIST_SIZE):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self.default_page_size = default_page_size
+        self.list_size = list_size
+
+    def iter_fields(self, parent_type, selection_set, visited=()):
+        """ Yields the (parent type, field ast) of a selection set, through fragments """
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                yield parent_type, selection
+                continue
+
+            if isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                visited += (name,)
+            else:
+                fragment = selection
+
+            fragment_type = parent_type
+            if fragment.type_condition is not None:
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value) or parent_type
+            yield from self.iter_fields(fragment_type, fragment.selection_set, visited)
+
+    def get_selection_cost(self, parent_type, selection_set, multiplier=1):
+        """ Returns the cost of a selection set of parent_type, selected multiplier times """
+        cost = 0
+        for field_parent_type, field_ast in self.iter_fields(parent_type, selection_set):
+            field_def = getattr(field_parent_type, 'fields', {}).get(field_ast.name.value)
+            if field_def is not None:
+                cost += self.get_field_cost(field_parent_type, field_def, field_ast, multiplier)
+        return cost
+
+    def get_field_cost(self, parent_type, field_def, field_ast, multiplier):
+        """ Returns the cost of a field selected multiplier times """
+        from .fields import MongoEngineConnectionField
+
+        field_type = get_named_type(field_def.type)
+        if not is_composite_type(field_type) or field_ast.selection_set is None:
+            return 0
+
+        graphene_field = get_graphene_field(self.schema, parent_type, field_ast.name.value)
+        if isinstance(graphene_field, MongoEngineConnectionField):
+            try:
+                args = get_argument_values(field_def.args, field_ast.arguments, self.variables)
+            except GraphQLError:
+                args = {}
+            count = multiplier * get_page_size(graphene_field.options, args, self.default_page_size)
+            return count + self.get_connection_cost(field_type, field_ast.selection_set, count)
+
+        count = multiplier * (self.list_size if is_list_type(field_def.type) else 1)
+        return count + self.get_selection_cost(field_type, field_ast.selection_set, count)
+
+    def get_connection_cost(self, connection_type, selection_set, count):
+        """ Returns the cost of the edges.node selections of a connection, selected count times """
+        cost = 0
+        for _, edges_ast in self.iter_fields(connection_type, selection_set):
+            if edges_ast.name.value != 'edges' or edges_ast.selection_set is None:
+                continue
+            edge_type = get_named_type(connection_type.fields['edges'].type)
+            for _, node_ast in self.iter_fields(edge_type, edges_ast.selection_set):
+                if node_ast.name.value == 'node' and node_ast.selection_set is not None:
+                    node_type = get_named_type(edge_type.fields['node'].type)
+                    cost += self.get_selection_cost(node_type, node_ast.selection_set, count)
+        return cost
+
+
+def get_operation(document_ast, operation_name=None):
+    """ Returns the operation of document_ast executed for operation_name, None if there is none """
+    operations = [
+        definition for definition in document_ast.definitions
+        if isinstance(definition, ast.OperationDefinition)
+    ]
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+    return next((
+        operation for operation in operations
+        if operation.name and operation.name.value == operation_name
+    ), None)
+
+
+def get_query_cost(schema, document_ast, variable_values=None, operation_name=None, **kwargs):
+    """ Returns the number of objects an operation can return, None when the
+    operation can not be found or its variables are invalid
+    """
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return None
+
+    root_type = {
+        'query': schema.get_query_type,
+        'mutation': schema.get_mutation_type,
+        'subscription': schema.get_subscription_type,
+    }[operation.operation]()
+    if root_type is None:
+        return None
+
+    try:
+        variables = get_variable_values(schema, operation.variable_definitions or [], variable_values or {})
+    except GraphQLError:
+        return None
+
+    fragments = {
+        definition.name.value: definition for definition in document_ast.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    }
+    return QueryCost(schema, fragments, variables, **kwargs).get_selection_cost(root_type, operation.selection_set)
+
+
+def execute_with_max_cost(execute, schema, document_ast, max_cost, cost_options, *args, **kwargs):
+    """ Executes the document unless its cost is above max_cost """
+    cost = get_query_cost(
+        schema, document_ast, kwargs.get('variable_values'), kwargs.get('operation_name'), **cost_options
+    )
+    if cost is not None and cost > max_cost:
+        return ExecutionResult(errors=[
+            GraphQLError(f'Query cost {cost} exceeds the maximum cost of {max_cost}')
+        ], invalid=True)
+
+    return execute(*args, **kwargs)
+
+
+class QueryCostBackend(GraphQLCoreBackend):
+    """ GraphQL backend rejecting operations whose cost is above max_cost, before
+    executing them. Connection fields without first, last or max_limit count
+    default_page_size nodes, lists of objects count list_size items
+    """
+
+    def __init__(self, max_cost, executor=None, default_page_size=DEFAULT_PAGE_SIZE, list_size=DEFAULT_LIST_SIZE):
+        super(QueryCostBackend, self).__init__(executor)
+        self.max_cost = max_cost
+        self.cost_options = {'default_page_size': default_page_size, 'list_size': list_size}
+
+    def document_from_string(self, schema, document_string):
+        document = super(QueryCostBackend, self).document_from_string(schema, document_string)
+        document.execute = partial(
+            execute_with_max_cost, document.execute, schema, document.document_ast, self.max_cost, self.cost_options
+        )
+        return document
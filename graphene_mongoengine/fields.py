@@ -1,17 +1,164 @@
-from functools import partial
+import asyncio
+import inspect
+
+from collections import OrderedDict
+from functools import lru_cache, partial
 
 from mongoengine import QuerySet
 
-from graphene.relay import ConnectionField
+from graphene import Argument, Int, List, NonNull
+from graphene.relay import Connection, ConnectionField
 from graphene.relay.connection import PageInfo
-from graphql_relay.connection.arrayconnection import connection_from_list_slice
+from graphene.types.argument import to_arguments
+from graphql_relay.connection.arrayconnection import (
+    connection_from_list_slice, get_offset_with_default, offset_to_cursor
+)
 
+from .pagination import (
+    get_offset_window, get_list_slice, get_keyset_fields, get_keyset_ordering, get_keyset_page,
+    get_keyset_window, create_keyset_page, get_forward_page, get_forward_window, get_forward_nodes,
+    count_documents
+)
+from .aggregation import get_pipeline_queryset
+from .asynchronous import fetch_list_slice, fetch_window
+from .cache import CachedPage, get_result_cache
+from .filters import get_filter_arguments, get_filter_kwargs
+from .geo import get_geo_arguments, get_geo_field, get_geo_kwargs
+from .identity import get_identity_map, add_identity, get_loaded_fields
+from .ordering import get_order_by_enum, get_ordering
+from .parallel import get_parallel_executor
+from .projection import apply_projection
+from .references import keep_stored_references
+from .streaming import STREAM_BATCH_SIZE, StreamPageInfo, iter_documents, iter_edges
 from .utils import get_query
 
 # pylint: disable=C0103, W0603, W0622, W0212
 
+
+class MongoEngineConnection(Connection):
+    """ Relay Connection whose total count is only computed when it is requested """
+
+    class Meta:
+        abstract = True
+
+    total_count = Int(required=True, description='Number of items in the connection')
+
+    _length = None
+    _length_resolver = None
+
+    @property
+    def length(self):
+        """ Number of items in the connection, counted on first access """
+        if self._length is None and self._length_resolver is not None:
+            self._length = self._length_resolver()
+        return self._length
+
+    @length.setter
+    def length(self, value):
+        self._length = value
+
+    def resolve_total_count(self, info):
+        """ Resolves the totalCount field, counting on the pool of a :ParallelExecutor: """
+        executor = get_parallel_executor()
+        if executor is not None and self._length is None and self._length_resolver is not None:
+            return executor.submit(lambda: self.length)
+        return self.length
+
+
+class MongoEngineConnectionFieldOptions(object):
+    """ Holds the settings of a :MongoEngineConnectionField: """
+
+    slice_pushdown = True  # type: bool
+    keyset = None  # type: str
+    lazy_count = False  # type: bool
+    estimated_count = False  # type: bool
+    filter_fields = None  # type: Union[bool, Sequence[str]]
+    indexed_filters = False  # type: bool
+    geo_field = None  # type: Union[bool, str]
+    order_by_fields = None  # type: Union[bool, Sequence[str]]
+    strict_order = False  # type: bool
+    aggregate = False  # type: bool
+    cache = None  # type: Union[bool, ResultCache]
+    max_limit = None  # type: int
+    strict_limit = False  # type: bool
+    batch_size = None  # type: int
+    stream = False  # type: bool
+    async_backend = None  # type: MotorBackend
+    parallel = True  # type: bool
+
+    def __init__(self, **options):
+        for name, value in options.items():
+            assert hasattr(self, name), f'Unknown MongoEngineConnectionField option "{name}"'
+            setattr(self, name, value)
+
+
 class MongoEngineConnectionField(ConnectionField):
 
+    def __init__(self, type, *args, slice_pushdown=True, keyset=None,
+                 lazy_count=False, estimated_count=False,
+                 filter_fields=None, indexed_filters=False, geo_field=None,
+                 order_by_fields=None, strict_order=False, aggregate=False, cache=None,
+                 max_limit=None, strict_limit=False, batch_size=None, stream=False,
+                 async_backend=None, parallel=True, **kwargs):
+        self.options = MongoEngineConnectionFieldOptions(
+            slice_pushdown=slice_pushdown,
+            keyset=keyset,
+            lazy_count=lazy_count,
+            estimated_count=estimated_count,
+            filter_fields=filter_fields,
+            indexed_filters=indexed_filters,
+            geo_field=geo_field,
+            order_by_fields=order_by_fields,
+            strict_order=strict_order,
+            aggregate=aggregate,
+            cache=cache,
+            max_limit=max_limit,
+            strict_limit=strict_limit,
+            batch_size=batch_size,
+            stream=stream,
+            async_backend=async_backend,
+            parallel=parallel,
+        )
+        assert not (stream and (keyset or cache)), 'Streamed connections use offset cursors and are not cached'
+        assert not (stream and async_backend), 'Streamed connections are not resolved with an async backend'
+        assert not (geo_field and aggregate), 'Geo arguments are find filters, $near is not valid in a $match stage'
+        super(MongoEngineConnectionField, self).__init__(type, *args, **kwargs)
+
+    @property
+    def args(self):
+        """ Returns the field arguments, along with the filter, geo and orderBy
+        arguments generated from the document fields when enabled
+        """
+        extra_args = OrderedDict()
+        node = self.type._meta.node if self.options.filter_fields or self.options.order_by_fields else None
+
+        if self.options.filter_fields:
+            filter_args, _ = get_filter_arguments(node, self.options.filter_fields, self.options.indexed_filters)
+            extra_args.update(filter_args)
+
+        if self.options.geo_field:
+            # Fails at schema build time for documents without a geo field to query
+            get_geo_field(self.document, self.options.geo_field)
+            extra_args.update(get_geo_arguments())
+
+        if self.options.order_by_fields:
+            order_by_enum = get_order_by_enum(node, self.options.order_by_fields, self.options.strict_order)
+            extra_args['order_by'] = Argument(
+                List(NonNull(order_by_enum)), description='Sort keys, the first ones take precedence'
+            )
+
+        if not extra_args:
+            return self._base_args
+
+        return to_arguments(self._base_args, OrderedDict(
+            (name, argument) for name, argument in extra_args.items()
+            if name not in self._base_args
+        ))
+
+    @args.setter
+    def args(self, args):
+        self._base_args = args
+
     @property
     def document(self):
         """ Returns MongoEngine document for this Connection Field """
@@ -41,43 +188,511 @@ class MongoEngineConnectionField(ConnectionField):
         return connection_type._meta.connection
 
     @classmethod
-    def connection_resolver(cls, resolver, connection, document, root, info, **args):
-        """ Returns a Graphql Connection object """
+    def apply_max_limit(cls, options, args):
+        """ Returns args with first and last bounded by the max_limit option,
+        the first max_limit nodes are returned when neither is given. Larger
+        values are clamped, or rejected in strict mode
+        """
+        if not options.max_limit:
+            return args
 
-        iterable = resolver(root, info, **args)
+        if not isinstance(args.get('first'), int) and not isinstance(args.get('last'), int):
+            return dict(args, first=options.max_limit)
 
-        if iterable is None:
-            iterable = cls.get_query(document, info, **args)
+        for name in ('first', 'last'):
+            value = args.get(name)
+            if isinstance(value, int) and value > options.max_limit:
+                if options.strict_limit:
+                    raise Exception(f'Requesting {value} nodes with "{name}" exceeds the limit of {options.max_limit}')
+                args = dict(args, **{name: options.max_limit})
 
-        if isinstance(iterable, QuerySet):
-            length = iterable.count()
+        return args
+
+    @classmethod
+    def set_connection_length(cls, connection, iterable, options, count=None):
+        """ Sets the connection length, deferring the count
+        when the connection type supports it
+        """
+        count = count or partial(count_documents, iterable, options.estimated_count)
+
+        if isinstance(connection, MongoEngineConnection):
+            connection._length_resolver = count
+        else:
+            connection.length = count()
+
+    @classmethod
+    def resolve_offset_connection(cls, iterable, connection, options, args):
+        """ Returns a Graphql Connection object paginated by offset cursors """
+
+        # Sized sequences are counted for free, the lazy path only pays off for QuerySets
+        lazy_count = options.lazy_count and isinstance(iterable, QuerySet)
+        if lazy_count and options.slice_pushdown and not isinstance(args.get('last'), int):
+            return cls.resolve_forward_connection(iterable, connection, options, args)
+
+        length = count_documents(iterable, options.estimated_count)
+
+        if options.slice_pushdown:
+            # Only the documents inside the requested window are fetched
+            slice_start, slice_end = get_offset_window(args, length)
+            list_slice = get_list_slice(iterable, slice_start, slice_end)
         else:
-            length = len(iterable)
+            slice_start, list_slice = 0, iterable
+
+        return cls.create_offset_connection(connection, list_slice, slice_start, length, options, args)
+
+    @classmethod
+    def create_offset_connection(cls, connection, list_slice, slice_start, length, options, args):
+        """ Returns a Graphql Connection object for a slice of a list of length items """
 
         connection = connection_from_list_slice(
-            iterable,
+            list_slice,
             args,
-            slice_start=0,
+            slice_start=slice_start,
             list_length=length,
-            list_slice_length=length,
+            list_slice_length=len(list_slice) if options.slice_pushdown else length,
             connection_type=connection,
             pageinfo_type=PageInfo,
             edge_type=connection.Edge,
         )
-        connection.iterable = iterable
         connection.length = length
 
         return connection
 
+    @classmethod
+    def resolve_forward_connection(cls, iterable, connection, options, args):
+        """ Returns a Graphql Connection object paginated by offset cursors,
+        without counting the documents unless the length is requested
+        """
+
+        start_offset, nodes, has_next_page = get_forward_page(iterable, args)
+
+        connection = cls.create_forward_connection(connection, start_offset, nodes, has_next_page)
+        cls.set_connection_length(connection, iterable, options)
+
+        return connection
+
+    @classmethod
+    def create_forward_connection(cls, connection, start_offset, nodes, has_next_page):
+        """ Returns a Graphql Connection object for nodes starting at start_offset """
+
+        cursors = [offset_to_cursor(start_offset + index) for index in range(len(nodes))]
+        return cls.create_connection(connection, nodes, cursors, False, has_next_page)
+
+    @classmethod
+    def resolve_keyset_connection(cls, queryset, connection, options, args):
+        """ Returns a Graphql Connection object paginated by keyset cursors """
+
+        page = get_keyset_page(queryset, args, cls.get_keyset_fields(connection, options, args))
+
+        connection = cls.create_connection(
+            connection, page.nodes, page.cursors, page.has_previous_page, page.has_next_page
+        )
+        cls.set_connection_length(connection, queryset, options)
+
+        return connection
+
+    @classmethod
+    def resolve_stream_connection(cls, queryset, connection, options, args):
+        """ Returns a Graphql Connection object paginated by offset cursors, whose edges
+        are built while iterated from a cursor fetching batch_size documents at a time.
+        The documents are not kept by the QuerySet, pageInfo is computed from the count
+        """
+        count = lru_cache(maxsize=None)(partial(count_documents, queryset, options.estimated_count))
+
+        if isinstance(args.get('last'), int) or args.get('before') is not None:
+            start_offset, end_offset = get_offset_window(args, count())
+        else:
+            start_offset = max(get_offset_with_default(args.get('after'), -1), -1) + 1
+            first = args.get('first')
+            end_offset = start_offset + max(first, 0) if isinstance(first, int) else None
+
+        nodes = iter_documents(queryset[start_offset:end_offset], options.batch_size or STREAM_BATCH_SIZE)
+        stream_connection = connection(
+            edges=iter_edges(connection.Edge, nodes, start_offset),
+            page_info=StreamPageInfo(args, start_offset, end_offset, count),
+        )
+        cls.set_connection_length(stream_connection, queryset, options, count)
+
+        return stream_connection
+
+    @classmethod
+    def create_connection(cls, connection, nodes, cursors, has_previous_page, has_next_page):
+        """ Returns a Graphql Connection object for a page of nodes """
+
+        return connection(
+            edges=[
+                connection.Edge(node=node, cursor=cursor)
+                for node, cursor in zip(nodes, cursors)
+            ],
+            page_info=PageInfo(
+                start_cursor=cursors[0] if cursors else None,
+                end_cursor=cursors[-1] if cursors else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            )
+        )
+
+    @classmethod
+    def get_cache_keys(cls, result_cache, queryset, connection, options, args):
+        """ Returns the result cache (count key, page key) of a connection page """
+        node = connection._meta.node
+        documents = [queryset._document] + [lookup.document for lookup in getattr(queryset, '_reference_lookups', ())]
+
+        count_key = result_cache.get_key('count', documents[:1], queryset._query, options.estimated_count)
+        page_key = result_cache.get_key(
+            'page', documents, node._meta.name, queryset._query, queryset._ordering,
+            queryset._skip, queryset._limit, queryset._loaded_fields.as_dict(),
+            [lookup.name for lookup in getattr(queryset, '_reference_lookups', ())],
+            cls.get_keyset_fields(connection, options, args) if options.keyset else None,
+            [args.get(name) for name in ('first', 'last', 'after', 'before')],
+        )
+
+        return count_key, page_key
+
+    @classmethod
+    def get_cached_connection(cls, result_cache, page_key, connection):
+        """ Returns a Graphql Connection object for a page kept in the result cache,
+        None when the page is not cached
+        """
+        page = result_cache.get(page_key)
+        if page is None:
+            return None
+
+        return cls.create_connection(
+            connection, page.nodes, page.cursors, page.has_previous_page, page.has_next_page
+        )
+
+    @classmethod
+    def cache_connection(cls, result_cache, page_key, count_key, connection, count):
+        """ Keeps the page of a Graphql Connection object in the result cache,
+        along with its length when it was counted
+        """
+        result_cache.set(page_key, CachedPage(
+            [edge.node for edge in connection.edges],
+            [edge.cursor for edge in connection.edges],
+            connection.page_info.has_previous_page,
+            connection.page_info.has_next_page,
+        ))
+
+        if isinstance(connection, MongoEngineConnection) and connection._length is None:
+            connection._length_resolver = count
+        else:
+            result_cache.set(count_key, connection.length)
+
+    @classmethod
+    def resolve_cached_connection(cls, result_cache, queryset, connection, options, args):
+        """ Returns a Graphql Connection object for a page kept in the result cache.
+        Pages and counts are cached apart, so the count is only made when requested
+        """
+        count_key, page_key = cls.get_cache_keys(result_cache, queryset, connection, options, args)
+        count = partial(
+            result_cache.get_or_set, count_key, partial(count_documents, queryset, options.estimated_count)
+        )
+
+        cached_connection = cls.get_cached_connection(result_cache, page_key, connection)
+        if cached_connection is not None:
+            cls.set_connection_length(cached_connection, queryset, options, count)
+            return cached_connection
+
+        if options.keyset:
+            connection = cls.resolve_keyset_connection(queryset, connection, options, args)
+        else:
+            connection = cls.resolve_offset_connection(queryset, connection, options, args)
+
+        cls.cache_connection(result_cache, page_key, count_key, connection, count)
+
+        return connection
+
+    @classmethod
+    async def set_async_connection_length(cls, backend, connection, queryset, options, count=None):
+        """ Async variant of :set_connection_length:, deferred counts resolve
+        to a future awaited by the execution
+        """
+        count = count or partial(backend.count, queryset, options.estimated_count)
+
+        if isinstance(connection, MongoEngineConnection):
+            connection._length_resolver = lambda: asyncio.ensure_future(count())
+        else:
+            connection.length = await count()
+
+    @classmethod
+    async def resolve_async_offset_connection(cls, backend, queryset, connection, options, args):
+        """ Async variant of :resolve_offset_connection: for QuerySets """
+
+        if options.lazy_count and options.slice_pushdown and not isinstance(args.get('last'), int):
+            return await cls.resolve_async_forward_connection(backend, queryset, connection, options, args)
+
+        length = await backend.count(queryset, options.estimated_count)
+
+        if options.slice_pushdown:
+            slice_start, slice_end = get_offset_window(args, length)
+            list_slice = await fetch_list_slice(backend, queryset, slice_start, slice_end)
+        else:
+            slice_start, list_slice = 0, await backend.fetch(queryset)
+
+        return cls.create_offset_connection(connection, list_slice, slice_start, length, options, args)
+
+    @classmethod
+    async def resolve_async_forward_connection(cls, backend, queryset, connection, options, args):
+        """ Async variant of :resolve_forward_connection: """
+
+        start_offset, end_offset, page_size = get_forward_window(args)
+        nodes = await fetch_list_slice(backend, queryset, start_offset, end_offset)
+        nodes, has_next_page = get_forward_nodes(nodes, page_size)
+
+        connection = cls.create_forward_connection(connection, start_offset, nodes, has_next_page)
+        await cls.set_async_connection_length(backend, connection, queryset, options)
+
+        return connection
+
+    @classmethod
+    async def resolve_async_keyset_connection(cls, backend, queryset, connection, options, args):
+        """ Async variant of :resolve_keyset_connection: """
+
+        keyset_fields = cls.get_keyset_fields(connection, options, args)
+        window, limit, reverse = get_keyset_window(queryset, args, keyset_fields)
+        nodes = await fetch_window(backend, window, limit)
+        page = create_keyset_page(nodes, args, keyset_fields, reverse, queryset._document)
+
+        connection = cls.create_connection(
+            connection, page.nodes, page.cursors, page.has_previous_page, page.has_next_page
+        )
+        await cls.set_async_connection_length(backend, connection, queryset, options)
+
+        return connection
+
+    @classmethod
+    async def resolve_async_cached_connection(cls, backend, result_cache, queryset, connection, options, args):
+        """ Async variant of :resolve_cached_connection: """
+        count_key, page_key = cls.get_cache_keys(result_cache, queryset, connection, options, args)
+
+        async def count():
+            length = result_cache.get(count_key)
+            if length is None:
+                length = await backend.count(queryset, options.estimated_count)
+                result_cache.set(count_key, length)
+            return length
+
+        cached_connection = cls.get_cached_connection(result_cache, page_key, connection)
+        if cached_connection is not None:
+            await cls.set_async_connection_length(backend, cached_connection, queryset, options, count)
+            return cached_connection
+
+        if options.keyset:
+            connection = await cls.resolve_async_keyset_connection(backend, queryset, connection, options, args)
+        else:
+            connection = await cls.resolve_async_offset_connection(backend, queryset, connection, options, args)
+
+        cls.cache_connection(result_cache, page_key, count_key, connection, count)
+
+        return connection
+
+    @classmethod
+    def apply_filters(cls, queryset, connection, options, args):
+        """ Filters queryset with the filter arguments given in args """
+
+        _, filter_arguments = get_filter_arguments(
+            connection._meta.node, options.filter_fields, options.indexed_filters
+        )
+        filter_kwargs = get_filter_kwargs(filter_arguments, args)
+
+        return queryset.filter(**filter_kwargs) if filter_kwargs else queryset
+
+    @classmethod
+    def apply_geo_filters(cls, queryset, connection, options, args):
+        """ Filters queryset with the geo arguments given in args, see :get_geo_kwargs: """
+
+        name, field = get_geo_field(connection._meta.node._meta.document, options.geo_field)
+        geo_kwargs = get_geo_kwargs(name, field, args)
+
+        return queryset.filter(**geo_kwargs) if geo_kwargs else queryset
+
+    @classmethod
+    def get_ordering(cls, connection, options, args):
+        """ Returns the (field name, direction) pairs selected by the orderBy argument """
+
+        if not options.order_by_fields or not args.get('order_by'):
+            return ()
+
+        return get_ordering(connection._meta.node._meta.document, args['order_by'], options.strict_order)
+
+    @classmethod
+    def get_keyset_fields(cls, connection, options, args):
+        """ Returns the (field name, direction) pairs keyset cursors are made of """
+
+        return cls.get_ordering(connection, options, args) or get_keyset_fields(options.keyset)
+
+    @classmethod
+    def apply_projection(cls, queryset, connection, options, info, args):
+        """ Restricts queryset to the document fields selected under edges.node """
+
+        keyset_fields = cls.get_keyset_fields(connection, options, args) if options.keyset else ()
+        extra_fields = [name for name, _ in keyset_fields if name != 'pk']
+
+        return apply_projection(queryset, info, connection._meta.node, ('edges', 'node'), extra_fields)
+
+    @classmethod
+    def identify_nodes(cls, connection, document, queryset, info):
+        """ Adds the connection nodes to the request identity map, edges of
+        documents already loaded with the same fields share their instance
+        """
+        identity_map = get_identity_map(info.context)
+        if identity_map is None:
+            return
+
+        fields = get_loaded_fields(queryset)
+        for edge in connection.edges:
+            edge.node = add_identity(identity_map, document, edge.node, fields)
+
+    @classmethod
+    def prepare_iterable(cls, iterable, resolver, connection, document, options, info, args):
+        """ Returns the iterable returned by the resolver (the document QuerySet when None),
+        filtered, ordered and projected by the field arguments and options
+        """
+
+        if iterable is None:
+            iterable = cls.get_query(document, info, **args)
+
+        if options.filter_fields:
+            assert isinstance(iterable, QuerySet), (
+                f'Filter arguments need a QuerySet, {resolver} returned {type(iterable).__name__}'
+            )
+            iterable = cls.apply_filters(iterable, connection, options, args)
+
+        if options.geo_field:
+            assert isinstance(iterable, QuerySet), (
+                f'Geo arguments need a QuerySet, {resolver} returned {type(iterable).__name__}'
+            )
+            iterable = cls.apply_geo_filters(iterable, connection, options, args)
+
+        ordering = cls.get_ordering(connection, options, args)
+        if ordering and not options.keyset:
+            assert isinstance(iterable, QuerySet), (
+                f'orderBy needs a QuerySet, {resolver} returned {type(iterable).__name__}'
+            )
+            iterable = iterable.order_by(*get_keyset_ordering(ordering))
+
+        if isinstance(iterable, QuerySet):
+            iterable = cls.apply_projection(iterable, connection, options, info, args)
+            if options.batch_size:
+                # Bounds the documents held by the cursor between round trips
+                iterable = iterable.batch_size(options.batch_size)
+
+        if options.aggregate and isinstance(iterable, QuerySet):
+            # Selected references are joined with $lookup instead of loaded afterwards
+            iterable = get_pipeline_queryset(iterable, info, connection._meta.node, ('edges', 'node'))
+        elif connection._meta.node._meta.as_pymongo and isinstance(iterable, QuerySet):
+            # Raw documents are resolved from their dicts, skipping Document instantiation
+            iterable = iterable.as_pymongo()
+        elif isinstance(iterable, QuerySet):
+            # Cached references are resolved from their stored values or in batches
+            iterable = keep_stored_references(iterable)
+
+        return iterable
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, document, options, root, info, **args):
+        """ Returns a Graphql Connection object, or a coroutine resolving to it when the
+        field (or its node type) has an async backend, see :async_connection_resolver:
+        """
+
+        async_backend = options.async_backend or connection._meta.node._meta.async_backend
+        if async_backend is not None and not options.stream:
+            return cls.async_connection_resolver(
+                async_backend, resolver, connection, document, options, root, info, **args
+            )
+
+        args = cls.apply_max_limit(options, args)
+        iterable = resolver(root, info, **args)
+        iterable = cls.prepare_iterable(iterable, resolver, connection, document, options, info, args)
+
+        executor = get_parallel_executor() if options.parallel else None
+        if executor is not None and isinstance(iterable, QuerySet) and not options.stream:
+            # The count and page queries run on the pool while the sibling fields resolve
+            return executor.submit(cls.resolve_iterable_connection, iterable, connection, options, args).then(
+                lambda connection: cls.finish_connection(connection, document, iterable, options, info)
+            )
+
+        connection = cls.resolve_iterable_connection(iterable, connection, options, args)
+
+        return cls.finish_connection(connection, document, iterable, options, info)
+
+    @classmethod
+    def resolve_iterable_connection(cls, iterable, connection, options, args):
+        """ Returns a Graphql Connection object for the prepared iterable """
+
+        result_cache = get_result_cache(options.cache)
+        if options.stream and isinstance(iterable, QuerySet):
+            connection = cls.resolve_stream_connection(iterable, connection, options, args)
+        elif result_cache is not None and isinstance(iterable, QuerySet):
+            connection = cls.resolve_cached_connection(result_cache, iterable, connection, options, args)
+        elif options.keyset and isinstance(iterable, QuerySet):
+            connection = cls.resolve_keyset_connection(iterable, connection, options, args)
+        else:
+            connection = cls.resolve_offset_connection(iterable, connection, options, args)
+
+        return connection
+
+    @classmethod
+    def finish_connection(cls, connection, document, iterable, options, info):
+        """ Adds the connection nodes to the request identity map and returns the connection """
+
+        # Streamed edges are only iterated once, by the execution
+        if isinstance(iterable, QuerySet) and not iterable._as_pymongo and not options.stream:
+            cls.identify_nodes(connection, document, iterable, info)
+
+        connection.iterable = iterable
+
+        return connection
+
+    @classmethod
+    async def async_connection_resolver(cls, backend, resolver, connection, document, options, root, info, **args):
+        """ Returns a Graphql Connection object, fetching the QuerySet documents with
+        the async backend. Run under an AsyncioExecutor, sibling connections
+        make their queries concurrently
+        """
+
+        args = cls.apply_max_limit(options, args)
+        iterable = resolver(root, info, **args)
+        if inspect.isawaitable(iterable):
+            iterable = await iterable
+        iterable = cls.prepare_iterable(iterable, resolver, connection, document, options, info, args)
+
+        if not isinstance(iterable, QuerySet):
+            connection = cls.resolve_offset_connection(iterable, connection, options, args)
+            connection.iterable = iterable
+            return connection
+
+        result_cache = get_result_cache(options.cache)
+        if result_cache is not None:
+            connection = await cls.resolve_async_cached_connection(
+                backend, result_cache, iterable, connection, options, args
+            )
+        elif options.keyset:
+            connection = await cls.resolve_async_keyset_connection(backend, iterable, connection, options, args)
+        else:
+            connection = await cls.resolve_async_offset_connection(backend, iterable, connection, options, args)
+
+        if not iterable._as_pymongo:
+            cls.identify_nodes(connection, document, iterable, info)
+
+        connection.iterable = iterable
+
+        return connection
+
     def get_resolver(self, parent_resolver):
-        return partial(self.connection_resolver, parent_resolver, self.type, self.document)
+        return partial(self.connection_resolver, parent_resolver, self.type, self.document, self.options)
 
 
 __connection_factory = MongoEngineConnectionField
 
 
 def create_connection_field(type, **kwargs):
-    """ Creates a :MongoEngineConnectionField: for a given type"""
+    """ Creates a :MongoEngineConnectionField: for a given type,
+    counting documents only when the count is requested
+    """
+    if inspect.isclass(__connection_factory) and issubclass(__connection_factory, MongoEngineConnectionField):
+        kwargs.setdefault('lazy_count', True)
     return __connection_factory(type, **kwargs)
 
 
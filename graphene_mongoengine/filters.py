@@ -0,0 +1,136 @@
+""" Filter arguments for MongoEngine connection fields, compiled to QuerySet filters """
+
+from collections import OrderedDict
+
+from graphene import Argument, List, NonNull
+
+from mongoengine.fields import (
+    BooleanField, ComplexDateTimeField, DateTimeField, FloatField,
+    IntField, LongField, ObjectIdField, StringField
+)
+
+from .utils import get_document_fields
+
+# pylint: disable=W0212,C0103
+
+RANGE_LOOKUPS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte')
+
+# Checked in order, ComplexDateTimeField is a StringField
+FIELD_LOOKUPS = (
+    ((IntField, LongField, FloatField, DateTimeField, ComplexDateTimeField), RANGE_LOOKUPS),
+    ((StringField,), ('exact', 'in', 'prefix')),
+    ((ObjectIdField,), ('exact', 'in')),
+    ((BooleanField,), ('exact',)),
+)
+
+QUERY_OPERATORS = {
+    'exact': None,
+    'prefix': 'startswith',
+}
+
+
+class FilterArgument(object):
+    """ A filter argument of a connection field, with the QuerySet
+    filter keyword its value is passed as
+    """
+
+    def __init__(self, name, field_name, lookup):
+        self.name = name
+        self.field_name = field_name
+        self.lookup = lookup
+
+    @property
+    def query_key(self):
+        """ Returns the QuerySet filter keyword for this argument """
+        operator = QUERY_OPERATORS.get(self.lookup, self.lookup)
+        return f'{self.field_name}__{operator}' if operator else self.field_name
+
+
+def get_field_lookups(field):
+    """ Returns the lookups field can be filtered with """
+    for field_classes, lookups in FIELD_LOOKUPS:
+        if isinstance(field, field_classes):
+            return lookups
+    return ()
+
+
+def get_indexed_field_names(document):
+    """ Returns the names of the fields that lead an ascending or descending
+    index of document, so filtering them does not scan the collection
+    """
+    db_field_names = {field.db_field: name for name, field in get_document_fields(document).items()}
+
+    return {
+        db_field_names.get(spec['fields'][0][0])
+        for spec in document._meta.get('index_specs') or ()
+        if spec.get('fields') and spec['fields'][0][1] in (1, -1)
+    }
+
+
+def get_filter_fields(object_type, filter_fields=True, indexed_only=False):
+    """ Returns the document fields of object_type that can be filtered,
+    restricted to the filter_fields names unless it is True
+    """
+    document = object_type._meta.document
+    document_fields = get_document_fields(document)
+    id_field = document._meta.get('id_field')
+
+    if filter_fields is True:
+        filter_fields = [
+            name for name, field in document_fields.items()
+            if name != id_field and name in object_type._meta.fields and get_field_lookups(field)
+        ]
+    else:
+        for name in filter_fields:
+            assert get_field_lookups(document_fields.get(name)), (
+                f'Field "{name}" of {document.__name__} can not be used as a filter'
+            )
+
+    if indexed_only:
+        indexed_field_names = get_indexed_field_names(document)
+        filter_fields = [name for name in filter_fields if name in indexed_field_names]
+
+    return OrderedDict((name, document_fields[name]) for name in filter_fields)
+
+
+__filter_arguments = {}
+
+
+def get_filter_arguments(object_type, filter_fields=True, indexed_only=False):
+    """ Returns an OrderedDict of the graphene Arguments and an OrderedDict
+    of the :FilterArgument: for filtering the documents of object_type.
+    Memoized, object types do not change once created
+    """
+    key = (object_type, filter_fields if filter_fields is True else tuple(filter_fields), indexed_only)
+    if key not in __filter_arguments:
+        __filter_arguments[key] = create_filter_arguments(object_type, filter_fields, indexed_only)
+    return __filter_arguments[key]
+
+
+def create_filter_arguments(object_type, filter_fields, indexed_only):
+    """ Creates the filter arguments returned by :get_filter_arguments: """
+    from .converter import convert_mongoengine_field
+
+    arguments = OrderedDict()
+    filter_arguments = OrderedDict()
+
+    for name, field in get_filter_fields(object_type, filter_fields, indexed_only).items():
+        field_type = convert_mongoengine_field(field, object_type._meta.registry).get_type()
+
+        for lookup in get_field_lookups(field):
+            argument_name = name if lookup == 'exact' else f'{name}_{lookup}'
+            argument_type = List(NonNull(field_type)) if lookup == 'in' else field_type
+
+            arguments[argument_name] = Argument(argument_type)
+            filter_arguments[argument_name] = FilterArgument(argument_name, name, lookup)
+
+    return arguments, filter_arguments
+
+
+def get_filter_kwargs(filter_arguments, args):
+    """ Returns the QuerySet filter kwargs for the filter arguments given in args """
+    return {
+        filter_argument.query_key: args[name]
+        for name, filter_argument in filter_arguments.items()
+        if args.get(name) is not None
+    }
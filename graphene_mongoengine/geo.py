@@ -0,0 +1,290 @@
+""" GeoJSON types for MongoEngine geo fields, and the geospatial arguments of
+connection fields, compiled to $near and $geoWithin queries answered by the
+2dsphere (or 2d) index of the field
+"""
+
+from collections import OrderedDict
+
+from graphene import Argument, Float, List, NonNull, ObjectType, String
+
+from mongoengine.fields import (
+    GeoPointField, PointField, LineStringField, PolygonField,
+    MultiPointField, MultiLineStringField, MultiPolygonField
+)
+
+from .utils import get_document_fields
+
+# pylint: disable=W0212,C0103
+
+# Equatorial radius used by MongoDB to turn distances into radians
+EARTH_RADIUS_METERS = 6378100.0
+
+GEO_INDEX_TYPES = ('2dsphere', '2d')
+
+
+def get_geo_json(value, geo_type):
+    """ Returns a geo field value as a GeoJSON dict. Values set on a document are
+    bare coordinates until saved and reloaded, GeoPointField values always are
+    """
+    if value is None or isinstance(value, dict):
+        return value
+    return {'type': geo_type, 'coordinates': value}
+
+
+def get_coordinates_type(depth):
+    """ Returns the Graphene type of GeoJSON coordinates nested depth lists deep """
+    coordinates_type = NonNull(Float)
+    for _ in range(depth - 1):
+        coordinates_type = NonNull(List(coordinates_type))
+    return List(coordinates_type, required=True)
+
+
+class GeoJSONType(ObjectType):
+    """ Base of the GeoJSON geometry types, resolved from GeoJSON dicts
+    or bare coordinates, see :get_geo_json:
+    """
+
+    class Meta:
+        abstract = True
+
+    geo_type = None
+
+    type = String(required=True, description='GeoJSON geometry type')
+
+    @classmethod
+    def resolve_type(cls, root, info):
+        return get_geo_json(root, cls.geo_type)['type']
+
+    @classmethod
+    def resolve_coordinates(cls, root, info):
+        return get_geo_json(root, cls.geo_type)['coordinates']
+
+
+class GeoJSONPoint(GeoJSONType):
+    """ GeoJSON Point, coordinates are [longitude, latitude] """
+
+    geo_type = 'Point'
+
+    coordinates = get_coordinates_type(1)
+
+
+class GeoJSONLineString(GeoJSONType):
+    """ GeoJSON LineString, a list of positions """
+
+    geo_type = 'LineString'
+
+    coordinates = get_coordinates_type(2)
+
+
+class GeoJSONPolygon(GeoJSONType):
+    """ GeoJSON Polygon, a list of closed rings, the exterior one first """
+
+    geo_type = 'Polygon'
+
+    coordinates = get_coordinates_type(3)
+
+
+class GeoJSONMultiPoint(GeoJSONType):
+    """ GeoJSON MultiPoint, a list of positions """
+
+    geo_type = 'MultiPoint'
+
+    coordinates = get_coordinates_type(2)
+
+
+class GeoJSONMultiLineString(GeoJSONType):
+    """ GeoJSON MultiLineString, a list of line strings """
+
+    geo_type = 'MultiLineString'
+
+    coordinates = get_coordinates_type(3)
+
+
+class GeoJSONMultiPolygon(GeoJSONType):
+    """ GeoJSON MultiPolygon, a list of polygons """
+
+    geo_type = 'MultiPolygon'
+
+    coordinates = get_coordinates_type(4)
+
+
+# Legacy coordinate pairs of GeoPointField are exposed as Points
+GEO_TYPES = (
+    (GeoPointField, GeoJSONPoint),
+    (PointField, GeoJSONPoint),
+    (LineStringField, GeoJSONLineString),
+    (PolygonField, GeoJSONPolygon),
+    (MultiPointField, GeoJSONMultiPoint),
+    (MultiLineStringField, GeoJSONMultiLineString),
+    (MultiPolygonField, GeoJSONMultiPolygon),
+)
+
+GEO_FIELDS = tuple(field_class for field_class, _ in GEO_TYPES)
+
+
+def get_geo_type(field):
+    """ Returns the GeoJSON type of a geo field """
+    for field_class, geo_type in GEO_TYPES:
+        if isinstance(field, field_class):
+            return geo_type
+    return None
+
+
+def get_geo_indexed_field_names(document):
+    """ Returns the names of the fields that lead a 2dsphere or 2d index of document """
+    db_field_names = {field.db_field: name for name, field in get_document_fields(document).items()}
+
+    return [
+        db_field_names.get(spec['fields'][0][0])
+        for spec in document._meta.get('index_specs') or ()
+        if spec.get('fields') and spec['fields'][0][1] in GEO_INDEX_TYPES
+    ]
+
+
+def get_geo_field(document, geo_field=True):
+    """ Returns the (name, field) the geo arguments of a connection over document
+    query, geo_field being a field name or True for the first geo indexed field
+    """
+    document_fields = get_document_fields(document)
+
+    if geo_field is True:
+        names = get_geo_indexed_field_names(document)
+        assert names, f'{document.__name__} has no 2dsphere or 2d index for geo arguments'
+        geo_field = names[0]
+
+    assert isinstance(document_fields.get(geo_field), GEO_FIELDS), (
+        f'Field "{geo_field}" of {document.__name__} can not be used for geo arguments'
+    )
+
+    return geo_field, document_fields[geo_field]
+
+
+def get_geo_arguments():
+    """ Returns an OrderedDict of the geo arguments of a connection field """
+    position = List(NonNull(Float))
+    positions = List(NonNull(List(NonNull(Float))))
+
+    return OrderedDict((
+        ('near', Argument(position, description='[longitude, latitude] the nodes are sorted by distance to')),
+        ('max_distance', Argument(Float, description='Maximum distance to near, in meters for GeoJSON fields')),
+        ('within_box', Argument(positions, description='Bottom left and top right corners of a box')),
+        ('within_polygon', Argument(positions, description='Positions of a polygon exterior ring')),
+    ))
+
+
+def get_position(value, name):
+    """ Returns a [longitude, latitude] argument value, raises when malformed """
+    if len(value) != 2:
+        raise Exception(f'"{name}" expects a [longitude, latitude] position')
+    return list(value)
+
+
+def get_box(box):
+    """ Returns the bottom left and top right corners of a box argument value """
+    if len(box) != 2:
+        raise Exception('"withinBox" expects the bottom left and top right corners')
+    return [get_position(corner, 'withinBox') for corner in box]
+
+
+def get_box_polygon(box):
+    """ Returns the GeoJSON Polygon of a box given by its corners, see :get_box: """
+    (left, bottom), (right, top) = get_box(box)
+    return {'type': 'Polygon', 'coordinates': [[
+        [left, bottom], [right, bottom], [right, top], [left, top], [left, bottom]
+    ]]}
+
+
+def get_ring(positions):
+    """ Returns the closed ring of the positions of a polygon """
+    ring = [get_position(position, 'withinPolygon') for position in positions]
+    if len(ring) < 3:
+        raise Exception('"withinPolygon" expects at least 3 positions')
+    if ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return ring
+
+
+def get_geo_kwargs(name, field, args):
+    """ Returns the QuerySet filter kwargs for the geo arguments given in args.
+    GeoJSON fields are matched with $geometry shapes, which their 2dsphere
+    index answers, legacy GeoPointField pairs with the 2d $box and $polygon
+    """
+    near = args.get('near')
+    max_distance = args.get('max_distance')
+    within_box = args.get('within_box')
+    within_polygon = args.get('within_polygon')
+    legacy = isinstance(field, GeoPointField)
+    kwargs = {}
+
+    if max_distance is not None and near is None:
+        raise Exception('"maxDistance" is only valid along with "near"')
+    if within_box is not None and within_polygon is not None:
+        raise Exception('"withinBox" and "withinPolygon" can not be combined')
+
+    if near is not None:
+        kwargs[f'{name}__near'] = get_position(near, 'near')
+        if max_distance is not None:
+            kwargs[f'{name}__max_distance'] = max_distance
+
+    # MongoEngine compiles the legacy shapes to the deprecated $within operator
+    if within_box is not None:
+        if legacy:
+            kwargs['__raw__'] = {field.db_field: {'$geoWithin': {'$box': get_box(within_box)}}}
+        else:
+            kwargs[f'{name}__geo_within'] = get_box_polygon(within_box)
+
+    if within_polygon is not None:
+        if legacy:
+            kwargs['__raw__'] = {field.db_field: {'$geoWithin': {'$polygon': get_ring(within_polygon)}}}
+        else:
+            kwargs[f'{name}__geo_within'] = {'type': 'Polygon', 'coordinates': [get_ring(within_polygon)]}
+
+    return kwargs
+
+
+def get_near_condition(near, max_distance):
+    """ Returns the $geoWithin condition matching the documents a $near
+    condition matches, all the documents holding the field without max_distance
+    """
+    if max_distance is None:
+        return {'$exists': True}
+    if isinstance(near, dict):
+        return {'$geoWithin': {'$centerSphere': [near['$geometry']['coordinates'], max_distance / EARTH_RADIUS_METERS]}}
+    return {'$geoWithin': {'$center': [near, max_distance]}}
+
+
+def get_count_query(query):
+    """ Returns query with its $near conditions, which count commands reject,
+    replaced by the :get_near_condition: matching the same documents
+    """
+    count_query = {}
+    near_conditions = []
+
+    for key, value in query.items():
+        if key in ('$and', '$or', '$nor'):
+            count_query[key] = [get_count_query(item) for item in value]
+        elif isinstance(value, dict) and '$near' in value:
+            value = dict(value)
+            near = value.pop('$near')
+            max_distance = value.pop('$maxDistance', None)
+            if isinstance(near, dict):
+                max_distance = near.get('$maxDistance', max_distance)
+            if value:
+                count_query[key] = value
+            near_conditions.append({key: get_near_condition(near, max_distance)})
+        else:
+            count_query[key] = value
+
+    if near_conditions:
+        count_query['$and'] = count_query.get('$and', []) + near_conditions
+
+    return count_query
+
+
+def is_near_query(query):
+    """ Returns whether query has a $near condition """
+    return any(
+        key in ('$and', '$or', '$nor') and any(is_near_query(item) for item in value)
+        or isinstance(value, dict) and '$near' in value
+        for key, value in query.items()
+    )
@@ -0,0 +1,78 @@
+""" Per request identity map of the documents loaded by primary key """
+
+from mongoengine import ValidationError
+from mongoengine.queryset.field_list import QueryFieldList
+
+from .utils import get_request_cache
+
+# pylint: disable=W0212
+
+
+def get_identity_map(context):
+    """ Returns the identity map of the current request, a dict mapping
+    (document class, primary key) to (document, loaded fields).
+    Returns None when the request context can not hold it
+    """
+    return get_request_cache(context, 'documents')
+
+
+def get_loaded_fields(queryset):
+    """ Returns the db field names the documents of queryset are loaded with,
+    None when they are loaded with all their fields
+    """
+    loaded_fields = queryset._loaded_fields
+    if not loaded_fields:
+        return None
+    if loaded_fields.value == QueryFieldList.ONLY and not loaded_fields.slice:
+        fields = frozenset(loaded_fields.fields)
+        document_fields = {field.db_field for field in queryset._document._fields.values()}
+        return None if document_fields <= fields | {'_id'} else fields
+    # Excluded or sliced fields, the documents only answer the same query
+    return frozenset()
+
+
+def covers(loaded_fields, fields):
+    """ Whether documents loaded with loaded_fields hold the given fields """
+    return loaded_fields is None or (fields is not None and fields <= loaded_fields)
+
+
+def normalize_pk(document, pk):
+    """ Converts a primary key (e.g. a string from a global id) to its stored type,
+    returns None when it is not a valid primary key for document
+    """
+    id_field = document._fields[document._meta['id_field']]
+    pk = id_field.to_python(pk)
+    try:
+        id_field.validate(pk)
+    except ValidationError:
+        return None
+    return pk
+
+
+def get_identity(identity_map, document, pk, fields=None):
+    """ Returns the document of the given class and primary key already loaded
+    in this request with (at least) the given fields, None if there is none
+    """
+    if identity_map is None:
+        return None
+
+    entry = identity_map.get((document, pk))
+    if entry is None or not covers(entry[1], fields):
+        return None
+    return entry[0]
+
+
+def add_identity(identity_map, document, instance, fields=None):
+    """ Adds instance to the identity map, unless a document with more fields
+    is already held for its primary key. Returns the instance held
+    """
+    if identity_map is None or instance is None:
+        return instance
+
+    key = (document, instance.pk)
+    entry = identity_map.get(key)
+    if entry is not None and covers(entry[1], fields):
+        return entry[0]
+
+    identity_map[key] = (instance, fields)
+    return instance
@@ -0,0 +1,251 @@
+""" Per request instrumentation: the time spent resolving each field path, and the
+Mongo commands each one issued, recorded by a pymongo command listener.
+
+    listener = InstrumentationListener(slow_ms=100)
+    connect(db, event_listeners=[listener])
+    schema.execute(query, context_value=context, middleware=[InstrumentationMiddleware()])
+    get_request_metrics(context).as_dict()
+"""
+
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import bson
+
+from pymongo import monitoring
+
+from .utils import get_request_cache
+
+# pylint: disable=W0212,C0103
+
+# (request metrics, field path) the running code works for
+__instrumentation_context = ContextVar('graphene_mongoengine_instrumentation', default=None)
+
+EXPLAINABLE_COMMANDS = ('find', 'aggregate', 'count', 'distinct')
+
+
+def get_instrumentation_context():
+    """ Returns the (request metrics, field path) commands are attributed to,
+    None outside of instrumented resolvers
+    """
+    return __instrumentation_context.get()
+
+
+@contextmanager
+def use_instrumentation_context(instrumentation_context):
+    """ Attributes the commands issued in the block to (request metrics, field path) """
+    token = __instrumentation_context.set(instrumentation_context)
+    try:
+        yield
+    finally:
+        __instrumentation_context.reset(token)
+
+
+def get_field_path(path):
+    """ Returns the field path of a resolver path, without list indexes """
+    return '.'.join(str(key) for key in path if not isinstance(key, int))
+
+
+class CommandMetrics(object):
+    """ A Mongo command issued while resolving a field """
+
+    def __init__(self, name, database, path, command=None):
+        self.name = name
+        self.database = database
+        self.path = path
+        self.command = command
+        self.duration = None
+        self.documents = 0
+        self.bytes = 0
+        self.failure = None
+        self.explain = None
+
+    def as_dict(self):
+        """ Returns the metrics as a dict """
+        return {
+            'name': self.name,
+            'path': self.path,
+            'duration': self.duration,
+            'documents': self.documents,
+            'bytes': self.bytes,
+            'failure': self.failure,
+            'explain': self.explain,
+        }
+
+
+class FieldMetrics(object):
+    """ Totals of the resolutions of a field path """
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.time = 0.0
+        self.commands = 0
+        self.command_time = 0.0
+        self.documents = 0
+        self.bytes = 0
+
+    def as_dict(self):
+        """ Returns the metrics as a dict """
+        return {
+            'calls': self.calls,
+            'time': self.time,
+            'commands': self.commands,
+            'command_time': self.command_time,
+            'documents': self.documents,
+            'bytes': self.bytes,
+        }
+
+
+class RequestMetrics(object):
+    """ Metrics of a request, by field path """
+
+    def __init__(self):
+        self.fields = OrderedDict()
+        self.commands = []
+
+    def get_field(self, path):
+        """ Returns the :FieldMetrics: of a field path """
+        field = self.fields.get(path)
+        if field is None:
+            field = self.fields[path] = FieldMetrics(path)
+        return field
+
+    def add_resolution(self, path, elapsed):
+        """ Records a resolver call of a field path """
+        field = self.get_field(path)
+        field.calls += 1
+        field.time += elapsed
+
+    def add_command(self, command):
+        """ Records a finished command """
+        self.commands.append(command)
+
+        field = self.get_field(command.path)
+        field.commands += 1
+        field.command_time += command.duration or 0.0
+        field.documents += command.documents
+        field.bytes += command.bytes
+
+    @property
+    def slow_commands(self):
+        """ Returns the commands kept for explain, those slower than the listener slow_ms """
+        return [command for command in self.commands if command.command is not None]
+
+    def explain_slow_commands(self, client, verbosity='queryPlanner'):
+        """ Runs explain for the slow commands with client, the winning plans are
+        set on them (a COLLSCAN stage is a collection scan)
+        """
+        for command in self.slow_commands:
+            if command.name in EXPLAINABLE_COMMANDS and command.explain is None:
+                # Session and cluster time fields are added per command
+                explained = {
+                    key: value for key, value in command.command.items()
+                    if not key.startswith('$') and key != 'lsid'
+                }
+                explain = client[command.database].command('explain', explained, verbosity=verbosity)
+                command.explain = explain.get('queryPlanner', {}).get('winningPlan', explain)
+        return self.slow_commands
+
+    def as_dict(self):
+        """ Returns the field metrics by path and the slow commands as dicts """
+        return {
+            'fields': OrderedDict((path, field.as_dict()) for path, field in self.fields.items()),
+            'commands': len(self.commands),
+            'slow_commands': [command.as_dict() for command in self.slow_commands],
+        }
+
+
+def get_request_metrics(context):
+    """ Returns the :RequestMetrics: of the request, None when the context can not hold them """
+    request_cache = get_request_cache(context, 'instrumentation')
+    if request_cache is None:
+        return None
+    if 'metrics' not in request_cache:
+        request_cache['metrics'] = RequestMetrics()
+    return request_cache['metrics']
+
+
+class InstrumentationMiddleware(object):
+    """ Graphene middleware timing the resolvers of each field path, and attributing
+    the Mongo commands issued meanwhile to it. Resolvers returning promises are
+    timed until they return them, the batched loads are attributed to the path
+    of their first load
+    """
+
+    def resolve(self, next, root, info, **args):  # pylint: disable=W0622
+        metrics = get_request_metrics(info.context)
+        if metrics is None:
+            return next(root, info, **args)
+
+        path = get_field_path(info.path)
+        start = time.perf_counter()
+        try:
+            with use_instrumentation_context((metrics, path)):
+                return next(root, info, **args)
+        finally:
+            metrics.add_resolution(path, time.perf_counter() - start)
+
+
+def get_reply_documents(reply):
+    """ Returns the number of documents in a cursor command reply """
+    cursor = reply.get('cursor')
+    if isinstance(cursor, dict):
+        return len(cursor.get('firstBatch', cursor.get('nextBatch', ())))
+    return 0
+
+
+class InstrumentationListener(monitoring.CommandListener):
+    """ pymongo command listener recording the commands issued for instrumented
+    requests. Commands slower than slow_ms are kept for explain, and passed to
+    on_slow_command when given. Reply sizes are only measured with count_bytes,
+    since it encodes every reply again. Register it with `connect(event_listeners=[...])`
+    """
+
+    def __init__(self, slow_ms=None, on_slow_command=None, count_bytes=False):
+        self.slow_ms = slow_ms
+        self.on_slow_command = on_slow_command
+        self.count_bytes = count_bytes
+        self._started = {}
+
+    def started(self, event):
+        instrumentation_context = get_instrumentation_context()
+        if instrumentation_context is None:
+            return
+
+        metrics, path = instrumentation_context
+        command = CommandMetrics(event.command_name, event.database_name, path)
+        if self.slow_ms is not None:
+            command.command = event.command
+        self._started[(event.connection_id, event.request_id)] = (metrics, command)
+
+    def finish(self, event, reply=None, failure=None):
+        """ Records a succeeded or failed command """
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+
+        metrics, command = started
+        command.duration = event.duration_micros / 1e6
+        command.failure = failure
+        if reply is not None:
+            command.documents = get_reply_documents(reply)
+            if self.count_bytes:
+                command.bytes = len(bson.encode(reply))
+
+        if self.slow_ms is not None and command.duration * 1000 < self.slow_ms:
+            command.command = None
+
+        metrics.add_command(command)
+
+        if command.command is not None and self.on_slow_command is not None:
+            self.on_slow_command(command)
+
+    def succeeded(self, event):
+        self.finish(event, reply=event.reply)
+
+    def failed(self, event):
+        self.finish(event, failure=event.failure)
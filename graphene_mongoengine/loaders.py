@@ -0,0 +1,294 @@
+""" Per request DataLoaders batching MongoEngine document lookups """
+
+import asyncio
+
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from .cache import get_result_cache
+from .instrumentation import get_instrumentation_context, use_instrumentation_context
+from .identity import get_identity_map, get_identity, add_identity, get_loaded_fields
+from .parallel import get_parallel_executor
+from .references import keep_stored_references
+from .utils import RawDocument, get_query, get_request_cache
+
+# pylint: disable=W0212
+
+
+class InstrumentedLoader(DataLoader, metaclass=ABCMeta):
+    """ DataLoader attributing each batch to the field path of its first load,
+    subclasses fetch the batches in load_batch
+    """
+
+    instrumentation_context = None
+
+    def __new__(cls, *args, **kwargs):
+        # DataLoader is a threading.local, whose __new__ skips the abstract methods check
+        if cls.__abstractmethods__:
+            raise TypeError(f"Can't instantiate abstract class {cls.__name__} "
+                            f"with abstract methods {', '.join(sorted(cls.__abstractmethods__))}")
+        return super(InstrumentedLoader, cls).__new__(cls, *args, **kwargs)
+
+    def load(self, key=None):
+        if self.instrumentation_context is None:
+            self.instrumentation_context = get_instrumentation_context()
+        return super(InstrumentedLoader, self).load(key)
+
+    def batch_load_fn(self, keys):
+        instrumentation_context, self.instrumentation_context = self.instrumentation_context, None
+        with use_instrumentation_context(instrumentation_context):
+            return self.load_batch(keys)
+
+    @abstractmethod
+    def load_batch(self, keys):
+        """ Returns a promise for the values of keys """
+
+
+class DocumentLoader(InstrumentedLoader):
+    """ Loads documents of a given class by primary key, the keys requested
+    during the same execution tick are fetched with a single $in query.
+    Documents already in the request identity map are not fetched again
+    """
+
+    def __init__(self, document, context=None, **kwargs):
+        super(DocumentLoader, self).__init__(**kwargs)
+        self.document = document
+        self.context = context
+
+    def get_query(self, keys):
+        """ Returns the QuerySet fetching the documents with the given keys """
+        return keep_stored_references(get_query(self.document, self.context).filter(pk__in=keys))
+
+    def load_batch(self, keys):
+        identity_map = get_identity_map(self.context)
+
+        documents = {}
+        for key in keys:
+            document = get_identity(identity_map, self.document, key)
+            if document is not None:
+                documents[key] = document
+
+        missing_keys = [key for key in keys if key not in documents]
+        if not missing_keys:
+            return Promise.resolve([documents.get(key) for key in keys])
+
+        queryset = self.get_query(missing_keys)
+        fields = get_loaded_fields(queryset)
+
+        def get_documents(fetched):
+            for document in fetched:
+                documents[document.pk] = add_identity(identity_map, self.document, document, fields)
+            return [documents.get(key) for key in keys]
+
+        executor = get_parallel_executor()
+        if executor is not None:
+            return executor.submit(list, queryset).then(get_documents)
+
+        return Promise.resolve(get_documents(queryset))
+
+
+def get_document_loader(context, document):
+    """ Returns the :DocumentLoader: for document in the current request,
+    or None when the request context can not hold loaders
+    """
+    loaders = get_request_cache(context, 'loaders')
+    if loaders is None:
+        return None
+
+    loader = loaders.get(document)
+    if loader is None:
+        loader = loaders[document] = DocumentLoader(document, context)
+    return loader
+
+
+class NodeBatch(object):
+    """ The lookups of the nodes of object_type for (primary key, projection) keys.
+    Documents in the request identity map (or in the result cache of object_type)
+    are found up front, the others are fetched with the single $in query of
+    queryset, loading the union of the projections. queryset is None when
+    all the nodes were found
+    """
+
+    def __init__(self, object_type, info, keys):
+        self.object_type = object_type
+        self.keys = keys
+        self.document = document = object_type._meta.document
+        self.identity_map = identity_map = get_identity_map(info.context)
+
+        queryset = object_type.get_query(info)
+        # Filtered queries may exclude documents loaded elsewhere in the request
+        lookup_map = None if queryset._query else identity_map
+
+        def get_projected_query(projection):
+            if projection is None or queryset._loaded_fields:
+                return queryset
+            return queryset.only(*projection)
+
+        projection_fields = {
+            projection: get_loaded_fields(get_projected_query(projection))
+            for projection in {projection for _, projection in keys}
+        }
+
+        self.found = found = {}
+        for key in keys:
+            instance = get_identity(lookup_map, document, key[0], projection_fields[key[1]])
+            if instance is not None:
+                found[key] = instance
+
+        self.result_cache = result_cache = get_result_cache(object_type._meta.cache)
+        self.cache_keys = cache_keys = {}
+        if result_cache is not None:
+            for key in keys:
+                if key in found:
+                    continue
+                fields = projection_fields[key[1]]
+                cache_keys[key] = result_cache.get_key(
+                    'node', [document], object_type._meta.name, queryset._query, key[0], fields
+                )
+                instance = result_cache.get(cache_keys[key])
+                if instance is not None:
+                    as_pymongo = object_type._meta.as_pymongo
+                    found[key] = instance if as_pymongo else add_identity(identity_map, document, instance, fields)
+
+        missing_pks = OrderedDict.fromkeys(pk for pk, projection in keys if (pk, projection) not in found)
+
+        self.queryset = None
+        if missing_pks:
+            projections = {projection for pk, projection in keys if pk in missing_pks}
+            union = None if None in projections else frozenset().union(*projections)
+
+            self.queryset = get_projected_query(union).filter(pk__in=list(missing_pks))
+            if object_type._meta.as_pymongo:
+                self.queryset = self.queryset.as_pymongo()
+            else:
+                self.queryset = keep_stored_references(self.queryset)
+
+    def resolve(self, documents):
+        """ Returns the nodes for the batch keys, in order and None for the missing
+        ones, given the documents fetched with queryset
+        """
+        fetched = {}
+        if self.object_type._meta.as_pymongo:
+            # Raw documents are not held by the identity map
+            fetched = {son['_id']: RawDocument(self.object_type, son) for son in documents}
+        elif self.queryset is not None:
+            fields = get_loaded_fields(self.queryset)
+            for instance in documents:
+                fetched[instance.pk] = add_identity(self.identity_map, self.document, instance, fields)
+
+        for key, cache_key in self.cache_keys.items():
+            if key not in self.found and fetched.get(key[0]) is not None:
+                self.result_cache.set(cache_key, fetched[key[0]])
+
+        return [self.found[key] if key in self.found else fetched.get(key[0]) for key in self.keys]
+
+
+def fetch_nodes(object_type, info, keys):
+    """ Returns the documents of object_type for (primary key, projection) keys,
+    in order and None for the missing ones, see :NodeBatch:
+    """
+    batch = NodeBatch(object_type, info, keys)
+    return batch.resolve(batch.queryset if batch.queryset is not None else ())
+
+
+async def fetch_async_nodes(object_type, info, keys, backend):
+    """ Async variant of :fetch_nodes:, fetching with backend """
+    batch = NodeBatch(object_type, info, keys)
+    return batch.resolve(await backend.fetch(batch.queryset) if batch.queryset is not None else ())
+
+
+class NodeLoader(InstrumentedLoader):
+    """ Loads the nodes of a MongoEngineObjectType by (primary key, projection),
+    the nodes requested during the same execution tick are fetched with
+    a single $in query
+    """
+
+    def __init__(self, object_type, info, **kwargs):
+        super(NodeLoader, self).__init__(**kwargs)
+        self.object_type = object_type
+        self.info = info
+
+    def load_batch(self, keys):
+        executor = get_parallel_executor()
+        if executor is None:
+            return Promise.resolve(fetch_nodes(self.object_type, self.info, keys))
+
+        batch = NodeBatch(self.object_type, self.info, keys)
+        if batch.queryset is None:
+            return Promise.resolve(batch.resolve(()))
+        return executor.submit(list, batch.queryset).then(batch.resolve)
+
+
+def get_node_loader(info, object_type):
+    """ Returns the :NodeLoader: for object_type in the current request,
+    or None when the request context can not hold loaders
+    """
+    loaders = get_request_cache(info.context, 'node_loaders')
+    if loaders is None:
+        return None
+
+    loader = loaders.get(object_type)
+    if loader is None:
+        loader = loaders[object_type] = NodeLoader(object_type, info)
+    return loader
+
+
+class AsyncNodeLoader(object):
+    """ Async variant of :NodeLoader:, the nodes requested while the sibling
+    fields start resolving are fetched with a single $in query by backend
+    """
+
+    def __init__(self, object_type, info, backend):
+        self.object_type = object_type
+        self.info = info
+        self.backend = backend
+        self.pending = OrderedDict()
+
+    async def load_many(self, keys):
+        """ Returns the nodes for keys, in order and None for the missing ones """
+        loop = asyncio.get_event_loop()
+
+        futures = []
+        for key in keys:
+            future = self.pending.get(key)
+            if future is None:
+                if not self.pending:
+                    loop.call_soon(self.dispatch)
+                future = self.pending[key] = loop.create_future()
+            futures.append(future)
+
+        return await asyncio.gather(*futures)
+
+    def dispatch(self):
+        """ Fetches the pending keys, past lookups are not kept """
+        batch, self.pending = self.pending, OrderedDict()
+        asyncio.ensure_future(self.load_batch(batch))
+
+    async def load_batch(self, batch):
+        """ Resolves the futures of batch """
+        try:
+            nodes = await fetch_async_nodes(self.object_type, self.info, list(batch), self.backend)
+        except Exception as error:  # pylint: disable=W0703
+            for future in batch.values():
+                future.set_exception(error)
+            return
+
+        for future, node in zip(batch.values(), nodes):
+            future.set_result(node)
+
+
+def get_async_node_loader(info, object_type, backend):
+    """ Returns the :AsyncNodeLoader: for object_type in the current request,
+    or None when the request context can not hold loaders
+    """
+    loaders = get_request_cache(info.context, 'async_node_loaders')
+    if loaders is None:
+        return None
+
+    loader = loaders.get(object_type)
+    if loader is None:
+        loader = loaders[object_type] = AsyncNodeLoader(object_type, info, backend)
+    return loader
@@ -0,0 +1,141 @@
+""" Relay node and nodes fields, fetching the nodes of each type with a single query """
+
+import asyncio
+
+from collections import OrderedDict
+from functools import partial
+
+from graphene import Field, ID, List, NonNull
+from graphene.relay import Node
+from graphene.relay.node import NodeField as RelayNodeField
+from graphene.types.utils import get_type
+
+from promise import Promise
+
+# pylint: disable=W0622,W0703
+
+
+def get_node_type(node_interface, info, global_id):
+    """ Returns the (type, id) a global id refers to,
+    (None, None) if it does not refer to a node_interface implementation
+    """
+    try:
+        type_name, id = node_interface.from_global_id(global_id)
+        graphene_type = info.schema.get_type(type_name).graphene_type
+    except Exception:
+        return None, None
+
+    if node_interface not in graphene_type._meta.interfaces:  # pylint: disable=W0212
+        return None, None
+
+    return graphene_type, id
+
+
+def get_type_nodes(graphene_type, info, ids):
+    """ Returns a promise for the nodes of graphene_type with the given ids,
+    fetched in a single batch when the type supports it. Types resolved
+    with asyncio return a coroutine instead
+    """
+    load_nodes = getattr(graphene_type, 'load_nodes', None)
+    if load_nodes:
+        nodes = load_nodes(info, ids)
+    else:
+        nodes = [graphene_type.get_node(info, id) for id in ids]
+        if any(asyncio.iscoroutine(node) for node in nodes):
+            return gather_nodes(nodes)
+
+    if asyncio.iscoroutine(nodes):
+        return nodes
+    return Promise.resolve(nodes).then(Promise.all)
+
+
+async def await_node(node):
+    """ Returns the value of a node given as a promise or a coroutine """
+    if isinstance(node, Promise) or asyncio.iscoroutine(node):
+        return await node
+    return node
+
+
+async def gather_nodes(nodes):
+    """ Returns the values of nodes, awaited concurrently """
+    return await asyncio.gather(*[await_node(node) for node in nodes])
+
+
+def resolve_nodes(node_interface, root, info, ids):
+    """ Resolves the nodes for a list of global ids, in order and null
+    for the ids that do not refer to an existing node
+    """
+    requested = [get_node_type(node_interface, info, global_id) for global_id in ids]
+
+    type_ids = OrderedDict()
+    for graphene_type, id in requested:
+        if graphene_type is not None:
+            type_ids.setdefault(graphene_type, OrderedDict())[id] = None
+
+    def get_ordered_nodes(type_nodes):
+        nodes = {
+            (graphene_type, id): node
+            for graphene_type, nodes in zip(type_ids, type_nodes)
+            for id, node in zip(type_ids[graphene_type], nodes)
+        }
+        return [nodes.get(key) for key in requested]
+
+    type_nodes = [
+        get_type_nodes(graphene_type, info, list(ids))
+        for graphene_type, ids in type_ids.items()
+    ]
+
+    if any(asyncio.iscoroutine(nodes) for nodes in type_nodes):
+        async def get_async_nodes():
+            return get_ordered_nodes(await gather_nodes(type_nodes))
+
+        return get_async_nodes()
+
+    return Promise.all(type_nodes).then(get_ordered_nodes)
+
+
+def resolve_node(node_interface, only_type, root, info, id):
+    """ Resolves the node for a global id, null when it does not refer to
+    an existing node. Types with a load_node method are loaded through it,
+    so the node lookups of an execution tick are coalesced
+    """
+    graphene_type, id = get_node_type(node_interface, info, id)
+    if graphene_type is None:
+        return None
+
+    if only_type:
+        assert graphene_type == only_type, f'Must receive a {only_type._meta.name} id.'  # pylint: disable=W0212
+
+    load_node = getattr(graphene_type, 'load_node', None)
+    if load_node:
+        return load_node(info, id)
+    return graphene_type.get_node(info, id)
+
+
+class NodeField(RelayNodeField):
+    """ Relay node field whose MongoEngineObjectTypes lookups are batched,
+    the node fields resolved in the same tick are fetched with one query per type
+    """
+
+    def __init__(self, node=Node, type=False, **kwargs):
+        super(NodeField, self).__init__(node, type, **kwargs)
+
+    def get_resolver(self, parent_resolver):
+        return partial(resolve_node, self.node_type, get_type(self.field_type))
+
+
+class NodesField(Field):
+    """ Field returning the nodes for a list of global ids. The ids are
+    grouped by type, MongoEngineObjectTypes fetch each group with one query
+    """
+
+    def __init__(self, node=Node, **kwargs):
+        super(NodesField, self).__init__(
+            NonNull(List(node)),
+            ids=NonNull(List(NonNull(ID), description='The IDs of the objects')),
+            **kwargs
+        )
+        self.node_interface = node
+
+    def get_resolver(self, parent_resolver):
+        return partial(resolve_nodes, self.node_interface)
@@ -0,0 +1,146 @@
+""" orderBy argument for MongoEngine connection fields, applied with QuerySet.order_by """
+
+from collections import OrderedDict
+
+from graphene import Enum
+
+from .filters import get_field_lookups
+from .utils import get_document_fields
+
+# pylint: disable=W0212,C0103
+
+PK_INDEX_SPEC = {'fields': [('_id', 1)], 'unique': True}
+
+
+def get_index_specs(document):
+    """ Returns the index specs of document, including the _id index """
+    return [PK_INDEX_SPEC] + list(document._meta.get('index_specs') or ())
+
+
+def get_db_field_name(document, name):
+    """ Returns the db field name of a document field, pk is _id """
+    if name == 'pk':
+        return '_id'
+    return get_document_fields(document)[name].db_field
+
+
+def get_sortable_fields(object_type, order_by_fields=True, indexed_only=False):
+    """ Returns the names of the document fields of object_type that can be sorted by,
+    restricted to the order_by_fields names unless it is True. With indexed_only,
+    only the fields whose ordering (with its primary key tie breaker) is served
+    by an index are kept, see :get_ordering:
+    """
+    document = object_type._meta.document
+    document_fields = get_document_fields(document)
+    id_field = document._meta.get('id_field')
+
+    if order_by_fields is True:
+        order_by_fields = [
+            name for name, field in document_fields.items()
+            if name != id_field and name in object_type._meta.fields and get_field_lookups(field)
+        ]
+    else:
+        for name in order_by_fields:
+            assert get_field_lookups(document_fields.get(name)), (
+                f'Field "{name}" of {document.__name__} can not be sorted by'
+            )
+
+    if indexed_only:
+        order_by_fields = [
+            name for name in order_by_fields
+            if is_indexed_ordering(document, get_ordering(document, [f'+{name}']))
+        ]
+
+    return ['pk'] + [name for name in order_by_fields if name != 'pk']
+
+
+__order_by_enums = {}
+
+
+def get_order_by_enum(object_type, order_by_fields=True, indexed_only=False):
+    """ Returns the Enum of the sort keys of object_type, values are
+    QuerySet.order_by keys. Memoized, object types do not change once created
+    """
+    sortable_fields = tuple(get_sortable_fields(object_type, order_by_fields, indexed_only))
+
+    key = (object_type, sortable_fields)
+    if key not in __order_by_enums:
+        values = []
+        for name in sortable_fields:
+            enum_name = 'ID' if name == 'pk' else name.upper()
+            values += [(f'{enum_name}_ASC', f'+{name}'), (f'{enum_name}_DESC', f'-{name}')]
+
+        # Types sorted by different fields in different connections need distinct enum names
+        enum_name = f'{object_type._meta.name}{"Indexed" if indexed_only else ""}OrderBy'
+        enum_names = {enum._meta.name for enum in __order_by_enums.values()}
+        enum_name += str(sum(1 for name in enum_names if name.rstrip('0123456789') == enum_name) or '')
+
+        __order_by_enums[key] = Enum(enum_name, values)
+
+    return __order_by_enums[key]
+
+
+def get_ordering_fields(order_by):
+    """ Returns the (field name, direction) pairs of QuerySet.order_by keys,
+    only the first key of each field is kept
+    """
+    ordering_fields = OrderedDict()
+    for key in order_by:
+        ordering_fields.setdefault(key.lstrip('+-'), -1 if key.startswith('-') else 1)
+    return tuple(ordering_fields.items())
+
+
+def is_index_prefix(document, ordering_fields, spec):
+    """ Whether the index spec can return documents in ordering_fields order """
+    index_fields = spec['fields']
+    if len(ordering_fields) > len(index_fields):
+        return False
+
+    same_direction = opposite_direction = True
+    for (name, direction), (db_field, index_direction) in zip(ordering_fields, index_fields):
+        if get_db_field_name(document, name) != db_field or index_direction not in (1, -1):
+            return False
+        same_direction &= direction == index_direction
+        opposite_direction &= direction == -index_direction
+
+    return same_direction or opposite_direction
+
+
+def is_indexed_ordering(document, ordering_fields):
+    """ Whether a prefix of one of the document indexes serves ordering_fields """
+    return any(is_index_prefix(document, ordering_fields, spec) for spec in get_index_specs(document))
+
+
+def is_unique_ordering(document, ordering_fields):
+    """ Whether no two documents share the values of ordering_fields """
+    names = {get_db_field_name(document, name) for name, _ in ordering_fields}
+    return any(
+        spec.get('unique') and {db_field for db_field, _ in spec['fields']} <= names
+        for spec in get_index_specs(document)
+    )
+
+
+def get_ordering(document, order_by, strict=False):
+    """ Returns the (field name, direction) pairs to sort document by for the
+    orderBy argument values. The primary key is appended as tie breaker, unless
+    the fields are unique, so offset and keyset cursors always select the same
+    documents. In strict mode, orderings not served by an index prefix are rejected
+    """
+    ordering_fields = get_ordering_fields(order_by)
+    if not ordering_fields:
+        return ordering_fields
+
+    if not is_unique_ordering(document, ordering_fields):
+        ordering_fields += (('pk', ordering_fields[-1][1]),)
+    else:
+        # Fields after a unique prefix can not change the order
+        for index in range(1, len(ordering_fields) + 1):
+            if is_unique_ordering(document, ordering_fields[:index]):
+                ordering_fields = ordering_fields[:index]
+                break
+
+    if strict and not is_indexed_ordering(document, ordering_fields):
+        sort_keys = ', '.join(f"{'-' if direction < 0 else ''}{name}" for name, direction in ordering_fields)
+        raise Exception(f'Sorting {document.__name__} by ({sort_keys}) is not covered by an index')
+
+    return ordering_fields
@@ -0,0 +1,262 @@
+""" Pagination helpers for MongoEngine backed connections """
+
+from bson import json_util
+
+from graphql_relay.connection.arrayconnection import get_offset_with_default
+from graphql_relay.utils import base64, unbase64, is_str
+
+from mongoengine import Q, QuerySet
+
+from .geo import get_count_query, is_near_query
+
+# pylint: disable=W0212
+
+
+def get_offset_window(args, list_length):
+    """ Returns the (start, end) offsets selected by the relay
+    first/after/last/before arguments over a list of list_length items
+    """
+    before = args.get('before')
+    after = args.get('after')
+    first = args.get('first')
+    last = args.get('last')
+
+    before_offset = get_offset_with_default(before, list_length)
+    after_offset = get_offset_with_default(after, -1)
+
+    start_offset = max(after_offset, -1) + 1
+    end_offset = min(before_offset, list_length)
+
+    if isinstance(first, int):
+        end_offset = min(end_offset, start_offset + first)
+    if isinstance(last, int):
+        start_offset = max(start_offset, end_offset - last)
+
+    return start_offset, max(start_offset, end_offset)
+
+
+def get_list_slice(iterable, start_offset, end_offset):
+    """ Returns the items between start_offset and end_offset, all the items
+    from start_offset when end_offset is None. QuerySets are sliced before
+    evaluation, which turns the window into a skip/limit cursor, so only
+    the documents in the window are fetched
+    """
+    if end_offset is not None and end_offset <= start_offset:
+        return []
+    return list(iterable[start_offset:end_offset])
+
+
+KEYSET_PREFIX = 'keyset:'
+
+
+class KeysetPage(object):
+    """ A page of documents fetched with keyset pagination """
+
+    def __init__(self, nodes, cursors, has_previous_page, has_next_page):
+        self.nodes = nodes
+        self.cursors = cursors
+        self.has_previous_page = has_previous_page
+        self.has_next_page = has_next_page
+
+
+def get_keyset_fields(keyset):
+    """ Returns the (field name, direction) pairs a keyset is ordered by.
+    The keyset is a field name, optionally prefixed with '-' for descending
+    order; the primary key is appended as tie breaker
+    """
+    if keyset is True:
+        keyset = 'pk'
+
+    direction = -1 if keyset.startswith('-') else 1
+    name = keyset.lstrip('+-')
+
+    if name in ('pk', 'id'):
+        return (('pk', direction),)
+
+    return ((name, direction), ('pk', direction))
+
+
+def get_keyset_ordering(keyset_fields, reverse=False):
+    """ Returns QuerySet.order_by keys for the keyset fields """
+    return [
+        f"{'-' if (direction < 0) != reverse else '+'}{name}"
+        for name, direction in keyset_fields
+    ]
+
+
+def get_keyset_values(node, keyset_fields, document=None):
+    """ Returns the keyset values of a document, or of a raw (as_pymongo) document of class document """
+    if isinstance(node, dict):
+        from .resolvers import get_raw_value
+
+        id_field = document._meta['id_field']
+        return [get_raw_value(document, node, id_field if name == 'pk' else name) for name, _ in keyset_fields]
+
+    return [getattr(node, name) for name, _ in keyset_fields]
+
+
+def keyset_to_cursor(node, keyset_fields, document=None):
+    """ Creates the cursor string from a document keyset values,
+    along with the ordering they are valid for
+    """
+    values = get_keyset_values(node, keyset_fields, document)
+    return base64(KEYSET_PREFIX + json_util.dumps([get_keyset_ordering(keyset_fields), values]))
+
+
+def cursor_to_keyset(cursor, keyset_fields):
+    """ Rederives the keyset values from the cursor string, returns None for
+    missing or invalid cursors, and for cursors created under another ordering
+    """
+    if not is_str(cursor):
+        return None
+
+    try:
+        cursor = unbase64(cursor)
+        assert cursor.startswith(KEYSET_PREFIX)
+        ordering, values = json_util.loads(cursor[len(KEYSET_PREFIX):])
+    except Exception:
+        return None
+
+    if ordering != get_keyset_ordering(keyset_fields) or not isinstance(values, list) \
+            or len(values) != len(keyset_fields):
+        return None
+
+    return values
+
+
+def get_keyset_filter(keyset_fields, values, after=True):
+    """ Returns a Q object matching the documents positioned after (or before)
+    the given keyset values in keyset order
+    """
+    query = None
+
+    for index, (name, direction) in enumerate(keyset_fields):
+        operator = 'gt' if (direction > 0) == after else 'lt'
+        conditions = {
+            previous_name: previous_value
+            for (previous_name, _), previous_value in zip(keyset_fields[:index], values)
+        }
+        conditions[f'{name}__{operator}'] = values[index]
+
+        query = Q(**conditions) if query is None else query | Q(**conditions)
+
+    return query
+
+
+def get_window_queryset(queryset, limit):
+    """ Returns queryset limited to limit + 1 documents, the extra one tells
+    whether there are more documents past the window
+    """
+    if limit is None:
+        return queryset
+    return queryset.limit(max(limit, 0) + 1)
+
+
+def fetch_window(queryset, limit):
+    """ Fetches up to limit + 1 documents, see :get_window_queryset: """
+    return list(get_window_queryset(queryset, limit))
+
+
+def get_keyset_window(queryset, args, keyset_fields):
+    """ Returns the (queryset, limit, reverse) window to fetch for the relay arguments.
+    after/before cursors are turned into range filters over the keyset
+    fields, so deep pages cost the same as the first one. Backward windows
+    (only last given) are fetched in reverse keyset order
+    """
+    after = cursor_to_keyset(args.get('after'), keyset_fields)
+    before = cursor_to_keyset(args.get('before'), keyset_fields)
+    first = args.get('first')
+    last = args.get('last')
+
+    if after is not None:
+        queryset = queryset.filter(get_keyset_filter(keyset_fields, after, after=True))
+    if before is not None:
+        queryset = queryset.filter(get_keyset_filter(keyset_fields, before, after=False))
+
+    if isinstance(first, int) or not isinstance(last, int):
+        forward_limit = first if isinstance(first, int) else None
+        return queryset.order_by(*get_keyset_ordering(keyset_fields)), forward_limit, False
+
+    return queryset.order_by(*get_keyset_ordering(keyset_fields, reverse=True)), last, True
+
+
+def create_keyset_page(nodes, args, keyset_fields, reverse, document):
+    """ Returns the :KeysetPage: for the nodes fetched in a :get_keyset_window: """
+    first = args.get('first')
+    last = args.get('last')
+    has_previous_page = has_next_page = False
+
+    if not reverse:
+        if isinstance(first, int):
+            has_next_page = len(nodes) > first
+            nodes = nodes[:max(first, 0)]
+        if isinstance(last, int):
+            has_previous_page = len(nodes) > last
+            nodes = nodes[max(len(nodes) - last, 0):]
+    else:
+        has_previous_page = len(nodes) > last
+        nodes = nodes[:max(last, 0)]
+        nodes.reverse()
+
+    cursors = [keyset_to_cursor(node, keyset_fields, document) for node in nodes]
+
+    return KeysetPage(nodes, cursors, has_previous_page, has_next_page)
+
+
+def get_keyset_page(queryset, args, keyset_fields):
+    """ Returns the :KeysetPage: selected by the relay arguments, see :get_keyset_window: """
+    window, limit, reverse = get_keyset_window(queryset, args, keyset_fields)
+    return create_keyset_page(fetch_window(window, limit), args, keyset_fields, reverse, queryset._document)
+
+
+def get_forward_window(args):
+    """ Returns the (start_offset, end_offset, page_size) window to fetch for the
+    relay arguments without knowing the list length. Only valid when `last` is
+    not given. end_offset is None for all the items after start_offset, page_size
+    is set when one extra item is fetched to answer hasNextPage
+    """
+    before = args.get('before')
+    after = args.get('after')
+    first = args.get('first')
+
+    start_offset = max(get_offset_with_default(after, -1), -1) + 1
+    before_offset = get_offset_with_default(before, None)
+
+    if not isinstance(first, int):
+        return start_offset, before_offset, None
+
+    end_offset = start_offset + first
+    if before_offset is not None and before_offset <= end_offset:
+        return start_offset, before_offset, None
+
+    return start_offset, end_offset + 1, max(end_offset - start_offset, 0)
+
+
+def get_forward_nodes(nodes, page_size):
+    """ Returns (nodes, has_next_page) for the nodes fetched in a :get_forward_window: """
+    if page_size is None:
+        return nodes, False
+    return nodes[:page_size], len(nodes) > page_size
+
+
+def get_forward_page(iterable, args):
+    """ Returns (start_offset, nodes, has_next_page) for the relay arguments,
+    see :get_forward_window:
+    """
+    start_offset, end_offset, page_size = get_forward_window(args)
+    nodes, has_next_page = get_forward_nodes(get_list_slice(iterable, start_offset, end_offset), page_size)
+    return start_offset, nodes, has_next_page
+
+
+def count_documents(iterable, estimated=False):
+    """ Returns the number of items in iterable. Unfiltered QuerySets
+    can use the collection metadata estimate instead of an exact count,
+    QuerySets with $near conditions are counted with :get_count_query:
+    """
+    if isinstance(iterable, QuerySet):
+        if estimated and not iterable._query:
+            return iterable._collection.estimated_document_count()
+        if is_near_query(iterable._query):
+            return iterable._collection.count_documents(get_count_query(iterable._query))
+        return iterable.count()
+    return len(iterable)
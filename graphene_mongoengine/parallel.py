@@ -0,0 +1,83 @@
+""" Thread pool execution of MongoEngine queries, so independent fields make
+their round trips in parallel without moving the application to asyncio
+"""
+
+import contextvars
+import threading
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from promise import Promise
+
+DEFAULT_MAX_WORKERS = 8
+
+__current = threading.local()
+
+# pylint: disable=C0103
+
+
+def get_parallel_executor():
+    """ Returns the :ParallelExecutor: executing a query on the current thread, if any """
+    return getattr(__current, 'executor', None)
+
+
+def set_parallel_executor(executor):
+    """ Sets the :ParallelExecutor: executing a query on the current thread """
+    __current.executor = executor
+
+
+class ParallelExecutor(object):
+    """ GraphQL executor running the Mongo round trips of the fields on a pool of
+    max_workers threads, pymongo clients being thread safe and pooled.
+    Connection fields, node lookups and reference loaders submit their queries
+    while the execution goes on with the sibling fields; the promises of their
+    results are settled on the executing thread once the queries return, so
+    the rest of the resolution stays on it. The executor can be shared across
+    requests, each executing thread waits for its own queries
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='graphene-mongoengine')
+        self.local = threading.local()
+
+    @property
+    def pending(self):
+        """ Returns the (future, promise) pairs submitted by the current thread """
+        pending = getattr(self.local, 'pending', None)
+        if pending is None:
+            pending = self.local.pending = {}
+        return pending
+
+    def submit(self, fn, *args, **kwargs):
+        """ Runs fn on the pool, in the current context, returns a promise for its result """
+        promise = Promise()
+        future = self.pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        self.pending[future] = promise
+        return promise
+
+    def execute(self, fn, *args, **kwargs):
+        set_parallel_executor(self)
+        return fn(*args, **kwargs)
+
+    def wait_until_finished(self):
+        pending = self.pending
+        try:
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    promise = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        promise.do_reject(error)
+                    else:
+                        promise.do_resolve(future.result())
+        finally:
+            pending.clear()
+            set_parallel_executor(None)
+
+    def clean(self):
+        self.pending.clear()
+
+    def shutdown(self, wait=True):  # pylint: disable=W0621
+        """ Stops the pool threads """
+        self.pool.shutdown(wait=wait)
@@ -0,0 +1,136 @@
+""" Projection of GraphQL selection sets into MongoEngine QuerySet.only() fields """
+
+from graphene.utils.str_converters import to_camel_case
+from graphql.language import ast
+
+from mongoengine.fields import EmbeddedDocumentField, EmbeddedDocumentListField, ListField
+
+from .utils import get_document_fields
+
+# pylint: disable=W0212
+
+
+def get_type_names(object_type):
+    """ Returns the names a fragment type condition can use to select object_type """
+    interfaces = getattr(object_type._meta, 'interfaces', ())
+    return {object_type._meta.name} | {interface._meta.name for interface in interfaces}
+
+
+def iter_selected_fields(info, selection_set, type_names=None):
+    """ Yields the field ASTs of a selection set, expanding the fragments
+    whose type condition is in type_names (all of them if type_names is None)
+    """
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.Field):
+            yield selection
+            continue
+
+        if isinstance(selection, ast.FragmentSpread):
+            selection = info.fragments[selection.name.value]
+
+        type_condition = selection.type_condition
+        if type_names is None or type_condition is None or type_condition.name.value in type_names:
+            yield from iter_selected_fields(info, selection.selection_set, type_names)
+
+
+def get_selection_sets(info, path=()):
+    """ Returns the selection sets found following the path of GraphQL
+    field names, starting from the field being resolved
+    """
+    selection_sets = [field_ast.selection_set for field_ast in info.field_asts if field_ast.selection_set]
+
+    for field_name in path:
+        selection_sets = [
+            field_ast.selection_set
+            for selection_set in selection_sets
+            for field_ast in iter_selected_fields(info, selection_set)
+            if field_ast.name.value == field_name and field_ast.selection_set
+        ]
+
+    return selection_sets
+
+
+def get_field_names(info, object_type):
+    """ Returns a dict mapping GraphQL field names to object_type field names """
+    auto_camelcase = getattr(info.schema, 'auto_camelcase', True)
+
+    return {
+        getattr(field, 'name', None) or (to_camel_case(name) if auto_camelcase else name): name
+        for name, field in object_type._meta.fields.items()
+    }
+
+
+def get_embedded_document_type(document_field, registry):
+    """ Returns the type registered for the embedded document held by document_field,
+    if its selection can be projected into sub fields
+    """
+    if isinstance(document_field, (ListField, EmbeddedDocumentListField)):
+        document_field = document_field.field
+
+    if not isinstance(document_field, EmbeddedDocumentField):
+        return None
+
+    object_type = registry.get_type_for_document(document_field.document_type)
+    if object_type is None or object_type._meta.connection:
+        return None
+
+    return object_type
+
+
+def get_projection(info, object_type, selection_sets):
+    """ Returns the document field paths selected in selection_sets for object_type,
+    or None when the selection can not be answered from document fields alone
+    (e.g. custom fields or resolvers)
+    """
+    document_fields = get_document_fields(object_type._meta.document)
+    field_names = get_field_names(info, object_type)
+    type_names = get_type_names(object_type)
+
+    projection = set()
+
+    for selection_set in selection_sets:
+        for field_ast in iter_selected_fields(info, selection_set, type_names):
+            graphql_name = field_ast.name.value
+            if graphql_name.startswith('__'):
+                continue
+
+            name = field_names.get(graphql_name)
+            if name not in document_fields or hasattr(object_type, f'resolve_{name}'):
+                return None
+
+            embedded_type = get_embedded_document_type(document_fields[name], object_type._meta.registry)
+            embedded_projection = None
+            if embedded_type and field_ast.selection_set:
+                embedded_projection = get_projection(info, embedded_type, [field_ast.selection_set])
+
+            if embedded_projection:
+                projection.update(f'{name}.{embedded_name}' for embedded_name in embedded_projection)
+            else:
+                projection.add(name)
+
+    return projection
+
+
+def get_type_projection(info, object_type, path=()):
+    """ Returns the document field paths selected for object_type,
+    None when the documents have to be loaded with all their fields
+    """
+    if not object_type._meta.projection:
+        return None
+
+    return get_projection(info, object_type, get_selection_sets(info, path)) or None
+
+
+def apply_projection(queryset, info, object_type, path=(), extra_fields=()):
+    """ Restricts queryset to the document fields selected for object_type,
+    leaving it untouched if it already has a projection or the selection
+    can not be projected
+    """
+    if queryset._loaded_fields:
+        return queryset
+
+    projection = get_type_projection(info, object_type, path)
+    if not projection:
+        return queryset
+
+    return queryset.only(*projection.union(extra_fields))
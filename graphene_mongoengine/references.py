@@ -0,0 +1,131 @@
+""" Building documents without dereferencing their CachedReferenceFields.
+MongoEngine fetches the referenced document of each cached reference while
+building the document holding it, one query per document. Documents built
+here hold a DBRef instead, dereferenced when the field data is read (so they
+validate and save as any other), and keep the stored cached values, from
+which the resolvers answer the selections they hold or load the references
+in batches
+"""
+
+from bson import DBRef
+
+from mongoengine import DoesNotExist, QuerySet
+from mongoengine.base import get_document
+from mongoengine.fields import CachedReferenceField
+
+from .utils import get_document_fields
+
+# pylint: disable=W0212
+
+STORED_REFERENCES_ATTR = '_stored_references'
+
+__cached_reference_fields = {}
+
+
+def get_cached_reference_fields(document):
+    """ Returns the (name, field) of the CachedReferenceFields of document """
+    fields = __cached_reference_fields.get(document)
+    if fields is None:
+        fields = __cached_reference_fields[document] = tuple(
+            (name, field) for name, field in get_document_fields(document).items()
+            if isinstance(field, CachedReferenceField)
+        )
+    return fields
+
+
+def dereference(document, dbref):
+    """ Returns the document of document class referenced by dbref, as
+    CachedReferenceField dereferences it on access
+    """
+    son = document._get_db().dereference(dbref)
+    if son is None:
+        raise DoesNotExist(f'Trying to dereference unknown document {dbref}')
+    return document._from_son(son)
+
+
+class StoredReferenceData(dict):
+    """ The field data of a document built by :build_document:. The DBRefs held
+    for its cached references are dereferenced when read, by the field on access,
+    or by validate and to_mongo when the document is saved
+    """
+
+    def __init__(self, data, document_types):
+        super(StoredReferenceData, self).__init__(data)
+        self.document_types = document_types
+
+    def __getitem__(self, key):
+        value = super(StoredReferenceData, self).__getitem__(key)
+        if isinstance(value, DBRef) and key in self.document_types:
+            value = self[key] = dereference(self.document_types[key], value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def build_document(document, son, auto_dereference=True):
+    """ Returns the document built from son as _from_son does, with the cached
+    references it stores held as DBRefs in its :StoredReferenceData: and their
+    stored values kept, see :get_stored_value:
+    """
+    class_name = son.get('_cls')
+    document_class = get_document(class_name) if class_name and class_name != document._class_name else document
+
+    stored = {}
+    for name, field in get_cached_reference_fields(document_class):
+        value = son.get(field.db_field)
+        if isinstance(value, dict) and '_id' in value:
+            stored[name] = value
+
+    if not stored:
+        return document._from_son(son, _auto_dereference=auto_dereference)
+
+    son = dict(son)
+    for name, value in stored.items():
+        field = document_class._fields[name]
+        son[field.db_field] = DBRef(field.document_type._get_collection_name(), value['_id'])
+
+    instance = document._from_son(son, _auto_dereference=auto_dereference)
+    instance._data = StoredReferenceData(
+        instance._data.items(), {name: document_class._fields[name].document_type for name in stored}
+    )
+    setattr(instance, STORED_REFERENCES_ATTR, stored)
+    return instance
+
+
+def get_stored_value(document, name):
+    """ Returns the stored value of the reference field name of document: the raw
+    cached values kept by :build_document: until the reference is dereferenced
+    or set, else the field data
+    """
+    data = document._data
+    if isinstance(data, StoredReferenceData) and isinstance(dict.get(data, name), DBRef):
+        return getattr(document, STORED_REFERENCES_ATTR)[name]
+    return data.get(name)
+
+
+class StoredReferenceQuerySet(QuerySet):
+    """ QuerySet building its documents with :build_document: """
+
+    def __next__(self):
+        if self._none or self._empty:
+            raise StopIteration
+
+        son = next(self._cursor)
+        if self._as_pymongo:
+            return son
+
+        instance = build_document(self._document, son, self._auto_dereference)
+        if self._scalar:
+            return self._get_scalar(instance)
+        return instance
+
+
+def keep_stored_references(queryset):
+    """ Returns queryset as a :StoredReferenceQuerySet: when its documents
+    have CachedReferenceFields, else queryset itself
+    """
+    if isinstance(queryset, StoredReferenceQuerySet) or queryset._as_pymongo \
+            or not get_cached_reference_fields(queryset._document):
+        return queryset
+    return queryset._clone_into(StoredReferenceQuerySet(queryset._document, queryset._collection_obj))
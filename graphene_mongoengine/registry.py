@@ -7,9 +7,10 @@ class Registry(object):
         and Graphene MongoEngineObjectType classes
     """
 
-    def __init__(self):
+    def __init__(self, lazy=False):
         self._registry = {}
         self._registry_documents = {}
+        self.lazy = lazy
 
     def register(self, cls):
         """ Register a class for a given Document """
@@ -29,6 +30,10 @@ class Registry(object):
         """ Returns registered class for a given Document """
         return self._registry.get(document)
 
+    def get_types(self):
+        """ Returns the registered classes """
+        return list(self._registry.values())
+
 
 registry = None
 
@@ -42,6 +47,10 @@ def get_global_registry():
 
 
 def reset_global_registry():
-    """ Resets globally shared :Registry: """
+    """ Resets globally shared :Registry: and the conversions made with it """
+    from .converter import clear_conversion_cache
+
     global registry
+    if registry:
+        clear_conversion_cache(registry)
     registry = None
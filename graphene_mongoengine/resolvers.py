@@ -0,0 +1,305 @@
+""" Default resolvers for MongoEngineObjectType fields """
+
+from bson import DBRef
+
+from graphene.types.resolver import get_default_resolver
+
+from mongoengine import Document
+from mongoengine.base import LazyReference, get_document
+from mongoengine.fields import (
+    ReferenceField, CachedReferenceField, LazyReferenceField,
+    GenericEmbeddedDocumentField, GenericLazyReferenceField, GenericReferenceField,
+    DecimalField, ComplexDateTimeField, UUIDField
+)
+
+from .loaders import get_document_loader
+from .projection import get_type_projection
+from .references import get_stored_value
+from .utils import get_document_fields, is_mongoengine_document, field_is_generic_list, field_is_reference_list
+
+# pylint: disable=W0212,C0103
+
+REFERENCE_FIELDS = (ReferenceField, CachedReferenceField, LazyReferenceField)
+
+GENERIC_FIELDS = (GenericEmbeddedDocumentField, GenericLazyReferenceField, GenericReferenceField)
+
+# Reference fields whose stored values can answer some selections without a fetch
+STORED_REFERENCE_FIELDS = (CachedReferenceField, LazyReferenceField)
+
+
+def get_reference_pk(value):
+    """ Returns the primary key held by a stored reference value """
+    if isinstance(value, Document):
+        return value.pk
+    if isinstance(value, DBRef):
+        return value.id
+    if isinstance(value, dict):
+        # Raw CachedReferenceField value
+        return value.get('_id')
+    return value
+
+
+def get_stored_field_names(field, value=None):
+    """ Returns the names of the referenced document fields a stored reference
+    value holds: its primary key, and the cached fields of raw
+    CachedReferenceField values
+    """
+    names = {'pk', field.document_type._meta['id_field']}
+    if isinstance(field, CachedReferenceField) and (value is None or isinstance(value, dict)):
+        names.update(field.fields)
+    return names
+
+
+def is_stored_selection(projection, names):
+    """ Whether a projection (see :get_type_projection:) only selects fields in names """
+    return bool(projection) and all(path.split('.', 1)[0] in names for path in projection)
+
+
+def get_return_graphene_type(info):
+    """ Returns the Graphene type the field being resolved returns, unwrapping lists and non nulls """
+    return_type = info.return_type
+    while hasattr(return_type, 'of_type'):
+        return_type = return_type.of_type
+
+    return getattr(return_type, 'graphene_type', None)
+
+
+def get_return_object_type(info):
+    """ Returns the MongoEngineObjectType the field being resolved returns, if any """
+    object_type = get_return_graphene_type(info)
+    if getattr(getattr(object_type, '_meta', None), 'document', None) is None:
+        return None
+    return object_type
+
+
+def returns_object_type(info, object_type):
+    """ Whether the field being resolved returns object_type, one of its
+    interfaces (e.g. Node) or a union of it, so its selection set applies
+    to the documents of object_type
+    """
+    graphene_type = get_return_graphene_type(info)
+    if graphene_type is None:
+        return False
+
+    return graphene_type is object_type or graphene_type in object_type._meta.interfaces \
+        or object_type in (getattr(graphene_type._meta, 'types', None) or ())
+
+
+def get_stored_reference(field, value, info):
+    """ Returns the document referenced by a LazyReferenceField or a (raw)
+    CachedReferenceField value, built from the stored value alone when the
+    fields selected for it are all stored there. Returns None when the
+    referenced document has to be fetched
+    """
+    if not isinstance(field, STORED_REFERENCE_FIELDS):
+        return None
+
+    object_type = get_return_object_type(info)
+    if object_type is None or not issubclass(field.document_type, object_type._meta.document):
+        return None
+
+    projection = get_type_projection(info, object_type)
+    if not is_stored_selection(projection, get_stored_field_names(field, value)):
+        return None
+
+    son = value if isinstance(value, dict) else {'_id': get_reference_pk(value)}
+    return field.document_type._from_son(son)
+
+
+def resolve_reference(document, field, info):
+    """ Resolves a reference field of document through the request
+    :DocumentLoader:, so references are fetched in batches. Selections
+    answered by the stored reference are resolved without a fetch
+    """
+    value = get_stored_value(document, field.name)
+    if value is None or isinstance(value, Document):
+        return value
+
+    stored_reference = get_stored_reference(field, value, info)
+    if stored_reference is not None:
+        return stored_reference
+
+    loader = get_document_loader(info.context, field.document_type)
+    if loader is None:
+        value = getattr(document, field.name)
+        return value.fetch() if isinstance(value, LazyReference) else value
+
+    return loader.load(get_reference_pk(value))
+
+
+def resolve_generic_value(value, info):
+    """ Resolves a stored generic field value: generic references ({_cls, _ref}
+    values and lazy references) are loaded through the :DocumentLoader: of their
+    document class, so the references of each collection resolved in the same
+    tick are fetched with a single $in query. Raw embedded documents are built
+    from their _cls
+    """
+    if value is None or is_mongoengine_document(value):
+        return value
+
+    if isinstance(value, LazyReference):
+        document, pk = value.document_type, value.pk
+    elif isinstance(value, dict) and '_ref' in value:
+        document, pk = get_document(value['_cls']), get_reference_pk(value['_ref'])
+    elif isinstance(value, dict) and '_cls' in value:
+        return get_document(value['_cls'])._from_son(value)
+    else:
+        return value
+
+    loader = get_document_loader(info.context, document)
+    if loader is None:
+        return fetch_reference(document, pk)
+    return loader.load(pk)
+
+
+def resolve_generic_field(value, field, info):
+    """ Resolves a generic field value, or a list of them, see :resolve_generic_value: """
+    if value is not None and field_is_generic_list(field):
+        return [resolve_generic_value(item, info) for item in value]
+    return resolve_generic_value(value, info)
+
+
+class ReferenceList(object):
+    """ Sequence of stored references resolved through a :DocumentLoader:.
+    Slicing only narrows down the references, documents are loaded
+    when the items are accessed
+    """
+
+    def __init__(self, loader, references):
+        self.loader = loader
+        self.references = list(references)
+
+    def __len__(self):
+        return len(self.references)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return ReferenceList(self.loader, self.references[key])
+        return self.load_reference(self.references[key])
+
+    def __iter__(self):
+        return (self.load_reference(reference) for reference in self.references)
+
+    def load_reference(self, reference):
+        """ Returns a promise for the referenced document """
+        if reference is None or isinstance(reference, Document):
+            return reference
+        return self.loader.load(get_reference_pk(reference))
+
+
+def resolve_reference_list(document, field, info):
+    """ Resolves a list of references of document through the request
+    :DocumentLoader:, so the referenced documents of every list resolved
+    in the same tick are fetched with a single de-duplicated $in query
+    """
+    references = document._data.get(field.name)
+    if references is None:
+        return references
+
+    loader = get_document_loader(info.context, field.field.document_type)
+    if loader is None:
+        return getattr(document, field.name)
+
+    return ReferenceList(loader, references)
+
+
+# Fields whose raw values differ from the values of their Document attribute
+RAW_CONVERTED_FIELDS = (DecimalField, ComplexDateTimeField, UUIDField)
+
+__db_field_names = {}
+
+
+def get_raw_field(document, name):
+    """ Returns the document field for name along with its raw dict key """
+    try:
+        return __db_field_names[document][name]
+    except KeyError:
+        field = get_document_fields(document).get(name)
+        raw_field = __db_field_names.setdefault(document, {})[name] = (
+            (field, field.db_field) if field is not None else (None, name)
+        )
+        return raw_field
+
+
+def get_raw_value(document, root, name):
+    """ Returns the value of a document field from a raw (as_pymongo) document,
+    the field default when the document does not hold it
+    """
+    field, key = get_raw_field(document, name)
+    if field is None:
+        return root.get(key)
+
+    try:
+        value = root[key]
+    except KeyError:
+        default = field.default
+        return default() if callable(default) else default
+
+    if value is not None and isinstance(field, RAW_CONVERTED_FIELDS):
+        return field.to_python(value)
+    return value
+
+
+def fetch_reference(document, pk):
+    """ Fetches a referenced document when there is no request loader """
+    return document.objects(pk=pk).first()
+
+
+def resolve_raw_field(document, root, name, info):
+    """ Resolves a document field from a raw (as_pymongo) document.
+    References are loaded through the request :DocumentLoader:, unless
+    the stored reference answers the selection
+    """
+    field, _ = get_raw_field(document, name)
+    value = get_raw_value(document, root, name)
+    if value is None or field is None:
+        return value
+
+    if isinstance(field, REFERENCE_FIELDS):
+        stored_reference = get_stored_reference(field, value, info)
+        if stored_reference is not None:
+            return stored_reference
+
+        loader = get_document_loader(info.context, field.document_type)
+        if loader is None:
+            return fetch_reference(field.document_type, get_reference_pk(value))
+        return loader.load(get_reference_pk(value))
+
+    if isinstance(field, GENERIC_FIELDS) or field_is_generic_list(field):
+        return resolve_generic_field(value, field, info)
+
+    if field_is_reference_list(field):
+        loader = get_document_loader(info.context, field.field.document_type)
+        if loader is None:
+            return [fetch_reference(field.field.document_type, get_reference_pk(item)) for item in value]
+        return ReferenceList(loader, value)
+
+    return value
+
+
+def get_parent_document(info):
+    """ Returns the document of the MongoEngineObjectType being resolved, if any """
+    meta = getattr(getattr(info.parent_type, 'graphene_type', None), '_meta', None)
+    return getattr(meta, 'document', None)
+
+
+def document_resolver(attname, default_value, root, info, **args):
+    """ Default resolver for MongoEngineObjectType fields, reference
+    fields are loaded in batches instead of one query per document.
+    Raw documents fetched with as_pymongo are read by db field name
+    """
+    if isinstance(root, dict):
+        document = get_parent_document(info)
+        if document is not None:
+            return resolve_raw_field(document, root, attname, info)
+
+    elif is_mongoengine_document(root):
+        field = get_document_fields(root).get(attname)
+        if isinstance(field, REFERENCE_FIELDS):
+            return resolve_reference(root, field, info)
+        if field is not None and field_is_reference_list(field):
+            return resolve_reference_list(root, field, info)
+        if isinstance(field, GENERIC_FIELDS) or (field is not None and field_is_generic_list(field)):
+            return resolve_generic_field(root._data.get(field.name), field, info)
+
+    return get_default_resolver()(attname, default_value, root, info, **args)
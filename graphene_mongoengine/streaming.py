@@ -0,0 +1,154 @@
+""" Streaming of documents with bounded memory, for connections paging through
+whole collections and for exports outside of GraphQL execution
+"""
+
+from collections import OrderedDict
+
+from bson import json_util
+
+from graphene import Dynamic
+from graphene.relay import GlobalID
+from graphene.utils.str_converters import to_camel_case
+from graphql_relay.connection.arrayconnection import get_offset_with_default, offset_to_cursor
+
+from mongoengine.fields import EmbeddedDocumentField
+
+from .utils import get_document_fields, get_query
+
+# pylint: disable=W0212
+
+STREAM_BATCH_SIZE = 256
+
+
+def iter_documents(queryset, batch_size=STREAM_BATCH_SIZE):
+    """ Yields the documents of queryset, fetched in batches of batch_size.
+    Like QuerySet.no_cache(), the documents are not kept by the QuerySet,
+    and QuerySet subclasses keep their own iteration
+    """
+    queryset = queryset.clone().batch_size(batch_size)
+    while True:
+        try:
+            yield next(queryset)
+        except StopIteration:
+            return
+
+
+def iter_edges(edge_type, nodes, start_offset):
+    """ Yields the edges of nodes, with offset cursors starting at start_offset """
+    for offset, node in enumerate(nodes, start_offset):
+        yield edge_type(node=node, cursor=offset_to_cursor(offset))
+
+
+class StreamPageInfo(object):
+    """ PageInfo of a streamed page, computed from the number of documents
+    when requested, as the page nodes are not known until iterated
+    """
+
+    def __init__(self, args, start_offset, end_offset, count):
+        self.args = args
+        self.start_offset = start_offset
+        self.end_offset = end_offset
+        self.count = count
+
+    @property
+    def page_end_offset(self):
+        """ Returns the offset past the last node of the page """
+        if self.end_offset is None:
+            return self.count()
+        return min(self.end_offset, self.count())
+
+    @property
+    def start_cursor(self):
+        if self.page_end_offset <= self.start_offset:
+            return None
+        return offset_to_cursor(self.start_offset)
+
+    @property
+    def end_cursor(self):
+        if self.page_end_offset <= self.start_offset:
+            return None
+        return offset_to_cursor(self.page_end_offset - 1)
+
+    @property
+    def has_previous_page(self):
+        lower_bound = max(get_offset_with_default(self.args.get('after'), -1), -1) + 1
+        return isinstance(self.args.get('last'), int) and self.start_offset > lower_bound
+
+    @property
+    def has_next_page(self):
+        if not isinstance(self.args.get('first'), int) or self.end_offset is None:
+            return False
+        upper_bound = get_offset_with_default(self.args.get('before'), None)
+        return self.end_offset < (upper_bound if upper_bound is not None else self.count())
+
+
+def get_node_projection(object_type):
+    """ Returns the names of the document fields exposed by object_type """
+    document_fields = get_document_fields(object_type._meta.document)
+    return [name for name in object_type._meta.fields if name in document_fields]
+
+
+def iter_raw_nodes(object_type, queryset=None, batch_size=STREAM_BATCH_SIZE):
+    """ Yields the raw (as_pymongo) documents of object_type with the fields it
+    exposes, keyed by db field, without instantiating Documents nor keeping
+    them in memory
+    """
+    if queryset is None:
+        queryset = get_query(object_type._meta.document, None)
+    queryset = queryset.only(*get_node_projection(object_type)).as_pymongo()
+    return iter_documents(queryset, batch_size)
+
+
+def get_node_values(object_type, son, auto_camelcase=True):
+    """ Returns the values of the fields of object_type read from a raw document,
+    keyed by their GraphQL names, as a Schema with auto_camelcase names them.
+    Node ids are global ids, embedded documents are read through their registered type
+    """
+    from .resolvers import get_raw_value
+
+    document = object_type._meta.document
+    document_fields = get_document_fields(document)
+    registry = object_type._meta.registry
+
+    def get_embedded_values(field, value):
+        embedded_type = registry.get_type_for_document(field.document_type)
+        if embedded_type is None or not isinstance(value, dict):
+            return value
+        return get_node_values(embedded_type, value, auto_camelcase)
+
+    values = OrderedDict()
+    for name, field in object_type._meta.fields.items():
+        document_field = document_fields.get(name)
+        if isinstance(field, Dynamic):
+            # Fields of unregistered document types are left out of the schema
+            field = field.get_type()
+        if document_field is None or field is None:
+            continue
+
+        value = get_raw_value(document, son, name)
+        if isinstance(field, GlobalID):
+            value = field.node.to_global_id(field.parent_type_name or object_type._meta.name, value)
+        elif value is not None and isinstance(document_field, EmbeddedDocumentField):
+            value = get_embedded_values(document_field, value)
+        elif value is not None and isinstance(getattr(document_field, 'field', None), EmbeddedDocumentField):
+            value = [get_embedded_values(document_field.field, item) for item in value]
+
+        values[field.name or (to_camel_case(name) if auto_camelcase else name)] = value
+    return values
+
+
+def iter_node_values(object_type, queryset=None, batch_size=STREAM_BATCH_SIZE, auto_camelcase=True):
+    """ Yields the documents of object_type as the :get_node_values: of their raw documents,
+    see :iter_raw_nodes:
+    """
+    for son in iter_raw_nodes(object_type, queryset, batch_size):
+        yield get_node_values(object_type, son, auto_camelcase)
+
+
+def iter_ndjson(object_type, queryset=None, batch_size=STREAM_BATCH_SIZE,
+                json_options=json_util.RELAXED_JSON_OPTIONS, auto_camelcase=True):
+    """ Yields the documents of object_type as newline delimited (Extended) JSON lines
+    keyed by field GraphQL names, see :iter_node_values:
+    """
+    for values in iter_node_values(object_type, queryset, batch_size, auto_camelcase):
+        yield json_util.dumps(values, json_options=json_options) + '\n'
@@ -0,0 +1,104 @@
+import pytest
+
+from mongoengine import connect, disconnect, QuerySet
+
+from .models import Owner, PeriodicTask, Tag
+
+TASK_COUNT = 10
+OWNER_COUNT = 3
+TAG_COUNT = 4
+
+
+@pytest.fixture(scope='session', autouse=True)
+def mongomock_connection():
+    connect('graphene-mongoengine-test', host='mongomock://localhost')
+    yield
+    disconnect()
+
+
+@pytest.fixture
+def periodic_tasks():
+    PeriodicTask.drop_collection()
+    tasks = [
+        PeriodicTask(name=f'task-{i:02}', task='tasks.run', total_run_count=i % 4).save()
+        for i in range(TASK_COUNT)
+    ]
+    yield tasks
+    PeriodicTask.drop_collection()
+
+
+@pytest.fixture
+def owned_periodic_tasks(periodic_tasks):
+    Owner.drop_collection()
+    owners = [Owner(name=f'owner-{i}').save() for i in range(OWNER_COUNT)]
+    for i, task in enumerate(periodic_tasks):
+        owner = owners[i % OWNER_COUNT]
+        task.update(owner=owner, created_by=owner)
+    yield owners
+    Owner.drop_collection()
+
+
+@pytest.fixture
+def tagged_periodic_tasks(periodic_tasks, owned_periodic_tasks):
+    Tag.drop_collection()
+    tags = [Tag(label=f'tag-{i}').save() for i in range(TAG_COUNT)]
+    for i, task in enumerate(periodic_tasks):
+        task.update(
+            tags=[tags[(i + offset) % TAG_COUNT] for offset in range(2)],
+            watchers=list(reversed(owned_periodic_tasks)),
+        )
+    yield tags
+    Tag.drop_collection()
+
+
+@pytest.fixture
+def find_calls(monkeypatch):
+    """ Records the collection and filter of every find issued """
+    calls = []
+
+    for document in (Owner, PeriodicTask, Tag):
+        collection = document._get_collection()
+
+        def recording_find(*args, _find=collection.find, _name=collection.name, **kwargs):
+            calls.append((_name, args[0] if args else kwargs.get('filter')))
+            return _find(*args, **kwargs)
+
+        monkeypatch.setattr(collection, 'find', recording_find)
+
+    return calls
+
+
+@pytest.fixture
+def fetched_documents(monkeypatch):
+    """ Counts the documents built from Mongo results """
+    fetched = []
+    from_son = PeriodicTask._from_son.__func__
+
+    def counting_from_son(cls, son, *args, **kwargs):
+        fetched.append(son)
+        return from_son(cls, son, *args, **kwargs)
+
+    monkeypatch.setattr(PeriodicTask, '_from_son', classmethod(counting_from_son))
+    return fetched
+
+
+@pytest.fixture
+def counted_queries(monkeypatch):
+    """ Records the exact and estimated document counts issued """
+    counted = []
+    count = QuerySet.count
+
+    def recording_count(queryset, *args, **kwargs):
+        counted.append('count')
+        return count(queryset, *args, **kwargs)
+
+    collection = PeriodicTask._get_collection()
+    estimated_document_count = collection.estimated_document_count
+
+    def recording_estimated_document_count(*args, **kwargs):
+        counted.append('estimated')
+        return estimated_document_count(*args, **kwargs)
+
+    monkeypatch.setattr(QuerySet, 'count', recording_count)
+    monkeypatch.setattr(collection, 'estimated_document_count', recording_estimated_document_count)
+    return counted
@@ -3,9 +3,18 @@ from mongoengine import (
     Document, EmbeddedDocument, DynamicEmbeddedDocument, DynamicDocument,
     StringField, IntField, BooleanField, DateTimeField,
     ListField, DictField,
-    EmbeddedDocumentField
+    EmbeddedDocumentField,
+    ReferenceField, LazyReferenceField, CachedReferenceField,
+    GenericReferenceField, GenericEmbeddedDocumentField,
+    GeoPointField, PointField, PolygonField, MultiPolygonField
 )
 
+
+class Owner(Document):
+
+    name = StringField(required=True, description='Owner name')
+    email = StringField(description='Owner email')
+
 class Crontab(EmbeddedDocument):
 
     minute = StringField(default='*', required=True, description='CRON minute expression')
@@ -23,9 +32,15 @@ class Interval(EmbeddedDocument):
     period = StringField(choices=PERIODS, description='Interval period')
 
 
+class Tag(Document):
+
+    label = StringField(required=True, description='Tag label')
+
+
 class PeriodicTask(Document):
     """mongo database model that represents a periodic task"""
 
+    meta = {'indexes': [('-total_run_count', '-id')]}
 
     name = StringField(unique=True, required=True, description='Periodic Task name')
     task = StringField(required=True, description='Task to execute with provided arguments')
@@ -51,6 +66,24 @@ class PeriodicTask(Document):
     total_run_count = IntField(min_value=0, default=0, description='Number of times the task was executed')
     max_run_count = IntField(min_value=0, default=0, description='Max number of times the task can run before expiring')
 
+    owner = ReferenceField(Owner, description='Task owner')
+    created_by = LazyReferenceField(Owner, description='Task creator')
+    assignee = CachedReferenceField(Owner, fields=['name'], description='Owner assigned to the task, name cached')
+    watchers = ListField(ReferenceField(Owner), description='Owners notified of the task runs')
+    tags = ListField(ReferenceField(Tag), description='Task tags')
+    subject = GenericReferenceField(choices=[Owner, Tag], description='Owner or tag the task is about')
+    related = ListField(GenericReferenceField(), description='Documents related to the task')
+    schedule = GenericEmbeddedDocumentField(choices=[Interval, Crontab], description='Interval or cron schedule')
+
     date_changed = DateTimeField(description='Last modification date')
     run_immediately = BooleanField(description='Whether the task should run as soon as created?')
 
+
+class Place(Document):
+
+    name = StringField(required=True, description='Place name')
+    location = PointField(description='Place location')
+    position = GeoPointField(description='Place location as a legacy coordinate pair')
+    area = PolygonField(description='Place boundaries')
+    districts = MultiPolygonField(description='Place districts boundaries')
+    entrances = ListField(PointField(), description='Place entrances')
@@ -0,0 +1,103 @@
+import pytest
+
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+
+from ..aggregation import PipelineQuerySet
+from ..utils import get_request_cache
+from .models import PeriodicTask
+from .types import schema
+
+NESTED_QUERY = '''
+query Nested($first: Int, $after: String) {
+    %s(first: $first, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        edges { node { name owner { name } createdBy { name } tags { label } } }
+    }
+}
+'''
+
+
+@pytest.fixture
+def aggregate_calls(monkeypatch):
+    """ Records the pipelines run on the periodic task collection """
+    calls = []
+    collection = PeriodicTask._get_collection()
+
+    def recording_aggregate(pipeline, *args, _aggregate=collection.aggregate, **kwargs):
+        calls.append(pipeline)
+        return _aggregate(pipeline, *args, **kwargs)
+
+    monkeypatch.setattr(collection, 'aggregate', recording_aggregate)
+    return calls
+
+
+def execute_nested(field_name, context=None, **variables):
+    result = schema.execute(NESTED_QUERY % field_name, variable_values=variables, context_value=context or {})
+    assert not result.errors, result.errors
+    return result.data[field_name]
+
+
+def test_aggregated_page_matches_regular_page(tagged_periodic_tasks):
+    for arguments in ({'first': 4}, {'first': 3, 'after': offset_to_cursor(5)}, {}):
+        assert execute_nested('aggregatedPeriodicTasks', **arguments) == execute_nested('periodicTasks', **arguments)
+
+
+def test_references_joined_in_one_round_trip(tagged_periodic_tasks, aggregate_calls):
+    context = {}
+    page = execute_nested('aggregatedPeriodicTasks', context, first=3, after=offset_to_cursor(1))
+
+    assert page['edges'][0]['node'] == {
+        'name': 'task-02',
+        'owner': {'name': 'owner-2'},
+        'createdBy': {'name': 'owner-2'},
+        'tags': [{'label': 'tag-2'}, {'label': 'tag-3'}],
+    }
+    assert len(aggregate_calls) == 1
+    # References were resolved without loading them afterwards
+    assert not get_request_cache(context, 'loaders')
+
+    stages = [next(iter(stage)) for stage in aggregate_calls[0]]
+    assert stages == ['$limit', '$skip', '$lookup', '$lookup', '$lookup', '$project']
+
+
+def test_pipeline_applies_filters_and_ordering(tagged_periodic_tasks, aggregate_calls):
+    result = schema.execute('''{
+        aggregatedPeriodicTasks(totalRunCountGte: 2, orderBy: [NAME_DESC], first: 2) {
+            edges { node { name owner { name } } }
+        }
+    }''', context_value={})
+
+    assert not result.errors
+    assert [edge['node'] for edge in result.data['aggregatedPeriodicTasks']['edges']] == [
+        {'name': 'task-07', 'owner': {'name': 'owner-1'}},
+        {'name': 'task-06', 'owner': {'name': 'owner-0'}},
+    ]
+    assert aggregate_calls[0][0] == {'$match': {'total_run_count': {'$gte': 2}}}
+    assert aggregate_calls[0][1] == {'$sort': {'name': -1}}
+
+
+def test_keyset_pages_through_pipeline(tagged_periodic_tasks, aggregate_calls):
+    first_page = execute_nested('keysetAggregatedPeriodicTasks', first=4)
+    second_page = execute_nested('keysetAggregatedPeriodicTasks', first=4, after=first_page['pageInfo']['endCursor'])
+
+    assert [edge['node']['name'] for edge in second_page['edges']] == ['task-04', 'task-05', 'task-06', 'task-07']
+    assert second_page['edges'][0]['node']['owner'] == {'name': 'owner-1'}
+    assert len(aggregate_calls) == 2
+
+
+def test_missing_references_resolve_to_null(owned_periodic_tasks, tagged_periodic_tasks):
+    owned_periodic_tasks[0].delete()
+    tagged_periodic_tasks[0].delete()
+
+    page = execute_nested('aggregatedPeriodicTasks', first=1)
+
+    assert page['edges'][0]['node']['owner'] is None
+    assert page['edges'][0]['node']['tags'] == [None, {'label': 'tag-1'}]
+
+
+def test_pipeline_queryset_clones_keep_lookups():
+    queryset = PipelineQuerySet(PeriodicTask, PeriodicTask._get_collection())
+    queryset._reference_lookups = ('lookup',)
+
+    assert isinstance(queryset.filter(name='task-00')[1:3], PipelineQuerySet)
+    assert queryset.filter(name='task-00')[1:3]._reference_lookups == ('lookup',)
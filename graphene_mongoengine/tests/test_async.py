@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from graphql_relay import to_global_id
+
+from .models import PeriodicTask
+from .types import async_backend, async_database, result_cache, schema
+
+CONNECTION_QUERY = '''
+query Tasks($first: Int, $last: Int, $after: String, $before: String) {
+    %s(first: $first, last: $last, after: $after, before: $before) {
+        totalCount
+        edges { cursor node { name owner { name } } }
+        pageInfo { startCursor endCursor hasPreviousPage hasNextPage }
+    }
+}
+'''
+
+NODES_QUERY = '''
+query Nodes($ids: [ID!]!) {
+    nodes(ids: $ids) {
+        ... on PeriodicTaskType { name }
+        ... on AsyncPeriodicTaskType { name }
+    }
+}
+'''
+
+DASHBOARD_QUERY = '''
+{
+    asyncPeriodicTasks(first: 2) { edges { node { name } } }
+    asyncLazyPeriodicTasks(first: 2) { edges { node { name } } }
+    asyncKeysetPeriodicTasks(first: 2) { edges { node { name } } }
+    asyncAggregatedPeriodicTasks(first: 2) { edges { node { name } } }
+}
+'''
+
+
+@pytest.fixture(autouse=True)
+def reset_async_database():
+    async_database.round_trips = async_database.max_in_flight = 0
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+def execute(query, asynchronous=True, **variables):
+    if not asynchronous:
+        return schema.execute(query, variable_values=variables, context_value={})
+
+    loop = asyncio.new_event_loop()
+    try:
+        return schema.execute(
+            query, variable_values=variables, context_value={}, executor=AsyncioExecutor(loop=loop)
+        )
+    finally:
+        loop.close()
+
+
+def get_connection(field_name, asynchronous=True, **variables):
+    result = execute(CONNECTION_QUERY % field_name, asynchronous, **variables)
+    assert not result.errors, result.errors
+    return result.data[field_name]
+
+
+@pytest.mark.parametrize('variables', [
+    {},
+    {'first': 3},
+    {'first': 0},
+    {'first': 3, 'after': 'YXJyYXljb25uZWN0aW9uOjM='},
+    {'last': 2},
+    {'first': 5, 'before': 'YXJyYXljb25uZWN0aW9uOjM='},
+    {'last': 2, 'before': 'YXJyYXljb25uZWN0aW9uOjU='},
+])
+@pytest.mark.parametrize('field_name, sync_field_name', [
+    ('asyncPeriodicTasks', 'periodicTasks'),
+    ('asyncLazyPeriodicTasks', 'lazyPeriodicTasks'),
+    ('asyncAggregatedPeriodicTasks', 'aggregatedPeriodicTasks'),
+    ('asyncCachedPeriodicTasks', 'cachedPeriodicTasks'),
+])
+def test_async_connection_matches_sync_connection(owned_periodic_tasks, field_name, sync_field_name, variables):
+    expected = get_connection(sync_field_name, asynchronous=False, **variables)
+    result_cache.clear()
+
+    assert get_connection(field_name, **variables) == expected
+    assert async_database.round_trips
+
+
+def test_async_keyset_connection_matches_sync_connection(owned_periodic_tasks):
+    expected = get_connection('keysetPeriodicTasks', asynchronous=False, first=3)
+    connection = get_connection('asyncKeysetPeriodicTasks', first=3)
+    assert connection == expected
+
+    after = connection['pageInfo']['endCursor']
+    expected = get_connection('keysetPeriodicTasks', asynchronous=False, first=3, after=after)
+    assert get_connection('asyncKeysetPeriodicTasks', first=3, after=after) == expected
+
+
+def test_async_raw_connection(periodic_tasks):
+    result = execute('{ asyncRawPeriodicTasks(first: 2, name: "task-03") { edges { node { name } } } }')
+
+    assert not result.errors, result.errors
+    assert result.data['asyncRawPeriodicTasks']['edges'] == [{'node': {'name': 'task-03'}}]
+
+
+def test_async_total_count_only_counted_when_requested(periodic_tasks):
+    result = execute('{ asyncLazyPeriodicTasks(first: 2) { edges { node { name } } } }')
+    assert not result.errors, result.errors
+    assert async_database.round_trips == 1
+
+    result = execute('{ asyncLazyPeriodicTasks(first: 2) { totalCount } }')
+    assert not result.errors, result.errors
+    assert result.data['asyncLazyPeriodicTasks']['totalCount'] == 10
+
+
+@pytest.mark.parametrize('estimated', [False, True])
+def test_async_count_of_empty_querysets(periodic_tasks, estimated):
+    queryset = PeriodicTask.objects.none()
+
+    assert asyncio.run(async_backend.count(queryset, estimated)) == queryset.count() == 0
+    assert asyncio.run(async_backend.count(PeriodicTask.objects, estimated)) == 10
+    assert async_database.round_trips == 1
+
+
+def test_async_sibling_connections_run_concurrently(periodic_tasks):
+    result = execute(DASHBOARD_QUERY)
+
+    assert not result.errors, result.errors
+    assert [edge['node']['name'] for edge in result.data['asyncAggregatedPeriodicTasks']['edges']] == [
+        'task-00', 'task-01'
+    ]
+    assert async_database.max_in_flight == 4
+
+
+def test_async_nodes_are_batched(periodic_tasks):
+    ids = [to_global_id('AsyncPeriodicTaskType', str(task.pk)) for task in periodic_tasks[3:6]]
+    query = '''
+    query Nodes($first: ID!, $second: ID!) {
+        first: node(id: $first) { ... on PeriodicTaskType { name } ... on AsyncPeriodicTaskType { name } }
+        second: node(id: $second) { ... on PeriodicTaskType { name } ... on AsyncPeriodicTaskType { name } }
+    }
+    '''
+
+    result = execute(query, first=ids[0], second=ids[1])
+
+    assert not result.errors, result.errors
+    assert result.data == {'first': {'name': 'task-03'}, 'second': {'name': 'task-04'}}
+    assert async_database.round_trips == 1
+
+
+def test_async_nodes_field(periodic_tasks):
+    ids = [
+        to_global_id('AsyncPeriodicTaskType', str(periodic_tasks[4].pk)),
+        to_global_id('PeriodicTaskType', str(periodic_tasks[1].pk)),
+        to_global_id('AsyncPeriodicTaskType', 'missing'),
+        to_global_id('AsyncPeriodicTaskType', str(periodic_tasks[2].pk)),
+    ]
+
+    result = execute(NODES_QUERY, ids=ids)
+
+    assert not result.errors, result.errors
+    assert result.data['nodes'] == [{'name': 'task-04'}, {'name': 'task-01'}, None, {'name': 'task-02'}]
+    assert async_database.round_trips == 1
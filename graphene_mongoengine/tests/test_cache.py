@@ -0,0 +1,159 @@
+import pytest
+
+from graphql_relay import to_global_id
+
+from ..cache import MemoryCacheBackend, ResultCache, SharedCacheBackend
+from .models import PeriodicTask
+from .types import result_cache, schema
+
+TASKS_QUERY = '''
+query Tasks($first: Int, $name: String) {
+    cachedPeriodicTasks(first: $first, name: $name) {
+        totalCount
+        edges { node { name totalRunCount } }
+    }
+}
+'''
+
+NODE_QUERY = '''
+query Node($id: ID!) {
+    node(id: $id) {
+        ... on PeriodicTaskType { name }
+        ... on CachedPeriodicTaskType { name }
+    }
+}
+'''
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    result_cache.clear()
+    result_cache.reset_stats()
+    yield
+    result_cache.clear()
+
+
+def get_names(**variables):
+    result = schema.execute(TASKS_QUERY, variable_values=variables, context_value={})
+    assert not result.errors, result.errors
+    connection = result.data['cachedPeriodicTasks']
+    return connection['totalCount'], [edge['node']['name'] for edge in connection['edges']]
+
+
+def task_lookups(find_calls):
+    return [query for collection, query in find_calls if collection == 'periodic_task']
+
+
+def test_cached_connection_hits(periodic_tasks, find_calls, counted_queries):
+    assert get_names(first=3) == (10, ['task-00', 'task-01', 'task-02'])
+    assert result_cache.stats['misses'] == 2
+    find_count = len(task_lookups(find_calls))
+
+    assert get_names(first=3) == (10, ['task-00', 'task-01', 'task-02'])
+
+    assert len(task_lookups(find_calls)) == find_count
+    assert counted_queries == ['count']
+    assert result_cache.stats == {'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+
+def test_cache_keyed_on_filter_and_window(periodic_tasks):
+    assert get_names(first=2) == (10, ['task-00', 'task-01'])
+    assert get_names(first=3) == (10, ['task-00', 'task-01', 'task-02'])
+    assert get_names(first=3, name='task-05') == (1, ['task-05'])
+    assert result_cache.stats['hits'] == 1
+
+
+def test_save_invalidates_cache(periodic_tasks):
+    assert get_names(first=1) == (10, ['task-00'])
+
+    periodic_tasks[0].name = 'renamed'
+    periodic_tasks[0].save()
+
+    assert get_names(first=1) == (10, ['renamed'])
+
+
+def test_delete_invalidates_cache(periodic_tasks):
+    assert get_names(first=2) == (10, ['task-00', 'task-01'])
+
+    periodic_tasks[0].delete()
+
+    assert get_names(first=2) == (9, ['task-01', 'task-02'])
+
+
+def test_keyset_pages_cached(periodic_tasks, find_calls):
+    query = '{ keysetCachedPeriodicTasks(first: 2) { edges { cursor node { name } } } }'
+    first = schema.execute(query, context_value={})
+    find_count = len(task_lookups(find_calls))
+    second = schema.execute(query, context_value={})
+
+    assert not second.errors
+    assert second.data == first.data
+    assert len(task_lookups(find_calls)) == find_count
+
+
+def test_node_lookups_cached(periodic_tasks, find_calls):
+    node_id = to_global_id('CachedPeriodicTaskType', str(periodic_tasks[3].pk))
+
+    for _ in range(2):
+        result = schema.execute(NODE_QUERY, variable_values={'id': node_id}, context_value={})
+        assert not result.errors
+        assert result.data['node'] == {'name': 'task-03'}
+
+    assert len(task_lookups(find_calls)) == 1
+    assert result_cache.stats['hits'] == 1
+
+    periodic_tasks[3].name = 'renamed'
+    periodic_tasks[3].save()
+
+    result = schema.execute(NODE_QUERY, variable_values={'id': node_id}, context_value={})
+    assert result.data['node'] == {'name': 'renamed'}
+
+
+class FakeTimer(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_backend_ttl():
+    timer = FakeTimer()
+    backend = MemoryCacheBackend(ttl=10, timer=timer)
+    backend.set('key', 'value')
+
+    timer.now = 9
+    assert backend.get('key') == 'value'
+    timer.now = 10
+    assert backend.get('key') is None
+    assert not len(backend)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_size=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    assert backend.get('a') == 1
+
+    backend.set('c', 3)
+
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+
+
+def test_shared_backend_returns_copies(periodic_tasks):
+    cache = ResultCache(SharedCacheBackend())
+    try:
+        key = cache.get_key('node', [PeriodicTask], periodic_tasks[0].pk)
+        cache.set(key, periodic_tasks[0])
+
+        cached = cache.get(key)
+        assert cached == periodic_tasks[0] and cached is not periodic_tasks[0]
+        assert cached.name == 'task-00'
+
+        periodic_tasks[0].save()
+        assert cache.get(cache.get_key('node', [PeriodicTask], periodic_tasks[0].pk)) is None
+    finally:
+        cache.disconnect()
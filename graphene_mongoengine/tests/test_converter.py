@@ -2,7 +2,7 @@ from py.test import raises
 
 from graphene import (
     String, Int, Boolean, Float, ID,
-    List, Dynamic
+    List, Dynamic, Field, Union
 )
 from graphene.relay import Node
 from graphene.types.datetime import DateTime
@@ -10,11 +10,15 @@ from graphene.types.json import JSONString
 
 import mongoengine.fields as fields
 
-from ..converter import convert_mongoengine_field
+from ..converter import convert_mongoengine_field, convert_mongoengine_field_as, clear_conversion_cache
 from ..fields import MongoEngineConnectionField
+from ..geo import (
+    GeoJSONPoint, GeoJSONLineString, GeoJSONPolygon,
+    GeoJSONMultiPoint, GeoJSONMultiLineString, GeoJSONMultiPolygon
+)
 from ..registry import Registry
 from ..types import MongoEngineObjectType
-from .models import PeriodicTask
+from .models import Crontab, Interval, Owner, PeriodicTask, Tag
 
 DESCRIPTION_TEXT = 'Custom Help Text'
 
@@ -26,6 +30,13 @@ def assert_field_conversion(mongoengine_field, graphene_field, **kwargs):
     assert field.description == DESCRIPTION_TEXT
     return field
  
+def assert_geo_field_conversion(mongoengine_field, geo_type):
+    field = convert_mongoengine_field(mongoengine_field(description=DESCRIPTION_TEXT))
+    assert isinstance(field, Field)
+    assert field.type == geo_type
+    assert field.description == DESCRIPTION_TEXT
+    return field
+
 def assert_list_field_conversion(list_type, mongoengine_field, graphene_field, **kwargs):
     field = list_type(field=mongoengine_field, description=DESCRIPTION_TEXT, **kwargs)
     graphene_type = convert_mongoengine_field(field)
@@ -113,32 +124,39 @@ def test_should_dict_convert_jsonstring():
 #     assert_field_conversion(fields.MapField, JSONString)
 
 
-def test_should_geopoint_convert_jsonstring():
-    assert_field_conversion(fields.GeoPointField, JSONString)
+def test_should_geopoint_convert_geojson():
+    assert_geo_field_conversion(fields.GeoPointField, GeoJSONPoint)
+
 
+def test_should_polygon_convert_geojson():
+    assert_geo_field_conversion(fields.PolygonField, GeoJSONPolygon)
 
-def test_should_polygon_convert_jsonstring():
-    assert_field_conversion(fields.PolygonField, JSONString)
 
+def test_should_point_convert_geojson():
+    assert_geo_field_conversion(fields.PointField, GeoJSONPoint)
 
-def test_should_point_convert_jsonstring():
-    assert_field_conversion(fields.PointField, JSONString)
 
+def test_should_linestring_convert_geojson():
+    assert_geo_field_conversion(fields.LineStringField, GeoJSONLineString)
 
-def test_should_linestring_convert_jsonstring():
-    assert_field_conversion(fields.LineStringField, JSONString)
 
+def test_should_multipoint_convert_geojson():
+    assert_geo_field_conversion(fields.MultiPointField, GeoJSONMultiPoint)
 
-def test_should_multipoint_convert_jsonstring():
-    assert_field_conversion(fields.MultiPointField, JSONString)
 
+def test_should_multilinestring_convert_geojson():
+    assert_geo_field_conversion(fields.MultiLineStringField, GeoJSONMultiLineString)
 
-def test_should_multilinestring_convert_jsonstring():
-    assert_field_conversion(fields.MultiLineStringField, JSONString)
 
+def test_should_multipolygon_convert_geojson():
+    assert_geo_field_conversion(fields.MultiPolygonField, GeoJSONMultiPolygon)
 
-def test_should_multipolygon_convert_jsonstring():
-    assert_field_conversion(fields.MultiPolygonField, JSONString)
+
+def test_should_list_point_convert_list_geojson():
+    field = fields.ListField(fields.PointField(), description=DESCRIPTION_TEXT)
+    graphene_type = convert_mongoengine_field(field)
+    assert isinstance(graphene_type, List)
+    assert graphene_type.of_type == GeoJSONPoint
 
 
 def test_should_list_int_convert_list_int():
@@ -153,6 +171,16 @@ def test_should_list_none_convert_list_string():
     assert_list_field_conversion(fields.ListField, None, List)
 
 
+def test_should_list_field_instance_convert_list_string():
+    assert_list_field_conversion(fields.ListField, fields.StringField(), List)
+
+
+def test_should_nested_list_convert_nested_list():
+    field = assert_list_field_conversion(fields.ListField, fields.ListField(fields.IntField()), List)
+    assert isinstance(field.type.of_type, List)
+    assert field.type.of_type.of_type == Int
+
+
 def test_should_sortedlist_int_convert_list_int():
     assert_list_field_conversion(fields.SortedListField, fields.IntField, List)
 
@@ -182,3 +210,95 @@ def test_should_unregistered_reference_field_convert_dynamic():
     dynamic_field = assert_reference_field_conversion(fields.ReferenceField, PeriodicTask, Dynamic)
     # assert field.description == DESCRIPTION_TEXT
     assert not dynamic_field.get_type()
+
+
+def test_should_conversion_be_memoized_by_field_and_registry():
+    registry = Registry()
+    field = fields.ReferenceField(PeriodicTask)
+
+    converted = convert_mongoengine_field(field, registry)
+
+    assert convert_mongoengine_field(field, registry) is converted
+    assert convert_mongoengine_field(field, Registry()) is not converted
+    assert convert_mongoengine_field(fields.ReferenceField(PeriodicTask), registry) is not converted
+
+
+def test_should_mounted_conversion_be_memoized():
+    registry = Registry()
+    field = fields.StringField(description=DESCRIPTION_TEXT)
+
+    mounted = convert_mongoengine_field_as(field, registry, _as=Field)
+
+    assert isinstance(mounted, Field)
+    assert mounted.type == String
+    assert mounted.description == DESCRIPTION_TEXT
+    assert convert_mongoengine_field_as(field, registry, _as=Field) is mounted
+
+
+def test_should_cleared_conversion_cache_convert_again():
+    registry = Registry()
+    field = fields.StringField()
+    converted = convert_mongoengine_field(field, registry)
+
+    clear_conversion_cache(registry)
+    assert convert_mongoengine_field(field, registry) is not converted
+
+    converted = convert_mongoengine_field(field, registry)
+    clear_conversion_cache()
+    assert convert_mongoengine_field(field, registry) is not converted
+
+
+def test_should_shared_conversions_keep_document_field_order():
+    task_registry = Registry()
+
+    class PartialPeriodicTaskType(MongoEngineObjectType):
+        class Meta:
+            document = PeriodicTask
+            registry = task_registry
+            only_fields = ('task', 'enabled')
+
+    class FullPeriodicTaskType(MongoEngineObjectType):
+        class Meta:
+            document = PeriodicTask
+            registry = task_registry
+
+    assert list(PartialPeriodicTaskType._meta.fields) == ['task', 'enabled']
+    assert list(FullPeriodicTaskType._meta.fields) == list(PeriodicTask._fields)
+
+
+def test_should_generic_fields_convert_union():
+    generic_registry = Registry()
+
+    class GenericOwnerType(MongoEngineObjectType):
+        class Meta:
+            document = Owner
+            registry = generic_registry
+
+    class GenericTagType(MongoEngineObjectType):
+        class Meta:
+            document = Tag
+            registry = generic_registry
+
+    class GenericIntervalType(MongoEngineObjectType):
+        class Meta:
+            document = Interval
+            registry = generic_registry
+
+    union = convert_mongoengine_field(fields.GenericReferenceField(), generic_registry).get_type().type
+    assert issubclass(union, Union)
+    assert union._meta.types == (GenericOwnerType, GenericTagType)
+
+    field = fields.GenericLazyReferenceField(choices=['Tag'])
+    assert convert_mongoengine_field(field, generic_registry).get_type().type._meta.types == (GenericTagType,)
+
+    field = fields.GenericEmbeddedDocumentField(choices=[Interval, Crontab])
+    assert convert_mongoengine_field(field, generic_registry).get_type().type._meta.types == (GenericIntervalType,)
+
+    field = fields.ListField(fields.GenericReferenceField(choices=[Owner, Tag]))
+    list_type = convert_mongoengine_field(field, generic_registry).get_type().type
+    assert isinstance(list_type, List) and list_type.of_type is union
+
+
+def test_should_unregistered_generic_fields_convert_jsonstring():
+    field = fields.GenericEmbeddedDocumentField(choices=[Crontab])
+    assert convert_mongoengine_field(field, Registry()).get_type().type == JSONString
@@ -0,0 +1,118 @@
+from graphene import ObjectType, Schema
+from graphene.relay import Node
+
+from graphql import parse
+
+from mongoengine import QuerySet
+
+from ..cost import QueryCostBackend, get_query_cost
+from ..fields import MongoEngineConnectionField
+from ..types import MongoEngineObjectType
+from .models import Owner
+from .types import PeriodicTaskType, schema
+
+
+class TaskOwnerType(MongoEngineObjectType):
+
+    class Meta:
+        document = Owner
+        interfaces = (Node,)
+        skip_registry = True
+
+    tasks = MongoEngineConnectionField(PeriodicTaskType, max_limit=4)
+
+
+class OwnerQuery(ObjectType):
+
+    owners = MongoEngineConnectionField(TaskOwnerType)
+
+
+owner_schema = Schema(query=OwnerQuery)
+
+
+def get_cost(query_schema, query, variables=None, **kwargs):
+    return get_query_cost(query_schema, parse(query), variables, **kwargs)
+
+
+def test_cost_counts_pages_and_lists():
+    query = '{ periodicTasks(first: 5) { totalCount edges { node { name owner { name } tags { label } } } } }'
+
+    assert get_cost(schema, query) == 5 + 5 * 1 + 5 * 10
+    assert get_cost(schema, query, list_size=2) == 5 + 5 * 1 + 5 * 2
+
+
+def test_cost_multiplies_nested_connections():
+    query = '''
+    query Owners($first: Int) {
+        owners(first: $first) { edges { node { ...OwnerTasks } } }
+    }
+    fragment OwnerTasks on TaskOwnerType {
+        tasks(first: 20) { edges { node { name tags { label } } } }
+    }
+    '''
+
+    # tasks pages are bounded by their max_limit
+    assert get_cost(owner_schema, query, {'first': 10}) == 10 + 10 * 4 + 40 * 10
+    # owners pages are unbounded
+    assert get_cost(owner_schema, query, default_page_size=50) == 50 + 50 * 4 + 200 * 10
+
+
+def test_cost_of_limited_connection():
+    assert get_cost(schema, '{ limitedPeriodicTasks(first: 1000000) { edges { node { name } } } }') == 3
+    assert get_cost(schema, '{ limitedPeriodicTasks { edges { node { name } } } }') == 3
+
+
+def test_backend_rejects_costly_queries(periodic_tasks, find_calls):
+    backend = QueryCostBackend(max_cost=20)
+
+    result = schema.execute('{ periodicTasks(first: 50) { edges { node { name } } } }', backend=backend)
+
+    assert result.invalid
+    assert [error.message for error in result.errors] == ['Query cost 50 exceeds the maximum cost of 20']
+    assert not find_calls
+
+    result = schema.execute('{ periodicTasks(first: 5) { edges { node { name } } } }', backend=backend)
+
+    assert not result.errors
+    assert len(result.data['periodicTasks']['edges']) == 5
+
+
+def test_max_limit_clamps_page_size(periodic_tasks):
+    result = schema.execute('''{
+        first: limitedPeriodicTasks(first: 1000000) { edges { node { name } } pageInfo { hasNextPage } }
+        default: limitedPeriodicTasks { edges { node { name } } }
+        last: limitedPeriodicTasks(last: 50) { edges { node { name } } }
+    }''')
+
+    assert not result.errors
+    assert [edge['node']['name'] for edge in result.data['first']['edges']] == ['task-00', 'task-01', 'task-02']
+    assert result.data['first']['pageInfo']['hasNextPage']
+    assert len(result.data['default']['edges']) == 3
+    assert [edge['node']['name'] for edge in result.data['last']['edges']] == ['task-07', 'task-08', 'task-09']
+
+
+def test_strict_max_limit_rejects_page_size(periodic_tasks):
+    result = schema.execute('{ strictLimitedPeriodicTasks(first: 4) { edges { node { name } } } }')
+
+    assert [error.message for error in result.errors] == [
+        'Requesting 4 nodes with "first" exceeds the limit of 3'
+    ]
+
+    result = schema.execute('{ strictLimitedPeriodicTasks(first: 3) { edges { node { name } } } }')
+    assert not result.errors
+
+
+def test_batch_size_applied(periodic_tasks, monkeypatch):
+    batch_sizes = []
+    batch_size = QuerySet.batch_size
+
+    def recording_batch_size(queryset, size):
+        batch_sizes.append(size)
+        return batch_size(queryset, size)
+
+    monkeypatch.setattr(QuerySet, 'batch_size', recording_batch_size)
+
+    result = schema.execute('{ limitedPeriodicTasks { edges { node { name } } } }')
+
+    assert not result.errors
+    assert batch_sizes == [2]
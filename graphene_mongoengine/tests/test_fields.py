@@ -0,0 +1,213 @@
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+
+from ..fields import create_connection_field
+from ..pagination import get_offset_window
+from .types import PeriodicTaskType, schema
+
+PAGE_QUERY = '''
+query Page($first: Int, $last: Int, $after: String, $before: String) {
+    %s(first: $first, last: $last, after: $after, before: $before) {
+        pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+        edges { cursor node { name } }
+    }
+}
+'''
+
+
+def execute_page(field_name='periodicTasks', **variables):
+    result = schema.execute(PAGE_QUERY % field_name, variable_values=variables)
+    assert not result.errors
+    return result.data[field_name]
+
+
+def get_names(page):
+    return [edge['node']['name'] for edge in page['edges']]
+
+
+def test_offset_window_first_after():
+    assert get_offset_window({'first': 3}, 10) == (0, 3)
+    assert get_offset_window({'first': 3, 'after': offset_to_cursor(4)}, 10) == (5, 8)
+    assert get_offset_window({'first': 30}, 10) == (0, 10)
+
+
+def test_offset_window_last_before():
+    assert get_offset_window({'last': 3}, 10) == (7, 10)
+    assert get_offset_window({'last': 3, 'before': offset_to_cursor(5)}, 10) == (2, 5)
+    assert get_offset_window({'after': offset_to_cursor(5), 'before': offset_to_cursor(2)}, 10) == (6, 6)
+
+
+def test_first_page_fetches_page_documents_only(periodic_tasks, fetched_documents):
+    page = execute_page(first=2)
+
+    assert get_names(page) == ['task-00', 'task-01']
+    assert page['pageInfo']['hasNextPage']
+    assert len(fetched_documents) == 2
+
+
+def test_after_page_fetches_page_documents_only(periodic_tasks, fetched_documents):
+    page = execute_page(first=3, after=offset_to_cursor(4))
+
+    assert get_names(page) == ['task-05', 'task-06', 'task-07']
+    assert page['edges'][0]['cursor'] == offset_to_cursor(5)
+    assert len(fetched_documents) == 3
+
+
+def test_last_page_fetches_page_documents_only(periodic_tasks, fetched_documents):
+    page = execute_page(last=2)
+
+    assert get_names(page) == ['task-08', 'task-09']
+    assert page['pageInfo']['hasPreviousPage']
+    assert not page['pageInfo']['hasNextPage']
+    assert len(fetched_documents) == 2
+
+
+def test_last_before_page_fetches_page_documents_only(periodic_tasks, fetched_documents):
+    page = execute_page(last=2, before=offset_to_cursor(5))
+
+    assert get_names(page) == ['task-03', 'task-04']
+    assert len(fetched_documents) == 2
+
+
+def test_empty_window_fetches_nothing(periodic_tasks, fetched_documents):
+    page = execute_page(first=0)
+
+    assert page['edges'] == []
+    assert not fetched_documents
+
+
+def test_unsliced_field_matches_sliced_field(periodic_tasks):
+    for arguments in ({'first': 3, 'after': offset_to_cursor(1)}, {'last': 4}, {'first': 0}):
+        assert execute_page(**arguments) == execute_page('unslicedPeriodicTasks', **arguments)
+
+
+def collect_pages(field_name, page_size, forward=True):
+    names, cursor, pages = [], None, 0
+    while True:
+        if forward:
+            page = execute_page(field_name, first=page_size, after=cursor)
+            names += get_names(page)
+            cursor = page['pageInfo']['endCursor']
+            has_more = page['pageInfo']['hasNextPage']
+        else:
+            page = execute_page(field_name, last=page_size, before=cursor)
+            names = get_names(page) + names
+            cursor = page['pageInfo']['startCursor']
+            has_more = page['pageInfo']['hasPreviousPage']
+        pages += 1
+        if not has_more:
+            return names, pages
+
+
+def test_keyset_pages_forward(periodic_tasks):
+    names, pages = collect_pages('keysetPeriodicTasks', 3)
+
+    assert names == [task.name for task in periodic_tasks]
+    assert pages == 4
+
+
+def test_keyset_pages_backward(periodic_tasks):
+    names, pages = collect_pages('keysetPeriodicTasks', 4, forward=False)
+
+    assert names == [task.name for task in periodic_tasks]
+    assert pages == 3
+
+
+def test_keyset_descending_sort_field_pages(periodic_tasks):
+    expected = [
+        task.name for task in sorted(
+            periodic_tasks, key=lambda task: (task.total_run_count, task.pk), reverse=True
+        )
+    ]
+
+    assert collect_pages('keysetRunCountPeriodicTasks', 3)[0] == expected
+    assert collect_pages('keysetRunCountPeriodicTasks', 3, forward=False)[0] == expected
+
+
+def test_keyset_page_info(periodic_tasks):
+    first_page = execute_page('keysetPeriodicTasks', first=2)
+    last_page = execute_page('keysetPeriodicTasks', last=2)
+
+    assert first_page['pageInfo']['hasNextPage']
+    assert not first_page['pageInfo']['hasPreviousPage']
+    assert first_page['pageInfo']['startCursor'] == first_page['edges'][0]['cursor']
+    assert get_names(last_page) == ['task-08', 'task-09']
+    assert last_page['pageInfo']['hasPreviousPage']
+    assert not last_page['pageInfo']['hasNextPage']
+
+
+def test_keyset_deep_page_fetches_page_documents_only(periodic_tasks, fetched_documents):
+    cursor = execute_page('keysetPeriodicTasks', first=7)['pageInfo']['endCursor']
+    del fetched_documents[:]
+
+    page = execute_page('keysetPeriodicTasks', first=2, after=cursor)
+
+    assert get_names(page) == ['task-07', 'task-08']
+    assert page['pageInfo']['hasNextPage']
+    # The page plus the document telling whether there is a next page
+    assert len(fetched_documents) == 3
+
+
+def test_keyset_between_cursors(periodic_tasks):
+    edges = execute_page('keysetPeriodicTasks', first=10)['edges']
+
+    page = execute_page('keysetPeriodicTasks', after=edges[2]['cursor'], before=edges[6]['cursor'])
+
+    assert get_names(page) == ['task-03', 'task-04', 'task-05']
+
+
+def test_lazy_count_skips_count_when_not_selected(periodic_tasks, counted_queries, fetched_documents):
+    page = execute_page('lazyPeriodicTasks', first=3, after=offset_to_cursor(1))
+
+    assert get_names(page) == ['task-02', 'task-03', 'task-04']
+    assert page['pageInfo']['hasNextPage']
+    assert not counted_queries
+    # The page plus the document telling whether there is a next page
+    assert len(fetched_documents) == 4
+
+
+def test_lazy_count_last_page(periodic_tasks, counted_queries):
+    page = execute_page('lazyPeriodicTasks', first=3, after=offset_to_cursor(6))
+
+    assert get_names(page) == ['task-07', 'task-08', 'task-09']
+    assert not page['pageInfo']['hasNextPage']
+    assert not counted_queries
+
+
+def test_lazy_count_matches_counted_pages(periodic_tasks):
+    cursors = (None, offset_to_cursor(2), offset_to_cursor(8))
+    for after in cursors:
+        for before in cursors:
+            for first in (None, 0, 2, 20):
+                arguments = {'first': first, 'after': after, 'before': before}
+                assert execute_page('lazyPeriodicTasks', **arguments) == execute_page(**arguments)
+
+
+def test_lazy_count_counts_when_selected(periodic_tasks, counted_queries):
+    result = schema.execute('{ lazyPeriodicTasks(first: 2) { totalCount edges { node { name } } } }')
+
+    assert not result.errors
+    assert result.data['lazyPeriodicTasks']['totalCount'] == len(periodic_tasks)
+    assert counted_queries == ['count']
+
+
+def test_estimated_count_for_unfiltered_queries(periodic_tasks, counted_queries):
+    result = schema.execute('{ estimatedPeriodicTasks(first: 2) { totalCount } }')
+
+    assert not result.errors
+    assert result.data['estimatedPeriodicTasks']['totalCount'] == len(periodic_tasks)
+    assert counted_queries == ['estimated']
+
+
+def test_estimated_count_falls_back_for_filtered_queries(periodic_tasks, counted_queries):
+    periodic_tasks[0].update(enabled=True)
+
+    result = schema.execute('{ enabledPeriodicTasks(first: 2) { totalCount } }')
+
+    assert not result.errors
+    assert result.data['enabledPeriodicTasks']['totalCount'] == 1
+    assert counted_queries == ['count']
+
+
+def test_created_connection_fields_count_lazily():
+    assert create_connection_field(PeriodicTaskType).options.lazy_count
+    assert not create_connection_field(PeriodicTaskType, lazy_count=False).options.lazy_count
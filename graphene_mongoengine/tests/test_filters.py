@@ -0,0 +1,79 @@
+import pytest
+
+from ..fields import MongoEngineConnectionField
+from ..filters import get_filter_arguments, get_indexed_field_names
+from .models import PeriodicTask
+from .types import PeriodicTaskType, schema
+
+
+def execute_filtered(arguments, field_name='filteredPeriodicTasks'):
+    result = schema.execute(f'{{ {field_name}({arguments}) {{ edges {{ node {{ name }} }} }} }}')
+    assert not result.errors, result.errors
+    return [edge['node']['name'] for edge in result.data[field_name]['edges']]
+
+
+def find_task_filters(find_calls):
+    return [query for collection, query in find_calls if collection == 'periodic_task']
+
+
+def test_filter_arguments_for_field_types():
+    arguments, _ = get_filter_arguments(PeriodicTaskType)
+
+    assert {'name', 'name_in', 'name_prefix'} <= set(arguments)
+    assert {f'total_run_count{suffix}' for suffix in ('', '_in', '_gt', '_gte', '_lt', '_lte')} <= set(arguments)
+    assert {'expires_gte', 'enabled'} <= set(arguments)
+    assert 'enabled_in' not in arguments
+    assert 'id' not in arguments
+    assert 'interval' not in arguments
+
+
+def test_indexed_filter_arguments():
+    query_fields = schema.get_query_type().fields
+
+    assert get_indexed_field_names(PeriodicTask) == {'name', 'total_run_count'}
+    assert set(query_fields['indexedPeriodicTasks'].args) == {
+        'first', 'last', 'before', 'after', 'name', 'nameIn', 'namePrefix',
+        'totalRunCount', 'totalRunCountIn', 'totalRunCountGt', 'totalRunCountGte',
+        'totalRunCountLt', 'totalRunCountLte',
+    }
+    assert set(query_fields['periodicTasks'].args) == {'first', 'last', 'before', 'after'}
+
+
+def test_equality_filters(periodic_tasks, find_calls):
+    assert execute_filtered('totalRunCount: 2') == ['task-02', 'task-06']
+    assert execute_filtered('name: "task-03"') == ['task-03']
+    assert {'total_run_count': 2} in find_task_filters(find_calls)
+
+
+def test_in_filters(periodic_tasks):
+    assert execute_filtered('nameIn: ["task-01", "task-08", "missing"]') == ['task-01', 'task-08']
+    assert execute_filtered('totalRunCountIn: [0, 3]') == ['task-00', 'task-03', 'task-04', 'task-07', 'task-08']
+
+
+def test_range_filters(periodic_tasks, find_calls):
+    assert execute_filtered('totalRunCountGt: 1, totalRunCountLte: 2') == ['task-02', 'task-06']
+    assert {'total_run_count': {'$gt': 1, '$lte': 2}} in find_task_filters(find_calls)
+
+
+def test_prefix_filter(periodic_tasks):
+    PeriodicTask.objects(name='task-05').update(set__name='other-05')
+
+    assert execute_filtered('namePrefix: "other"') == ['other-05']
+    assert len(execute_filtered('namePrefix: "task-"')) == len(periodic_tasks) - 1
+
+
+def test_filters_combine_with_pagination(periodic_tasks):
+    assert execute_filtered('totalRunCountGte: 2, first: 3', 'indexedPeriodicTasks') == ['task-02', 'task-03', 'task-06']
+
+
+def test_explicit_filter_fields():
+    field = MongoEngineConnectionField(PeriodicTaskType, filter_fields=['name', 'enabled'])
+
+    assert set(field.args) == {'first', 'last', 'before', 'after', 'name', 'name_in', 'name_prefix', 'enabled'}
+
+
+def test_unsupported_filter_fields_are_rejected():
+    field = MongoEngineConnectionField(PeriodicTaskType, filter_fields=['interval'])
+
+    with pytest.raises(AssertionError):
+        field.args
@@ -0,0 +1,152 @@
+import pytest
+
+from ..fields import MongoEngineConnectionField
+from ..geo import get_count_query, is_near_query
+from .models import Place
+from .types import PeriodicTaskType, PlaceType, Query, schema
+
+PLACES_QUERY = '''
+{
+    %s {
+        edges {
+            node {
+                name
+                location { type coordinates }
+                position { type coordinates }
+                area { type coordinates }
+                districts { coordinates }
+                entrances { coordinates }
+            }
+        }
+    }
+}
+'''
+
+SQUARE = [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]
+
+
+@pytest.fixture
+def places():
+    Place.drop_collection()
+    places = [
+        Place(
+            name=f'place-{i}',
+            location=[i, i + 1],
+            position=[i, i + 1],
+            area=SQUARE,
+            districts=[SQUARE],
+            entrances=[[i, 0], [0, i]],
+        ).save()
+        for i in range(3)
+    ]
+    yield places
+    Place.drop_collection()
+
+
+def get_geo_query(field_name, **args):
+    field = Query._meta.fields[field_name]
+    queryset = MongoEngineConnectionField.apply_geo_filters(
+        Place.objects, PlaceType._meta.connection, field.options, args
+    )
+    return queryset._query
+
+
+def test_geo_arguments():
+    query_fields = schema.get_query_type().fields
+
+    assert set(query_fields['places'].args) == {
+        'first', 'last', 'before', 'after', 'near', 'maxDistance', 'withinBox', 'withinPolygon'
+    }
+    assert 'near' not in query_fields['periodicTasks'].args
+
+
+def test_geo_field_must_be_a_geo_field():
+    with pytest.raises(AssertionError, match='has no 2dsphere or 2d index'):
+        MongoEngineConnectionField(PeriodicTaskType, geo_field=True).args
+
+    with pytest.raises(AssertionError, match='can not be used for geo arguments'):
+        MongoEngineConnectionField(PlaceType, geo_field='name').args
+
+    with pytest.raises(AssertionError, match='Geo arguments are find filters'):
+        MongoEngineConnectionField(PlaceType, geo_field=True, aggregate=True)
+
+
+@pytest.mark.parametrize('field_name', ['places', 'rawPlaces'])
+def test_geo_fields_resolve_to_geojson(places, field_name):
+    result = schema.execute(PLACES_QUERY % field_name)
+
+    assert not result.errors, result.errors
+    node = result.data[field_name]['edges'][1]['node']
+    assert node == {
+        'name': 'place-1',
+        'location': {'type': 'Point', 'coordinates': [1.0, 2.0]},
+        'position': {'type': 'Point', 'coordinates': [1.0, 2.0]},
+        'area': {'type': 'Polygon', 'coordinates': SQUARE},
+        'districts': {'coordinates': [SQUARE]},
+        'entrances': [{'coordinates': [1.0, 0.0]}, {'coordinates': [0.0, 1.0]}],
+    }
+
+
+def test_near_compiles_to_geojson_near():
+    assert get_geo_query('places', near=[2, 3], max_distance=1000) == {
+        'location': {'$near': {'$geometry': {'type': 'Point', 'coordinates': [2, 3]}, '$maxDistance': 1000}}
+    }
+
+
+def test_within_compiles_to_geojson_geometry():
+    assert get_geo_query('places', within_box=[[0, 0], [2, 3]]) == {
+        'location': {'$geoWithin': {'$geometry': {
+            'type': 'Polygon', 'coordinates': [[[0, 0], [2, 0], [2, 3], [0, 3], [0, 0]]]
+        }}}
+    }
+    assert get_geo_query('raw_places', within_polygon=[[0, 0], [2, 0], [1, 2]]) == {
+        'area': {'$geoWithin': {'$geometry': {
+            'type': 'Polygon', 'coordinates': [[[0, 0], [2, 0], [1, 2], [0, 0]]]
+        }}}
+    }
+
+
+def test_legacy_geo_arguments():
+    assert get_geo_query('legacy_places', near=[2, 3], max_distance=1.5) == {
+        'position': {'$near': [2, 3], '$maxDistance': 1.5}
+    }
+    assert get_geo_query('legacy_places', within_box=[[0, 0], [2, 3]]) == {
+        'position': {'$geoWithin': {'$box': [[0, 0], [2, 3]]}}
+    }
+    assert get_geo_query('legacy_places', within_polygon=[[0, 0], [2, 0], [1, 2]]) == {
+        'position': {'$geoWithin': {'$polygon': [[0, 0], [2, 0], [1, 2], [0, 0]]}}
+    }
+
+
+@pytest.mark.parametrize('arguments, message', [
+    ('maxDistance: 10', '"maxDistance" is only valid along with "near"'),
+    ('near: [1]', '"near" expects a [longitude, latitude] position'),
+    ('withinBox: [[0, 0]]', '"withinBox" expects the bottom left and top right corners'),
+    ('withinPolygon: [[0, 0], [1, 1]]', '"withinPolygon" expects at least 3 positions'),
+    ('withinBox: [[0, 0], [1, 1]], withinPolygon: [[0, 0], [1, 1], [1, 0]]', 'can not be combined'),
+])
+def test_invalid_geo_arguments(places, arguments, message):
+    result = schema.execute(f'{{ places({arguments}) {{ edges {{ node {{ name }} }} }} }}')
+
+    assert len(result.errors) == 1
+    assert message in result.errors[0].message
+
+
+def test_near_is_counted_within_a_sphere():
+    query = get_geo_query('places', near=[2, 3], max_distance=6378100)
+
+    assert is_near_query(query)
+    assert get_count_query(query) == {'$and': [{'location': {'$geoWithin': {'$centerSphere': [[2, 3], 1.0]}}}]}
+
+    query = get_geo_query('places', near=[2, 3], within_box=[[0, 0], [2, 3]])
+    count_query = get_count_query(query)
+    assert not is_near_query(count_query)
+    assert count_query['$and'] == [{'location': {'$exists': True}}]
+    assert set(count_query['location']) == {'$geoWithin'}
+
+
+def test_legacy_near_is_counted_within_a_circle():
+    query = get_geo_query('legacy_places', near=[2, 3], max_distance=1.5)
+
+    assert get_count_query(query) == {'$and': [{'position': {'$geoWithin': {'$center': [[2, 3], 1.5]}}}]}
+    assert not is_near_query(get_geo_query('legacy_places', within_box=[[0, 0], [2, 3]]))
@@ -0,0 +1,91 @@
+from graphql_relay import to_global_id
+
+from ..identity import get_identity_map
+from .models import Owner, PeriodicTask
+from .types import schema
+
+
+def find_task_calls(find_calls):
+    return [query for collection, query in find_calls if collection == 'periodic_task']
+
+
+def find_task_lookups(find_calls):
+    return [query for query in find_task_calls(find_calls) if '_id' in query]
+
+
+def find_owner_calls(find_calls):
+    return [query for collection, query in find_calls if collection == 'owner']
+
+
+def test_node_loaded_once_per_request(periodic_tasks, find_calls):
+    task_id = to_global_id('PeriodicTaskType', str(periodic_tasks[3].pk))
+
+    result = schema.execute('''
+        query Nodes($id: ID!) {
+            first: node(id: $id) { ... on PeriodicTaskType { name } }
+            second: node(id: $id) { ... on PeriodicTaskType { name } }
+        }
+    ''', variable_values={'id': task_id}, context_value={})
+
+    assert not result.errors
+    assert result.data['first'] == result.data['second'] == {'name': 'task-03'}
+    assert len(find_task_calls(find_calls)) == 1
+
+
+def test_node_found_in_connection_results(periodic_tasks, find_calls):
+    task_id = to_global_id('PeriodicTaskType', str(periodic_tasks[1].pk))
+
+    result = schema.execute('''
+        query Nodes($id: ID!) {
+            periodicTasks(first: 3) { edges { node { name enabled } } }
+            node(id: $id) { ... on PeriodicTaskType { name } }
+        }
+    ''', variable_values={'id': task_id}, context_value={})
+
+    assert not result.errors
+    assert result.data['node'] == {'name': 'task-01'}
+    assert not find_task_lookups(find_calls)
+
+
+def test_node_with_more_fields_is_fetched_again(periodic_tasks, find_calls):
+    task_id = to_global_id('PeriodicTaskType', str(periodic_tasks[1].pk))
+
+    result = schema.execute('''
+        query Nodes($id: ID!) {
+            periodicTasks(first: 3) { edges { node { name } } }
+            node(id: $id) { ... on PeriodicTaskType { name task } }
+        }
+    ''', variable_values={'id': task_id}, context_value={})
+
+    assert not result.errors
+    assert result.data['node'] == {'name': 'task-01', 'task': periodic_tasks[1].task}
+    assert len(find_task_lookups(find_calls)) == 1
+
+
+def test_references_found_in_identity_map(owned_periodic_tasks, find_calls):
+    owner_id = to_global_id('OwnerType', str(owned_periodic_tasks[1].pk))
+
+    result = schema.execute('''
+        query Owners($id: ID!) {
+            node(id: $id) { ... on OwnerType { name email } }
+            periodicTasks(first: 2) { edges { node { owner { name } } } }
+        }
+    ''', variable_values={'id': owner_id}, context_value={})
+
+    assert not result.errors
+    owners = [edge['node']['owner'] for edge in result.data['periodicTasks']['edges']]
+    assert owners == [{'name': 'owner-0'}, {'name': 'owner-1'}]
+
+    owner_queries = find_owner_calls(find_calls)
+    assert len(owner_queries) == 2
+    assert owner_queries[1]['_id']['$in'] == [owned_periodic_tasks[0].pk]
+
+
+def test_identity_map_is_scoped_to_the_request(periodic_tasks):
+    context = {}
+    schema.execute('{ periodicTasks(first: 2) { edges { node { name } } } }', context_value=context)
+
+    identity_map = get_identity_map(context)
+    assert set(identity_map) == {(PeriodicTask, task.pk) for task in periodic_tasks[:2]}
+    assert get_identity_map({}) == {}
+    assert (Owner, periodic_tasks[0].pk) not in identity_map
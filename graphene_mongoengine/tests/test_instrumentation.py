@@ -0,0 +1,140 @@
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+
+from graphql_relay import to_global_id
+
+from ..instrumentation import (
+    InstrumentationListener, InstrumentationMiddleware, RequestMetrics,
+    get_request_metrics, use_instrumentation_context
+)
+from .models import Owner, PeriodicTask, Tag
+from .types import schema
+
+request_ids = count()
+
+
+def command_events(name, command, reply, duration_micros=1000):
+    """ Returns a started and a succeeded event of a command, as pymongo sends them """
+    request_id = next(request_ids)
+    started = SimpleNamespace(
+        command_name=name, database_name='test', command=command, connection_id=('localhost', 27017),
+        request_id=request_id,
+    )
+    succeeded = SimpleNamespace(
+        command_name=name, connection_id=('localhost', 27017), request_id=request_id,
+        duration_micros=duration_micros, reply=reply,
+    )
+    return started, succeeded
+
+
+@pytest.fixture
+def listener(monkeypatch):
+    """ Sends the command events of the finds issued, mongomock does not """
+    command_listener = InstrumentationListener()
+
+    for document in (Owner, PeriodicTask, Tag):
+        collection = document._get_collection()
+
+        def find(*args, _find=collection.find, _name=collection.name, **kwargs):
+            started, succeeded = command_events('find', {'find': _name}, {'cursor': {'firstBatch': []}, 'ok': 1})
+            command_listener.started(started)
+            command_listener.succeeded(succeeded)
+            return _find(*args, **kwargs)
+
+        monkeypatch.setattr(collection, 'find', find)
+
+    return command_listener
+
+
+def execute(query):
+    context = {}
+    result = schema.execute(query, context_value=context, middleware=[InstrumentationMiddleware()])
+    assert not result.errors, result.errors
+    return get_request_metrics(context)
+
+
+def test_middleware_records_field_paths(periodic_tasks):
+    metrics = execute('{ periodicTasks(first: 2) { edges { node { name } } } }')
+
+    assert list(metrics.fields) == [
+        'periodicTasks', 'periodicTasks.edges', 'periodicTasks.edges.node', 'periodicTasks.edges.node.name'
+    ]
+    assert metrics.fields['periodicTasks'].calls == 1
+    assert metrics.fields['periodicTasks.edges.node.name'].calls == 2
+    assert metrics.fields['periodicTasks'].time > 0
+
+
+def test_commands_attributed_to_field_paths(owned_periodic_tasks, listener):
+    metrics = execute('{ periodicTasks(first: 4) { edges { node { name owner { name } } } } }')
+
+    fields = metrics.as_dict()['fields']
+    # mongomock counts with a find too
+    task_commands = fields['periodicTasks']['commands']
+    assert task_commands >= 1
+    # The owners are batched into one query, attributed to the path of the first load
+    assert fields['periodicTasks.edges.node.owner']['commands'] == 1
+    assert fields['periodicTasks.edges.node.name']['commands'] == 0
+    assert metrics.as_dict()['commands'] == task_commands + 1
+
+
+def test_node_lookups_attributed(periodic_tasks, listener):
+    node_id = to_global_id('PeriodicTaskType', str(periodic_tasks[0].pk))
+    metrics = execute('{ node(id: "%s") { ... on PeriodicTaskType { name } } }' % node_id)
+
+    assert metrics.fields['node'].commands == 1
+
+
+def test_commands_outside_requests_ignored():
+    command_listener = InstrumentationListener()
+    started, succeeded = command_events('find', {'find': 'tag'}, {'cursor': {'firstBatch': []}, 'ok': 1})
+
+    command_listener.started(started)
+    command_listener.succeeded(succeeded)
+
+    assert not command_listener._started
+
+
+@pytest.mark.parametrize('count_bytes', [False, True])
+def test_listener_counts_documents_and_bytes(count_bytes):
+    command_listener = InstrumentationListener(count_bytes=count_bytes)
+    metrics = RequestMetrics()
+    reply = {'cursor': {'firstBatch': [{'_id': 1}, {'_id': 2}], 'id': 0}, 'ok': 1}
+
+    with use_instrumentation_context((metrics, 'tasks')):
+        started, succeeded = command_events('find', {'find': 'tag'}, reply, duration_micros=2500)
+        command_listener.started(started)
+    command_listener.succeeded(succeeded)
+
+    field = metrics.fields['tasks']
+    assert (field.commands, field.documents, field.command_time) == (1, 2, 0.0025)
+    assert (field.bytes > 0) == count_bytes
+    assert not metrics.slow_commands
+
+
+def test_slow_commands_explained():
+    slow_commands = []
+    command_listener = InstrumentationListener(slow_ms=5, on_slow_command=slow_commands.append)
+    metrics = RequestMetrics()
+    command = {'find': 'periodic_task', 'filter': {'enabled': True}, '$db': 'test', 'lsid': {'id': 1}}
+
+    with use_instrumentation_context((metrics, 'tasks')):
+        for duration_micros in (1000, 8000):
+            started, succeeded = command_events('find', command, {'cursor': {'firstBatch': []}}, duration_micros)
+            command_listener.started(started)
+            command_listener.succeeded(succeeded)
+
+    assert [slow_command.duration for slow_command in slow_commands] == [0.008]
+
+    explained = []
+
+    class Database(object):
+        def command(self, name, value, verbosity):
+            explained.append((name, value, verbosity))
+            return {'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN'}}}
+
+    metrics.explain_slow_commands({'test': Database()})
+
+    assert explained == [('explain', {'find': 'periodic_task', 'filter': {'enabled': True}}, 'queryPlanner')]
+    assert metrics.as_dict()['slow_commands'][0]['explain'] == {'stage': 'COLLSCAN'}
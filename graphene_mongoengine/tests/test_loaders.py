@@ -0,0 +1,273 @@
+import pytest
+
+from graphql_relay import to_global_id
+
+from ..identity import get_identity_map
+from ..loaders import InstrumentedLoader
+from ..references import get_stored_value, keep_stored_references
+from .conftest import OWNER_COUNT
+from .models import Crontab, Interval, Owner, PeriodicTask
+from .test_nodes import ResolveInfoStub
+from .types import PeriodicTaskType, schema
+
+OWNERS_QUERY = '''
+{
+    periodicTasks {
+        edges { node { name owner { name } createdBy { name } } }
+    }
+}
+'''
+
+
+def find_owner_calls(find_calls):
+    return [query for collection, query in find_calls if collection == 'owner']
+
+
+def test_references_load_in_one_query(owned_periodic_tasks, find_calls):
+    result = schema.execute(OWNERS_QUERY, context_value={})
+
+    assert not result.errors
+    nodes = [edge['node'] for edge in result.data['periodicTasks']['edges']]
+    assert [node['owner']['name'] for node in nodes[:4]] == ['owner-0', 'owner-1', 'owner-2', 'owner-0']
+    assert nodes[1]['createdBy'] == nodes[1]['owner']
+
+    owner_queries = find_owner_calls(find_calls)
+    assert len(owner_queries) == 1
+    assert len(owner_queries[0]['_id']['$in']) == len(owned_periodic_tasks)
+
+
+def test_loaders_are_scoped_to_the_request(owned_periodic_tasks, find_calls):
+    for _ in range(2):
+        result = schema.execute(OWNERS_QUERY, context_value={})
+        assert not result.errors
+
+    assert len(find_owner_calls(find_calls)) == 2
+
+
+def test_references_resolve_without_context(owned_periodic_tasks, find_calls):
+    result = schema.execute(OWNERS_QUERY)
+
+    assert not result.errors
+    nodes = [edge['node'] for edge in result.data['periodicTasks']['edges']]
+    assert nodes[2]['owner'] == nodes[2]['createdBy'] == {'name': 'owner-2'}
+
+
+def test_missing_references_resolve_to_null(owned_periodic_tasks):
+    owned_periodic_tasks[0].delete()
+
+    result = schema.execute(OWNERS_QUERY, context_value={})
+
+    assert not result.errors
+    assert result.data['periodicTasks']['edges'][0]['node']['owner'] is None
+
+
+def find_tag_calls(find_calls):
+    return [query for collection, query in find_calls if collection == 'tag']
+
+
+def test_reference_lists_load_in_one_query(tagged_periodic_tasks, find_calls):
+    result = schema.execute('{ periodicTasks { edges { node { tags { label } } } } }', context_value={})
+
+    assert not result.errors
+    tags = [edge['node']['tags'] for edge in result.data['periodicTasks']['edges']]
+    assert tags[0] == [{'label': 'tag-0'}, {'label': 'tag-1'}]
+    assert tags[3] == [{'label': 'tag-3'}, {'label': 'tag-0'}]
+
+    tag_queries = find_tag_calls(find_calls)
+    assert len(tag_queries) == 1
+    assert len(tag_queries[0]['_id']['$in']) == len(tagged_periodic_tasks)
+
+
+def test_reference_list_connections_load_the_page_only(owned_periodic_tasks, tagged_periodic_tasks, find_calls):
+    result = schema.execute('''
+        { periodicTasks(first: 3) { edges { node {
+            watchers(first: 1, after: "YXJyYXljb25uZWN0aW9uOjA=") {
+                pageInfo { hasNextPage }
+                edges { node { name } }
+            }
+        } } } }
+    ''', context_value={})
+
+    assert not result.errors
+    for edge in result.data['periodicTasks']['edges']:
+        watchers = edge['node']['watchers']
+        assert watchers['pageInfo']['hasNextPage']
+        assert [watcher['node']['name'] for watcher in watchers['edges']] == ['owner-1']
+
+    owner_queries = find_owner_calls(find_calls)
+    assert len(owner_queries) == 1
+    assert owner_queries[0]['_id']['$in'] == [owned_periodic_tasks[1].pk]
+
+
+def test_reference_lists_resolve_without_context(tagged_periodic_tasks):
+    result = schema.execute('{ periodicTasks(first: 1) { edges { node { tags { label } } } } }')
+
+    assert not result.errors
+    assert result.data['periodicTasks']['edges'][0]['node']['tags'] == [{'label': 'tag-0'}, {'label': 'tag-1'}]
+
+
+def test_lazy_reference_ids_resolve_without_fetch(owned_periodic_tasks, find_calls):
+    result = schema.execute('{ periodicTasks { edges { node { createdBy { id } } } } }', context_value={})
+
+    assert not result.errors
+    nodes = [edge['node'] for edge in result.data['periodicTasks']['edges']]
+    assert nodes[1]['createdBy'] == {'id': to_global_id('OwnerType', str(owned_periodic_tasks[1].pk))}
+    assert not find_owner_calls(find_calls)
+
+
+def test_lazy_references_fetch_other_fields(owned_periodic_tasks, find_calls):
+    result = schema.execute('{ periodicTasks { edges { node { createdBy { id name } } } } }', context_value={})
+
+    assert not result.errors
+    assert result.data['periodicTasks']['edges'][1]['node']['createdBy']['name'] == 'owner-1'
+    assert len(find_owner_calls(find_calls)) == 1
+
+
+@pytest.fixture
+def assigned_periodic_tasks(periodic_tasks, owned_periodic_tasks):
+    for i, task in enumerate(periodic_tasks):
+        task.update(assignee=owned_periodic_tasks[i % OWNER_COUNT])
+    return owned_periodic_tasks
+
+
+def test_cached_references_resolve_from_cached_fields(assigned_periodic_tasks, find_calls):
+    query = '{ rawPeriodicTasks { edges { node { assignee { id name } createdBy { id } } } } }'
+    result = schema.execute(query, context_value={})
+
+    assert not result.errors
+    node = result.data['rawPeriodicTasks']['edges'][2]['node']
+    assert node['assignee'] == {'id': to_global_id('OwnerType', str(assigned_periodic_tasks[2].pk)), 'name': 'owner-2'}
+    assert node['createdBy'] == {'id': to_global_id('OwnerType', str(assigned_periodic_tasks[2].pk))}
+    assert not find_owner_calls(find_calls)
+
+
+def test_cached_references_fetch_uncached_fields(assigned_periodic_tasks, find_calls):
+    assigned_periodic_tasks[1].update(email='owner-1@example.com')
+
+    query = '{ rawPeriodicTasks { edges { node { assignee { name email } } } } }'
+    result = schema.execute(query, context_value={})
+
+    assert not result.errors
+    assert result.data['rawPeriodicTasks']['edges'][1]['node']['assignee'] == {
+        'name': 'owner-1', 'email': 'owner-1@example.com'
+    }
+    assert len(find_owner_calls(find_calls)) == 1
+
+
+@pytest.fixture
+def dereferences(monkeypatch):
+    """ Records the DBRefs MongoEngine dereferences one by one """
+    dereferenced = []
+    database = Owner._get_db()
+    dereference = database.dereference
+
+    def recording_dereference(dbref, *args, **kwargs):
+        dereferenced.append(dbref)
+        return dereference(dbref, *args, **kwargs)
+
+    monkeypatch.setattr(database, 'dereference', recording_dereference)
+    return dereferenced
+
+
+@pytest.mark.parametrize('selection, owner_finds', [('id name', 0), ('name email', 1)])
+def test_cached_references_of_documents_are_not_dereferenced(
+        assigned_periodic_tasks, find_calls, dereferences, selection, owner_finds):
+    query = f'{{ periodicTasks {{ edges {{ node {{ assignee {{ {selection} }} }} }} }} }}'
+    result = schema.execute(query, context_value={})
+
+    assert not result.errors
+    assert result.data['periodicTasks']['edges'][2]['node']['assignee']['name'] == 'owner-2'
+    assert not dereferences
+    assert len(find_owner_calls(find_calls)) == owner_finds
+
+
+def test_cached_references_dereference_on_access(assigned_periodic_tasks, dereferences):
+    task = list(keep_stored_references(PeriodicTask.objects.order_by('name')))[1]
+
+    assert get_stored_value(task, 'assignee') == {'_id': assigned_periodic_tasks[1].pk, 'name': 'owner-1'}
+    assert not dereferences
+    assert task.assignee == assigned_periodic_tasks[1]
+    assert len(dereferences) == 1
+
+
+def save_enabled(task):
+    task.enabled = True
+    task.save()
+    assert PeriodicTask.objects.get(pk=task.pk).enabled
+
+
+def test_nodes_with_cached_references_save(periodic_tasks, assigned_periodic_tasks):
+    task = PeriodicTaskType.get_node(ResolveInfoStub(context={}), str(periodic_tasks[1].pk))
+
+    save_enabled(task)
+    assert PeriodicTask.objects.get(pk=task.pk).assignee == assigned_periodic_tasks[1]
+
+
+def test_connection_nodes_with_cached_references_save(periodic_tasks, assigned_periodic_tasks):
+    context = {}
+    query = '{ periodicTasks { edges { node { name task assignee { name } } } } }'
+    result = schema.execute(query, context_value=context)
+
+    assert not result.errors
+    task, _ = get_identity_map(context)[(PeriodicTask, periodic_tasks[2].pk)]
+    assert get_stored_value(task, 'assignee')['name'] == 'owner-2'
+    save_enabled(task)
+    assert PeriodicTask.objects.get(pk=task.pk).assignee == assigned_periodic_tasks[2]
+
+
+def test_stored_references_are_not_joined(owned_periodic_tasks, find_calls):
+    query = '{ aggregatedPeriodicTasks { edges { node { owner { name } createdBy { id } } } } }'
+    result = schema.execute(query, context_value={})
+
+    assert not result.errors
+    node = result.data['aggregatedPeriodicTasks']['edges'][0]['node']
+    assert node == {'owner': {'name': 'owner-0'}, 'createdBy': {'id': to_global_id('OwnerType', str(owned_periodic_tasks[0].pk))}}
+
+
+GENERIC_QUERY = '''
+{
+    %s {
+        edges { node {
+            subject { __typename ... on OwnerType { name } ... on TagType { label } }
+            related { ... on OwnerType { name } ... on TagType { label } }
+            schedule { ... on IntervalType { every } ... on CrontabType { minute } }
+        } }
+    }
+}
+'''
+
+
+@pytest.fixture
+def generic_periodic_tasks(periodic_tasks, tagged_periodic_tasks, owned_periodic_tasks):
+    for i, task in enumerate(periodic_tasks):
+        task.subject = owned_periodic_tasks[i % OWNER_COUNT] if i % 2 else tagged_periodic_tasks[i % 2]
+        task.related = [owned_periodic_tasks[0], tagged_periodic_tasks[i % 4]]
+        task.schedule = Interval(every=i) if i % 2 else Crontab(minute=str(i))
+        task.save()
+    return periodic_tasks
+
+
+@pytest.mark.parametrize('field_name', ['periodicTasks', 'rawPeriodicTasks'])
+def test_generic_fields_resolve_to_their_types(generic_periodic_tasks, find_calls, field_name):
+    result = schema.execute(GENERIC_QUERY % field_name, context_value={})
+
+    assert not result.errors, result.errors
+    nodes = [edge['node'] for edge in result.data[field_name]['edges']]
+    assert nodes[0] == {
+        'subject': {'__typename': 'TagType', 'label': 'tag-0'},
+        'related': [{'name': 'owner-0'}, {'label': 'tag-0'}],
+        'schedule': {'minute': '0'},
+    }
+    assert nodes[1] == {
+        'subject': {'__typename': 'OwnerType', 'name': 'owner-1'},
+        'related': [{'name': 'owner-0'}, {'label': 'tag-1'}],
+        'schedule': {'every': 1},
+    }
+
+    assert len(find_owner_calls(find_calls)) == 1
+    assert len(find_tag_calls(find_calls)) == 1
+
+
+def test_instrumented_loader_is_abstract():
+    with pytest.raises(TypeError, match='load_batch'):
+        InstrumentedLoader()
@@ -0,0 +1,145 @@
+import pytest
+
+from graphql_relay import to_global_id
+
+from .types import schema
+
+NODES_QUERY = '''
+query Nodes($ids: [ID!]!) {
+    nodes(ids: $ids) {
+        ... on PeriodicTaskType { name }
+        ... on OwnerType { email name }
+    }
+}
+'''
+
+
+class ResolveInfoStub(object):
+    """ The ResolveInfo attributes node lookups read outside of a field resolution """
+
+    def __init__(self, context):
+        self.context = context
+        self.return_type = None
+
+
+def find_lookups(find_calls, collection_name):
+    return [query for collection, query in find_calls if collection == collection_name and '_id' in query]
+
+
+def task_id(task):
+    return to_global_id('PeriodicTaskType', str(task.pk))
+
+
+def test_nodes_fetched_with_one_query_per_collection(periodic_tasks, owned_periodic_tasks, find_calls):
+    task_ids = [task_id(task) for task in periodic_tasks]
+    owner_ids = [to_global_id('OwnerType', str(owner.pk)) for owner in owned_periodic_tasks]
+
+    ids = [task_ids[4], owner_ids[2], task_ids[1], owner_ids[0], task_ids[7]]
+    result = schema.execute(NODES_QUERY, variable_values={'ids': ids}, context_value={})
+
+    assert not result.errors
+    assert result.data['nodes'] == [
+        {'name': 'task-04'}, {'name': 'owner-2', 'email': None},
+        {'name': 'task-01'}, {'name': 'owner-0', 'email': None}, {'name': 'task-07'},
+    ]
+
+    task_lookups = find_lookups(find_calls, 'periodic_task')
+    assert len(task_lookups) == 1
+    assert len(task_lookups[0]['_id']['$in']) == 3
+    assert len(find_lookups(find_calls, 'owner')) == 1
+
+
+def test_nodes_null_for_missing_ids(periodic_tasks):
+    missing_task = periodic_tasks[2]
+    missing_task.delete()
+    ids = [
+        task_id(periodic_tasks[0]),
+        task_id(missing_task),
+        to_global_id('PeriodicTaskType', 'invalid'),
+        to_global_id('UnknownType', str(periodic_tasks[1].pk)),
+        'not a global id',
+        task_id(periodic_tasks[0]),
+    ]
+
+    result = schema.execute(NODES_QUERY, variable_values={'ids': ids}, context_value={})
+
+    assert not result.errors
+    assert result.data['nodes'] == [{'name': 'task-00'}, None, None, None, None, {'name': 'task-00'}]
+
+
+def test_nodes_without_context(periodic_tasks, find_calls):
+    ids = [task_id(periodic_tasks[5]), task_id(periodic_tasks[3])]
+
+    result = schema.execute(NODES_QUERY, variable_values={'ids': ids})
+
+    assert not result.errors
+    assert result.data['nodes'] == [{'name': 'task-05'}, {'name': 'task-03'}]
+    assert len(find_lookups(find_calls, 'periodic_task')) == 1
+
+
+def test_node_lookups_coalesced_in_the_same_tick(periodic_tasks, find_calls):
+    result = schema.execute('''
+        query Nodes($first: ID!, $second: ID!, $ids: [ID!]!) {
+            first: node(id: $first) { ... on PeriodicTaskType { name } }
+            second: node(id: $second) { ... on PeriodicTaskType { name enabled } }
+            nodes(ids: $ids) { ... on PeriodicTaskType { name } }
+        }
+    ''', variable_values={
+        'first': task_id(periodic_tasks[0]),
+        'second': task_id(periodic_tasks[1]),
+        'ids': [task_id(periodic_tasks[2]), task_id(periodic_tasks[0])],
+    }, context_value={})
+
+    assert not result.errors
+    assert result.data == {
+        'first': {'name': 'task-00'},
+        'second': {'name': 'task-01', 'enabled': False},
+        'nodes': [{'name': 'task-02'}, {'name': 'task-00'}],
+    }
+
+    task_lookups = find_lookups(find_calls, 'periodic_task')
+    assert len(task_lookups) == 1
+    assert len(task_lookups[0]['_id']['$in']) == 3
+
+
+@pytest.mark.parametrize('context', [None, {}])
+def test_get_node_loads_whole_documents_for_other_types(periodic_tasks, owned_periodic_tasks, context):
+    task = periodic_tasks[4]
+    result = schema.execute(
+        'query TaskOwner($id: ID!) { taskOwner(taskId: $id) { name } }',
+        variable_values={'id': str(task.pk)}, context_value=context,
+    )
+
+    assert not result.errors, result.errors
+    assert result.data == {'taskOwner': {'name': 'owner-1'}}
+
+
+@pytest.mark.parametrize('type_name', ['PeriodicTaskType', 'AsyncPeriodicTaskType'])
+def test_get_node_returns_documents(periodic_tasks, type_name):
+    object_type = schema.get_type(type_name).graphene_type
+    info = ResolveInfoStub(context={})
+
+    assert object_type.get_node(info, str(periodic_tasks[3].pk)).name == 'task-03'
+    assert object_type.get_node(info, 'missing') is None
+    nodes = object_type.get_nodes(info, [str(periodic_tasks[1].pk), 'missing'])
+    assert [node and node.name for node in nodes] == ['task-01', None]
+
+
+def test_get_node_in_custom_resolvers(periodic_tasks):
+    result = schema.execute(
+        'query TaskName($id: ID!) { taskName(taskId: $id) }',
+        variable_values={'id': str(periodic_tasks[2].pk)}, context_value={},
+    )
+
+    assert not result.errors, result.errors
+    assert result.data == {'taskName': 'task-02'}
+
+
+def test_relay_node_field(periodic_tasks):
+    result = schema.execute(
+        'query Node($id: ID!) { relayNode(id: $id) { ... on PeriodicTaskType { name } } }',
+        variable_values={'id': task_id(periodic_tasks[6])}, context_value={},
+    )
+
+    assert not result.errors, result.errors
+    assert result.data == {'relayNode': {'name': 'task-06'}}
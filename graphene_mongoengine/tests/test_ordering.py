@@ -0,0 +1,139 @@
+import pytest
+
+from mongoengine import Document, IntField, StringField
+
+from ..ordering import get_ordering, get_sortable_fields
+from ..registry import Registry
+from ..types import MongoEngineObjectType
+from .models import PeriodicTask
+from .types import schema
+
+ORDERED_QUERY = '''
+query Ordered($orderBy: [%s!], $first: Int, $after: String) {
+    %s(orderBy: $orderBy, first: $first, after: $after) {
+        pageInfo { endCursor hasNextPage }
+        edges { node { name totalRunCount } }
+    }
+}
+'''
+
+
+def execute_ordered(order_by, field_name='orderedPeriodicTasks', enum_name='PeriodicTaskTypeOrderBy', **variables):
+    result = schema.execute(ORDERED_QUERY % (enum_name, field_name), variable_values=dict(variables, orderBy=order_by))
+    return result
+
+
+def get_names(result, field_name='orderedPeriodicTasks'):
+    assert not result.errors, result.errors
+    return [edge['node']['name'] for edge in result.data[field_name]['edges']]
+
+
+def sorted_names(periodic_tasks, key, reverse=False):
+    return [task.name for task in sorted(periodic_tasks, key=key, reverse=reverse)]
+
+
+def test_order_by_single_field(periodic_tasks):
+    assert get_names(execute_ordered(['NAME_DESC'])) == sorted_names(periodic_tasks, lambda task: task.name, True)
+
+
+def test_order_by_breaks_ties_with_the_primary_key(periodic_tasks):
+    names = get_names(execute_ordered(['TOTAL_RUN_COUNT_ASC']))
+
+    assert names == sorted_names(periodic_tasks, lambda task: (task.total_run_count, task.pk))
+
+
+def test_order_by_several_fields(periodic_tasks):
+    names = get_names(execute_ordered(['TOTAL_RUN_COUNT_DESC', 'NAME_ASC']))
+
+    assert names == sorted_names(periodic_tasks, lambda task: (-task.total_run_count, task.name))
+
+
+def test_ordering_tie_breaker():
+    assert get_ordering(PeriodicTask, ['-total_run_count']) == (('total_run_count', -1), ('pk', -1))
+    assert get_ordering(PeriodicTask, ['+name', '-total_run_count']) == (('name', 1),)
+    assert get_ordering(PeriodicTask, ['+enabled', '+name']) == (('enabled', 1), ('name', 1))
+    assert get_ordering(PeriodicTask, ['-pk', '+name', '-pk']) == (('pk', -1),)
+
+
+def test_offset_cursors_stable_under_order(periodic_tasks):
+    expected = sorted_names(periodic_tasks, lambda task: (task.total_run_count, task.pk))
+
+    names, after = [], None
+    while True:
+        result = execute_ordered(['TOTAL_RUN_COUNT_ASC'], first=3, after=after)
+        names += get_names(result)
+        page_info = result.data['orderedPeriodicTasks']['pageInfo']
+        if not page_info['hasNextPage']:
+            break
+        after = page_info['endCursor']
+
+    assert names == expected
+
+
+def test_keyset_cursors_follow_order(periodic_tasks):
+    field_name = 'keysetOrderedPeriodicTasks'
+    expected = sorted_names(periodic_tasks, lambda task: (-task.total_run_count, task.name))
+
+    names, after = [], None
+    while True:
+        result = execute_ordered(['TOTAL_RUN_COUNT_DESC', 'NAME_ASC'], field_name, first=4, after=after)
+        names += get_names(result, field_name)
+        page_info = result.data[field_name]['pageInfo']
+        if not page_info['hasNextPage']:
+            break
+        after = page_info['endCursor']
+
+    assert names == expected
+
+
+def test_keyset_cursors_rejected_under_another_order(periodic_tasks):
+    field_name = 'keysetOrderedPeriodicTasks'
+    cursor = execute_ordered(['NAME_DESC'], field_name, first=2).data[field_name]['pageInfo']['endCursor']
+
+    # The cursor is ignored instead of being read as a position in another order
+    result = execute_ordered(['NAME_ASC'], field_name, first=2, after=cursor)
+
+    assert get_names(result, field_name) == ['task-00', 'task-01']
+
+
+def test_strict_order_accepts_index_prefixes(periodic_tasks):
+    strict = {'field_name': 'strictOrderedPeriodicTasks', 'enum_name': 'PeriodicTaskTypeIndexedOrderBy'}
+
+    names = get_names(execute_ordered(['TOTAL_RUN_COUNT_ASC'], **strict), strict['field_name'])
+    assert names == sorted_names(periodic_tasks, lambda task: (task.total_run_count, task.pk))
+
+    names = get_names(execute_ordered(['NAME_DESC'], **strict), strict['field_name'])
+    assert names == sorted_names(periodic_tasks, lambda task: task.name, True)
+
+
+def test_strict_order_rejects_sorts_without_index(periodic_tasks):
+    strict = {'field_name': 'strictOrderedPeriodicTasks', 'enum_name': 'PeriodicTaskTypeIndexedOrderBy'}
+
+    result = execute_ordered(['TOTAL_RUN_COUNT_ASC', 'NAME_ASC'], **strict)
+
+    assert result.errors
+    assert 'not covered by an index' in str(result.errors[0])
+
+
+class IndexedTask(Document):
+
+    meta = {'collection': 'indexed_task', 'indexes': ['queue', ('priority', 'id'), ('-deadline', '-id')]}
+
+    name = StringField(unique=True)
+    queue = StringField()
+    priority = IntField()
+    deadline = IntField()
+    label = StringField()
+
+
+def test_strict_order_offers_fields_served_with_the_tie_breaker():
+    class IndexedTaskType(MongoEngineObjectType):
+        class Meta:
+            document = IndexedTask
+            registry = Registry()
+
+    # queue has a single field, non-unique index, which can not serve the (queue, _id) sort
+    assert get_sortable_fields(IndexedTaskType, indexed_only=True) == ['pk', 'name', 'priority', 'deadline']
+    assert 'queue' in get_sortable_fields(IndexedTaskType)
+    with pytest.raises(Exception, match='not covered by an index'):
+        get_ordering(IndexedTask, ['+queue'], strict=True)
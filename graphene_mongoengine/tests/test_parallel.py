@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from graphql_relay import to_global_id
+from mongomock.collection import Collection
+
+from ..parallel import ParallelExecutor, get_parallel_executor
+from .types import schema
+
+LATENCY = 0.05
+
+DASHBOARD_QUERY = '''
+{
+    periodicTasks(first: 2) { totalCount edges { node { name owner { name } } } }
+    lazyPeriodicTasks(first: 2) { totalCount edges { node { name } } }
+    keysetPeriodicTasks(first: 2) { edges { node { name } } }
+    aggregatedPeriodicTasks(first: 2) { edges { node { name owner { name } } } }
+}
+'''
+
+
+@pytest.fixture(scope='module')
+def executor():
+    executor = ParallelExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def slow_queries(monkeypatch):
+    """ Adds LATENCY to the collection reads, recording the threads they ran
+    on and how many ran at once
+    """
+    lock = threading.Lock()
+    state = {'running': 0, 'max_running': 0, 'threads': set()}
+
+    def slow(method):
+        def slowed(*args, **kwargs):
+            with lock:
+                state['running'] += 1
+                state['max_running'] = max(state['max_running'], state['running'])
+                state['threads'].add(threading.current_thread().name)
+            try:
+                time.sleep(LATENCY)
+                return method(*args, **kwargs)
+            finally:
+                with lock:
+                    state['running'] -= 1
+        return slowed
+
+    for name in ('find', 'aggregate', 'count_documents'):
+        monkeypatch.setattr(Collection, name, slow(getattr(Collection, name)))
+
+    return state
+
+
+def execute(query, executor=None, **variables):
+    result = schema.execute(query, variable_values=variables, context_value={}, executor=executor)
+    assert not result.errors, result.errors
+    return result.data
+
+
+def test_parallel_execution_matches_sync_execution(owned_periodic_tasks, executor):
+    expected = execute(DASHBOARD_QUERY)
+
+    assert execute(DASHBOARD_QUERY, executor) == expected
+    assert get_parallel_executor() is None
+
+
+def test_sibling_connections_run_in_parallel(owned_periodic_tasks, executor, slow_queries):
+    started = time.monotonic()
+    execute(DASHBOARD_QUERY, executor)
+    elapsed = time.monotonic() - started
+
+    assert slow_queries['max_running'] > 1
+    assert all(name.startswith('graphene-mongoengine') for name in slow_queries['threads'])
+
+    started = time.monotonic()
+    execute(DASHBOARD_QUERY)
+    assert elapsed < time.monotonic() - started
+
+
+def test_parallel_opt_out(periodic_tasks, executor, slow_queries):
+    execute('{ limitedPeriodicTasks { edges { node { name } } } }', executor)
+    assert slow_queries['threads'] and all(name.startswith('graphene-mongoengine') for name in slow_queries['threads'])
+
+    slow_queries['threads'].clear()
+    execute('{ serialPeriodicTasks(first: 2) { edges { node { name } } } }', executor)
+    assert slow_queries['threads'] == {threading.current_thread().name}
+
+
+def test_parallel_node_lookups(periodic_tasks, executor):
+    ids = [to_global_id('PeriodicTaskType', str(task.pk)) for task in periodic_tasks[2:5]]
+    query = '''
+    query Nodes($ids: [ID!]!, $id: ID!) {
+        nodes(ids: $ids) { ... on PeriodicTaskType { name } }
+        node(id: $id) { ... on PeriodicTaskType { name } }
+    }
+    '''
+
+    data = execute(query, executor, ids=ids, id=ids[0])
+
+    assert data == {'nodes': [{'name': 'task-02'}, {'name': 'task-03'}, {'name': 'task-04'}], 'node': {'name': 'task-02'}}
+
+
+def test_parallel_errors_are_reported(periodic_tasks, executor, monkeypatch):
+    def failing_count(*args, **kwargs):
+        raise RuntimeError('count failed')
+
+    monkeypatch.setattr(Collection, 'count_documents', failing_count)
+
+    result = schema.execute('{ periodicTasks(first: 1) { totalCount } }', context_value={}, executor=executor)
+
+    assert [error.message for error in result.errors] == ['count failed']
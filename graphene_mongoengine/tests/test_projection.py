@@ -0,0 +1,104 @@
+from graphene import ObjectType, Schema, String
+from graphene.relay import Node
+
+from ..fields import MongoEngineConnectionField
+from ..types import MongoEngineObjectType
+from .models import Interval, PeriodicTask
+from .types import schema
+
+
+class DescribedPeriodicTaskType(MongoEngineObjectType):
+
+    class Meta:
+        document = PeriodicTask
+        interfaces = (Node,)
+        skip_registry = True
+
+    summary = String()
+
+    def resolve_summary(self, info):
+        return f'{self.name}: {self.description}'
+
+
+class UnprojectedPeriodicTaskType(MongoEngineObjectType):
+
+    class Meta:
+        document = PeriodicTask
+        interfaces = (Node,)
+        skip_registry = True
+        projection = False
+
+
+class Query(ObjectType):
+
+    described_periodic_tasks = MongoEngineConnectionField(DescribedPeriodicTaskType)
+    unprojected_periodic_tasks = MongoEngineConnectionField(UnprojectedPeriodicTaskType)
+
+
+custom_schema = Schema(query=Query, types=[DescribedPeriodicTaskType, UnprojectedPeriodicTaskType])
+
+
+def execute(query, executed_schema=schema):
+    result = executed_schema.execute(query)
+    assert not result.errors
+    return result.data
+
+
+def get_fetched_fields(fetched_documents):
+    return {field for son in fetched_documents for field in son}
+
+
+def test_connection_fetches_selected_fields(periodic_tasks, fetched_documents):
+    data = execute('{ periodicTasks(first: 2) { edges { node { name enabled } } } }')
+
+    assert data['periodicTasks']['edges'][0]['node'] == {'name': 'task-00', 'enabled': False}
+    assert get_fetched_fields(fetched_documents) == {'_id', 'name', 'enabled'}
+
+
+def test_connection_fetches_selected_embedded_fields(periodic_tasks, fetched_documents):
+    periodic_tasks[0].update(interval=Interval(every=5, period='minutes'), kwargs={'payload': 'x' * 100})
+
+    data = execute('{ periodicTasks(first: 1) { edges { node { name interval { every } } } } }')
+
+    assert data['periodicTasks']['edges'][0]['node'] == {'name': 'task-00', 'interval': {'every': 5}}
+    assert get_fetched_fields(fetched_documents) == {'_id', 'name', 'interval'}
+    assert fetched_documents[0]['interval'] == {'every': 5}
+
+
+def test_connection_projection_expands_fragments(periodic_tasks, fetched_documents):
+    execute('''
+        { periodicTasks(first: 1) { edges { node { ...TaskFields ... on PeriodicTaskType { task } } } } }
+        fragment TaskFields on PeriodicTaskType { name }
+    ''')
+
+    assert get_fetched_fields(fetched_documents) == {'_id', 'name', 'task'}
+
+
+def test_keyset_connection_fetches_keyset_fields(periodic_tasks, fetched_documents):
+    execute('{ keysetRunCountPeriodicTasks(first: 1) { edges { cursor node { name } } } }')
+
+    assert get_fetched_fields(fetched_documents) == {'_id', 'name', 'total_run_count'}
+
+
+def test_get_node_fetches_selected_fields(periodic_tasks, fetched_documents):
+    edges = execute('{ periodicTasks(first: 1) { edges { node { id } } } }')['periodicTasks']['edges']
+    global_id = edges[0]['node']['id']
+    del fetched_documents[:]
+
+    data = execute('{ node(id: "%s") { id ... on PeriodicTaskType { name } } }' % global_id)
+
+    assert data['node'] == {'id': global_id, 'name': 'task-00'}
+    assert get_fetched_fields(fetched_documents) == {'_id', 'name'}
+
+
+def test_custom_fields_disable_projection(periodic_tasks, fetched_documents):
+    data = execute('{ describedPeriodicTasks(first: 1) { edges { node { summary } } } }', custom_schema)
+
+    assert data['describedPeriodicTasks']['edges'][0]['node']['summary'] == 'task-00: None'
+    assert 'task' in get_fetched_fields(fetched_documents)
+
+
+def test_projection_can_be_disabled(periodic_tasks, fetched_documents):
+    execute('{ unprojectedPeriodicTasks(first: 1) { edges { node { name } } } }', custom_schema)
+
+    assert 'task' in get_fetched_fields(fetched_documents)
@@ -0,0 +1,114 @@
+from graphql_relay import from_global_id, to_global_id
+
+from .models import Interval, PeriodicTask
+from .types import PeriodicTaskType, RawPeriodicTaskType, schema
+
+TASKS_QUERY = '''
+{
+    %s(first: 4) {
+        edges { node {
+            name task enabled totalRunCount maxRunCount kwargs
+            interval { every period }
+            owner { name }
+            tags { label }
+        } }
+    }
+}
+'''
+
+
+def get_nodes(field_name):
+    result = schema.execute(TASKS_QUERY % field_name, context_value={})
+    assert not result.errors, result.errors
+    return [edge['node'] for edge in result.data[field_name]['edges']]
+
+
+def test_raw_nodes_match_document_nodes(tagged_periodic_tasks, periodic_tasks):
+    periodic_tasks[1].update(interval=Interval(every=5, period='days'), kwargs={'retries': 3})
+
+    assert get_nodes('rawPeriodicTasks') == get_nodes('periodicTasks')
+
+
+def test_raw_nodes_skip_document_instantiation(periodic_tasks, fetched_documents):
+    nodes = get_nodes('rawPeriodicTasks')
+
+    assert [node['name'] for node in nodes] == ['task-00', 'task-01', 'task-02', 'task-03']
+    assert not fetched_documents
+
+
+def test_raw_nodes_defaults_for_missing_fields(periodic_tasks):
+    PeriodicTask._get_collection().update_many({}, {'$unset': {'enabled': '', 'total_run_count': ''}})
+
+    nodes = get_nodes('rawPeriodicTasks')
+
+    assert nodes[0]['enabled'] is False
+    assert nodes[0]['totalRunCount'] == 0
+
+
+def test_raw_global_ids(periodic_tasks):
+    result = schema.execute('{ rawPeriodicTasks(first: 1) { edges { node { id } } } }')
+
+    assert not result.errors
+    global_id = result.data['rawPeriodicTasks']['edges'][0]['node']['id']
+    assert from_global_id(global_id) == ('RawPeriodicTaskType', str(periodic_tasks[0].pk))
+
+
+def test_raw_node_lookup(periodic_tasks, fetched_documents):
+    task_id = to_global_id('RawPeriodicTaskType', str(periodic_tasks[2].pk))
+
+    result = schema.execute(
+        'query Node($id: ID!) { node(id: $id) { ... on RawPeriodicTaskType { name totalRunCount } } }',
+        variable_values={'id': task_id}, context_value={},
+    )
+
+    assert not result.errors
+    assert result.data['node'] == {'name': 'task-02', 'totalRunCount': 2}
+    assert not fetched_documents
+
+
+def test_raw_keyset_pages(periodic_tasks):
+    query = '''query Page($after: String) {
+        keysetRawPeriodicTasks(first: 4, after: $after) {
+            pageInfo { endCursor }
+            edges { node { name } }
+        }
+    }'''
+    first_page = schema.execute(query).data['keysetRawPeriodicTasks']
+    second_page = schema.execute(query, variable_values={'after': first_page['pageInfo']['endCursor']})
+
+    names = [edge['node']['name'] for edge in second_page.data['keysetRawPeriodicTasks']['edges']]
+    expected = [
+        task.name for task in sorted(periodic_tasks, key=lambda task: (task.total_run_count, task.pk), reverse=True)
+    ]
+    assert names == expected[4:8]
+
+
+def test_raw_filters(periodic_tasks):
+    result = schema.execute('{ rawPeriodicTasks(totalRunCount: 3) { edges { node { name } } } }')
+
+    assert not result.errors
+    assert [edge['node']['name'] for edge in result.data['rawPeriodicTasks']['edges']] == ['task-03', 'task-07']
+
+
+class ResolveInfoStub(object):
+
+    def __init__(self, return_type):
+        self.return_type = return_type
+
+
+def test_raw_documents_type_check():
+    assert RawPeriodicTaskType.is_type_of({'name': 'task'}, ResolveInfoStub(schema.get_type('RawPeriodicTaskType')))
+    assert not RawPeriodicTaskType.is_type_of({'name': 'task'}, None)
+    assert RawPeriodicTaskType.is_type_of({'_cls': 'PeriodicTask'}, None)
+    assert not RawPeriodicTaskType.is_type_of({'_cls': 'Owner'}, None)
+    assert PeriodicTaskType.is_type_of(PeriodicTask(name='task'), None)
+
+
+def test_raw_documents_without_class_are_not_union_members():
+    union = schema.get_type('PeriodicTaskType').fields['subject'].type
+    info = ResolveInfoStub(union)
+
+    assert not [member for member in union.types if member.graphene_type.is_type_of({'name': 'owner-0'}, info)]
+    assert [
+        member.name for member in union.types if member.graphene_type.is_type_of({'_cls': 'Owner'}, info)
+    ] == ['OwnerType']
@@ -0,0 +1,156 @@
+import gc
+import json
+import weakref
+
+import pytest
+
+from graphene.relay import Node
+from graphql_relay import to_global_id
+from mongoengine import Document, EmbeddedDocumentField, IntField, ListField, QuerySet, StringField
+
+from ..registry import Registry
+from ..streaming import iter_documents, iter_ndjson, iter_raw_nodes
+from ..types import MongoEngineObjectType
+from .models import Interval, PeriodicTask
+from .types import PeriodicTaskType, schema
+
+CONNECTION_QUERY = '''
+query Tasks($first: Int, $last: Int, $after: String, $before: String) {
+    %s(first: $first, last: $last, after: $after, before: $before) {
+        totalCount
+        edges { cursor node { name owner { name } } }
+        pageInfo { startCursor endCursor hasPreviousPage hasNextPage }
+    }
+}
+'''
+
+
+def get_connection(field_name, **variables):
+    result = schema.execute(CONNECTION_QUERY % field_name, variable_values=variables, context_value={})
+    assert not result.errors, result.errors
+    return result.data[field_name]
+
+
+@pytest.mark.parametrize('variables', [
+    {},
+    {'first': 3},
+    {'first': 0},
+    {'first': 20},
+    {'first': 3, 'after': 'YXJyYXljb25uZWN0aW9uOjM='},
+    {'first': 3, 'after': 'YXJyYXljb25uZWN0aW9uOjg='},
+    {'last': 2},
+    {'first': 5, 'before': 'YXJyYXljb25uZWN0aW9uOjM='},
+    {'last': 2, 'before': 'YXJyYXljb25uZWN0aW9uOjU='},
+])
+def test_streamed_connection_matches_offset_connection(owned_periodic_tasks, variables):
+    expected = get_connection('periodicTasks', **variables)
+
+    assert get_connection('streamedPeriodicTasks', **variables) == expected
+    assert get_connection('streamedAggregatedPeriodicTasks', **variables) == expected
+
+
+def test_streamed_connection_fetches_in_batches(periodic_tasks, monkeypatch):
+    batch_sizes = []
+    batch_size = QuerySet.batch_size
+
+    def recording_batch_size(queryset, size):
+        batch_sizes.append(size)
+        return batch_size(queryset, size)
+
+    monkeypatch.setattr(QuerySet, 'batch_size', recording_batch_size)
+
+    connection = get_connection('streamedPeriodicTasks', first=5)
+
+    assert len(connection['edges']) == 5
+    assert batch_sizes and set(batch_sizes) == {3}
+
+
+def test_iter_documents_does_not_keep_documents(periodic_tasks):
+    queryset = PeriodicTask.objects.order_by('name')
+    references = []
+
+    for task in iter_documents(queryset, batch_size=2):
+        references.append(weakref.ref(task))
+        del task
+        gc.collect()
+        assert all(reference() is None for reference in references[:-1])
+
+    assert len(references) == 10
+    assert not queryset._result_cache
+
+
+def test_iter_raw_nodes_projects_type_fields(periodic_tasks):
+    nodes = list(iter_raw_nodes(PeriodicTaskType, PeriodicTask.objects.order_by('name')))
+
+    assert [node['name'] for node in nodes] == [task.name for task in periodic_tasks]
+    assert all(isinstance(node, dict) for node in nodes)
+
+
+def test_iter_ndjson(periodic_tasks):
+    lines = list(iter_ndjson(PeriodicTaskType, PeriodicTask.objects(total_run_count=1).order_by('name')))
+
+    assert all(line.endswith('\n') for line in lines)
+    documents = [json.loads(line) for line in lines]
+    assert [document['name'] for document in documents] == ['task-01', 'task-05', 'task-09']
+    assert documents[0]['id'] == to_global_id('PeriodicTaskType', str(periodic_tasks[1].pk))
+    assert documents[0]['totalRunCount'] == 1
+    assert '_id' not in documents[0]
+
+
+class ExportedTask(Document):
+
+    meta = {'collection': 'exported_task'}
+
+    title = StringField(db_field='t')
+    run_count = IntField(db_field='rc', default=0)
+    interval = EmbeddedDocumentField(Interval, db_field='i')
+    intervals = ListField(EmbeddedDocumentField(Interval), db_field='is')
+
+
+def create_exported_task_type():
+    export_registry = Registry()
+
+    class ExportedIntervalType(MongoEngineObjectType):
+        class Meta:
+            document = Interval
+            registry = export_registry
+
+    class ExportedTaskType(MongoEngineObjectType):
+        class Meta:
+            document = ExportedTask
+            registry = export_registry
+            interfaces = (Node,)
+            exclude_fields = ('run_count',)
+
+    return ExportedTaskType
+
+
+@pytest.fixture
+def exported_task():
+    ExportedTask.drop_collection()
+    yield ExportedTask(
+        title='export', run_count=3, interval=Interval(every=5, period='minutes'),
+        intervals=[Interval(every=1, period='days')],
+    ).save()
+    ExportedTask.drop_collection()
+
+
+def test_iter_ndjson_keys_by_graphql_field_names(exported_task):
+    exported_task_type = create_exported_task_type()
+
+    raw_node, = iter_raw_nodes(exported_task_type)
+    line, = iter_ndjson(exported_task_type)
+
+    assert set(raw_node) == {'_id', 't', 'i', 'is'}
+    assert json.loads(line) == {
+        'id': to_global_id('ExportedTaskType', str(exported_task.pk)),
+        'title': 'export',
+        'interval': {'every': 5, 'period': 'minutes'},
+        'intervals': [{'every': 1, 'period': 'days'}],
+    }
+
+
+def test_iter_ndjson_without_auto_camelcase(periodic_tasks):
+    line = next(iter_ndjson(PeriodicTaskType, PeriodicTask.objects.order_by('name'), auto_camelcase=False))
+
+    assert json.loads(line)['total_run_count'] == 0
@@ -0,0 +1,72 @@
+from graphene import Field, ObjectType, Schema
+from graphene.relay import Node
+
+from ..fields import MongoEngineConnectionField
+from ..registry import Registry
+from ..types import MongoEngineObjectType
+from .models import Crontab, Interval, PeriodicTask
+from .types import PeriodicTaskType
+
+
+def create_lazy_types():
+    lazy_registry = Registry(lazy=True)
+
+    class LazyIntervalType(MongoEngineObjectType):
+        class Meta:
+            document = Interval
+            registry = lazy_registry
+
+    class LazyCrontabType(MongoEngineObjectType):
+        class Meta:
+            document = Crontab
+            registry = lazy_registry
+
+    class LazyPeriodicTaskType(MongoEngineObjectType):
+        class Meta:
+            document = PeriodicTask
+            registry = lazy_registry
+            interfaces = (Node,)
+
+    return LazyPeriodicTaskType, LazyIntervalType, LazyCrontabType
+
+
+def test_lazy_types_defer_conversion():
+    task_type, interval_type, _ = create_lazy_types()
+
+    assert not task_type._meta.fields.loaded
+    assert not interval_type._meta.fields.loaded
+    assert task_type._meta._connection is None
+
+
+def test_lazy_types_convert_on_schema_build(periodic_tasks):
+    task_type, interval_type, crontab_type = create_lazy_types()
+
+    class Query(ObjectType):
+        periodic_tasks = MongoEngineConnectionField(task_type)
+
+    schema = Schema(query=Query)
+
+    assert task_type._meta.fields.loaded
+    assert interval_type._meta.fields.loaded
+    assert crontab_type._meta.fields.loaded
+    assert list(task_type._meta.fields) == list(PeriodicTaskType._meta.fields)
+    assert type(task_type._meta.fields['id']) is type(PeriodicTaskType._meta.fields['id'])
+    assert task_type._meta.connection is task_type._meta.connection
+
+    result = schema.execute('{ periodicTasks(first: 1) { edges { node { id name interval { every } } } } }')
+
+    assert not result.errors
+    assert result.data['periodicTasks']['edges'][0]['node']['name'] == 'task-00'
+
+
+def test_unreachable_lazy_types_are_not_converted():
+    task_type, interval_type, _ = create_lazy_types()
+
+    class Query(ObjectType):
+        interval = Field(interval_type)
+
+    Schema(query=Query)
+
+    assert interval_type._meta.fields.loaded
+    assert not task_type._meta.fields.loaded
+    assert task_type._meta._connection is None
@@ -0,0 +1,158 @@
+from graphene import Field, ID, ObjectType, Schema, String
+from graphene.relay import Node
+
+from ..asynchronous import LocalAsyncDatabase, MotorBackend
+from ..cache import ResultCache
+from ..fields import MongoEngineConnectionField
+from ..nodes import NodeField, NodesField
+from ..types import MongoEngineObjectType
+from .models import Crontab, Interval, Owner, PeriodicTask, Place, Tag
+
+
+class CrontabType(MongoEngineObjectType):
+
+    class Meta:
+        document = Crontab
+
+
+class IntervalType(MongoEngineObjectType):
+
+    class Meta:
+        document = Interval
+
+
+class OwnerType(MongoEngineObjectType):
+
+    class Meta:
+        document = Owner
+        interfaces = (Node,)
+
+
+class TagType(MongoEngineObjectType):
+
+    class Meta:
+        document = Tag
+
+
+class PeriodicTaskType(MongoEngineObjectType):
+
+    class Meta:
+        document = PeriodicTask
+        interfaces = (Node,)
+
+
+class RawPeriodicTaskType(MongoEngineObjectType):
+
+    class Meta:
+        document = PeriodicTask
+        interfaces = (Node,)
+        as_pymongo = True
+        skip_registry = True
+
+
+class PlaceType(MongoEngineObjectType):
+
+    class Meta:
+        document = Place
+        interfaces = (Node,)
+
+
+class RawPlaceType(MongoEngineObjectType):
+
+    class Meta:
+        document = Place
+        interfaces = (Node,)
+        as_pymongo = True
+        skip_registry = True
+
+
+result_cache = ResultCache()
+
+
+class CachedPeriodicTaskType(MongoEngineObjectType):
+
+    class Meta:
+        document = PeriodicTask
+        interfaces = (Node,)
+        cache = result_cache
+        skip_registry = True
+
+
+async_database = LocalAsyncDatabase(latency=0.01)
+async_backend = MotorBackend(async_database)
+
+
+class AsyncPeriodicTaskType(MongoEngineObjectType):
+
+    class Meta:
+        document = PeriodicTask
+        interfaces = (Node,)
+        async_backend = async_backend
+        skip_registry = True
+
+
+class Query(ObjectType):
+
+    node = NodeField()
+    relay_node = Node.Field()
+    nodes = NodesField()
+    periodic_tasks = MongoEngineConnectionField(PeriodicTaskType)
+    unsliced_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, slice_pushdown=False)
+    keyset_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, keyset='pk')
+    keyset_run_count_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, keyset='-total_run_count')
+    lazy_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, lazy_count=True)
+    estimated_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, lazy_count=True, estimated_count=True)
+    enabled_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, lazy_count=True, estimated_count=True)
+    filtered_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, filter_fields=True)
+    indexed_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, filter_fields=True, indexed_filters=True)
+    ordered_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, order_by_fields=True)
+    strict_ordered_periodic_tasks = MongoEngineConnectionField(
+        PeriodicTaskType, order_by_fields=True, strict_order=True
+    )
+    keyset_ordered_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, keyset=True, order_by_fields=True)
+    aggregated_periodic_tasks = MongoEngineConnectionField(
+        PeriodicTaskType, aggregate=True, filter_fields=True, order_by_fields=True
+    )
+    keyset_aggregated_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, keyset=True, aggregate=True)
+    raw_periodic_tasks = MongoEngineConnectionField(RawPeriodicTaskType, filter_fields=True)
+    keyset_raw_periodic_tasks = MongoEngineConnectionField(RawPeriodicTaskType, keyset='-total_run_count')
+    cached_periodic_tasks = MongoEngineConnectionField(
+        CachedPeriodicTaskType, lazy_count=True, filter_fields=True, cache=result_cache
+    )
+    keyset_cached_periodic_tasks = MongoEngineConnectionField(CachedPeriodicTaskType, keyset=True, cache=result_cache)
+    limited_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, max_limit=3, batch_size=2)
+    strict_limited_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, max_limit=3, strict_limit=True)
+    streamed_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, stream=True, batch_size=3)
+    streamed_aggregated_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, stream=True, aggregate=True)
+    serial_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, parallel=False)
+    async_periodic_tasks = MongoEngineConnectionField(AsyncPeriodicTaskType)
+    async_lazy_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, lazy_count=True, async_backend=async_backend)
+    async_keyset_periodic_tasks = MongoEngineConnectionField(PeriodicTaskType, keyset='pk', async_backend=async_backend)
+    async_aggregated_periodic_tasks = MongoEngineConnectionField(
+        PeriodicTaskType, aggregate=True, filter_fields=True, order_by_fields=True, async_backend=async_backend
+    )
+    async_raw_periodic_tasks = MongoEngineConnectionField(
+        RawPeriodicTaskType, filter_fields=True, async_backend=async_backend
+    )
+    async_cached_periodic_tasks = MongoEngineConnectionField(
+        CachedPeriodicTaskType, lazy_count=True, filter_fields=True, cache=result_cache, async_backend=async_backend
+    )
+    places = MongoEngineConnectionField(PlaceType, geo_field=True)
+    legacy_places = MongoEngineConnectionField(PlaceType, geo_field='position')
+    raw_places = MongoEngineConnectionField(RawPlaceType, geo_field='area')
+
+    task_owner = Field(OwnerType, task_id=ID(required=True))
+    task_name = Field(String, task_id=ID(required=True))
+
+    def resolve_enabled_periodic_tasks(self, info, **args):
+        return PeriodicTask.objects(enabled=True)
+
+    def resolve_task_owner(self, info, task_id):
+        return PeriodicTaskType.get_node(info, task_id).owner
+
+    def resolve_task_name(self, info, task_id):
+        task = PeriodicTaskType.get_node(info, task_id)
+        return task.name if task else None
+
+
+schema = Schema(query=Query)
@@ -1,19 +1,33 @@
+import inspect
+
 from collections import OrderedDict
+from collections.abc import MutableMapping
+from functools import partial
 
 from graphene import Field  # , annotate, ResolveInfo
 from graphene.relay import Connection, Node
 from graphene.types.objecttype import ObjectType, ObjectTypeOptions
 from graphene.types.utils import yank_fields_from_attrs
 
-from mongoengine import DoesNotExist
+from promise import Promise
+
+from .converter import convert_mongoengine_field_as
+
+from .fields import MongoEngineConnection
+
+from .identity import normalize_pk
+
+from .loaders import fetch_nodes, fetch_async_nodes, get_node_loader, get_async_node_loader
+
+from .projection import get_type_projection
 
-from .converter import convert_mongoengine_field
+from .resolvers import document_resolver, get_return_graphene_type, returns_object_type
 
 from .registry import Registry, get_global_registry
 
-from .utils import get_document_fields, is_mongoengine_document, get_query
+from .utils import RawDocument, get_document_fields, is_mongoengine_document, get_query
 
-# pylint: disable=W0622,C0103
+# pylint: disable=W0622,C0103,W0212
 
 def construct_fields(document, registry, only_fields, exclude_fields):
     
@@ -27,9 +41,8 @@ def construct_fields(document, registry, only_fields, exclude_fields):
         if is_not_in_only or is_excluded:
             continue
 
-        converted_field = convert_mongoengine_field(field, registry)
+        converted_field = convert_mongoengine_field_as(field, registry, _as=Field)
 
-        print(name)
         fields[name] = converted_field
 
     # # Get all the columns for the relationships on the model
@@ -48,11 +61,82 @@ def construct_fields(document, registry, only_fields, exclude_fields):
     return fields
 
 
+class LazyFields(MutableMapping):
+    """ Fields of a lazy :MongoEngineObjectType:, the document fields
+    are converted the first time the mapping is read
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._fields = None
+        self._updates = []
+
+    @property
+    def loaded(self):
+        """ Whether the document fields have been converted """
+        return self._fields is not None
+
+    def load(self):
+        """ Converts the document fields, if not done yet, and returns them """
+        if self._fields is None:
+            fields = self._factory()
+            for update in self._updates:
+                fields.update(update)
+            self._fields, self._factory, self._updates = fields, None, None
+        return self._fields
+
+    def update(self, *args, **kwargs):
+        """ Updates the fields, deferred until they are loaded """
+        if self._fields is None:
+            self._updates.append(OrderedDict(*args, **kwargs))
+        else:
+            self._fields.update(*args, **kwargs)
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, name):
+        return self.load()[name]
+
+    def __setitem__(self, name, value):
+        self.load()[name] = value
+
+    def __delitem__(self, name):
+        del self.load()[name]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._fields if self.loaded else "..."})'
+
+
 class MongoEngineObjectTypeOptions(ObjectTypeOptions):
     document = None  # type: Document
     registry = None  # type: Registry
-    connection = None  # type: Type[Connection]
+    connection_factory = None  # type: Callable[[], Type[Connection]]
     id = None  # type: str
+    projection = True  # type: bool
+    as_pymongo = False  # type: bool
+    cache = None  # type: Union[bool, ResultCache]
+    async_backend = None  # type: MotorBackend
+
+    _connection = None  # type: Type[Connection]
+
+    @property
+    def connection(self):
+        """ Connection type for the object type, created on first access for lazy types """
+        if self._connection is None and self.connection_factory is not None:
+            # Memoized on a frozen Options object
+            object.__setattr__(self, '_connection', self.connection_factory())
+        return self._connection
+
+    @connection.setter
+    def connection(self, value):
+        self._connection = value
 
 
 class MongoEngineObjectType(ObjectType):
@@ -60,7 +144,9 @@ class MongoEngineObjectType(ObjectType):
     @classmethod
     def __init_subclass_with_meta__(cls, document=None, registry=None, skip_registry=False,
                                     only_fields=(), exclude_fields=(), connection=None,
-                                    use_connection=None, interfaces=(), id=None, **options):
+                                    use_connection=None, interfaces=(), id=None, projection=True,
+                                    as_pymongo=False, cache=None, async_backend=None, default_resolver=None, lazy=None,
+                                    **options):
 
         assert is_mongoengine_document(document), (
             f"You need to pass a valid MongoEngine Document in {cls.__name__}.Meta, "
@@ -75,17 +161,32 @@ class MongoEngineObjectType(ObjectType):
             f'Registry, received "{registry}".'
         )
 
-        mongoengine_fields = yank_fields_from_attrs(
-            construct_fields(document, registry, only_fields, exclude_fields),
-            _as=Field,
-        )
+        if lazy is None:
+            lazy = registry.lazy
+
+        def convert_document_fields():
+            """ Converts the document fields to Graphene fields """
+            # Converted fields are shared between types, keep the document field order
+            return yank_fields_from_attrs(
+                construct_fields(document, registry, only_fields, exclude_fields),
+                _as=Field,
+                sort=False,
+            )
+
+        if lazy:
+            mongoengine_fields = LazyFields(convert_document_fields)
+        else:
+            mongoengine_fields = convert_document_fields()
 
         if use_connection is None and interfaces:
             use_connection = any((issubclass(interface, Node) for interface in interfaces))
 
+        connection_factory = None
         if use_connection and not connection:
             # We create the connection automatically
-            connection = Connection.create_type(f'{cls.__name__}Connection', node=cls)
+            connection_factory = partial(MongoEngineConnection.create_type, f'{cls.__name__}Connection', node=cls)
+            if not lazy:
+                connection = connection_factory()
 
         if connection is not None:
             assert issubclass(connection, Connection), (
@@ -97,11 +198,17 @@ class MongoEngineObjectType(ObjectType):
         _meta.registry = registry
         _meta.fields = mongoengine_fields
         _meta.connection = connection
+        _meta.connection_factory = connection_factory
         _meta.id = id or 'id'
+        _meta.projection = projection
+        _meta.as_pymongo = as_pymongo
+        _meta.cache = cache
+        _meta.async_backend = async_backend
 
         super(MongoEngineObjectType, cls).__init_subclass_with_meta__(
             _meta=_meta,
             interfaces=interfaces,
+            default_resolver=default_resolver or document_resolver,
             **options
         )
 
@@ -112,6 +219,15 @@ class MongoEngineObjectType(ObjectType):
     def is_type_of(cls, root, info):
         if isinstance(root, cls):
             return True
+        if isinstance(root, RawDocument):
+            return root.object_type is cls
+        if isinstance(root, dict):
+            # Raw documents fetched with as_pymongo, only inherited documents store their class
+            class_name = root.get('_cls')
+            if class_name is not None:
+                return class_name in cls._meta.document._subclasses
+            # Others can not tell the members of a union or interface apart
+            return info is not None and get_return_graphene_type(info) is cls
         if not is_mongoengine_document(root):
             raise Exception(f'Received incompatible instance "{root}".')
 
@@ -123,10 +239,68 @@ class MongoEngineObjectType(ObjectType):
         document = cls._meta.document
         return get_query(document, info.context)
 
+    @classmethod
+    def get_node_keys(cls, info, ids):
+        """ Returns the (primary key, projection) node keys for ids, and the valid ones
+        among them. Nodes are loaded with the selected fields only when the field
+        being resolved returns this type
+        """
+        document = cls._meta.document
+        projection = get_type_projection(info, cls) if returns_object_type(info, cls) else None
+        projection = frozenset(projection) if projection else None
+
+        keys = [(normalize_pk(document, id), projection) for id in ids]
+        return keys, [key for key in keys if key[0] is not None]
+
+    @classmethod
+    def get_nodes(cls, info, ids):
+        """ Returns the documents to wrap in Node for ids, in order and None
+        for the missing ones, fetched with a single $in query
+        """
+        keys, valid_keys = cls.get_node_keys(info, ids)
+        nodes = dict(zip(valid_keys, fetch_nodes(cls, info, valid_keys)))
+        return [nodes.get(key) for key in keys]
+
     @classmethod
     def get_node(cls, info, id):
-        """ Returns document to wrap in Node """
-        try:
-            return cls.get_query(info).get(id)
-        except DoesNotExist:
-            return None
\ No newline at end of file
+        """ Returns document to wrap in Node, see :get_nodes: """
+        return cls.get_nodes(info, [id])[0]
+
+    @classmethod
+    def load_nodes(cls, info, ids):
+        """ Returns a promise for the :get_nodes: result, the lookups made during
+        the same execution tick being fetched with a single $in query. Types with
+        an async backend return a coroutine instead, for the AsyncioExecutor
+        """
+        keys, valid_keys = cls.get_node_keys(info, ids)
+
+        def get_ordered_nodes(nodes):
+            nodes = dict(zip(valid_keys, nodes))
+            return [nodes.get(key) for key in keys]
+
+        backend = cls._meta.async_backend
+        if backend is not None:
+            async def get_async_nodes():
+                loader = get_async_node_loader(info, cls, backend)
+                if loader is None:
+                    return get_ordered_nodes(await fetch_async_nodes(cls, info, valid_keys, backend))
+                return get_ordered_nodes(await loader.load_many(valid_keys))
+
+            return get_async_nodes()
+
+        loader = get_node_loader(info, cls)
+        if loader is None:
+            return Promise.resolve(get_ordered_nodes(fetch_nodes(cls, info, valid_keys)))
+
+        return loader.load_many(valid_keys).then(get_ordered_nodes)
+
+    @classmethod
+    def load_node(cls, info, id):
+        """ Returns a promise (or a coroutine) for the :get_node: result, see :load_nodes: """
+        nodes = cls.load_nodes(info, [id])
+        if inspect.iscoroutine(nodes):
+            async def get_async_node():
+                return (await nodes)[0]
+
+            return get_async_node()
+        return nodes.then(lambda nodes: nodes[0])
@@ -81,4 +81,60 @@ def field_is_document_list(field):
     return False
 
 
+REQUEST_CACHE_KEY = '_graphene_mongoengine'
 
+
+def get_request_cache(context, name):
+    """ Returns a dict stored on the GraphQL context under name, so it lives
+    as long as the request does. Returns None when there is no context
+    the dict can be stored on
+    """
+    if context is None:
+        return None
+
+    if isinstance(context, dict):
+        request_cache = context.setdefault(REQUEST_CACHE_KEY, {})
+    else:
+        request_cache = getattr(context, REQUEST_CACHE_KEY, None)
+        if request_cache is None:
+            request_cache = {}
+            try:
+                setattr(context, REQUEST_CACHE_KEY, request_cache)
+            except AttributeError:
+                return None
+
+    return request_cache.setdefault(name, {})
+
+
+def field_is_generic_list(field):
+    """ Returns True if the field is a :ListField: subclass
+    whose inner field is a generic reference or embedded document field
+    """
+    generic_fields = (GenericEmbeddedDocumentField, GenericLazyReferenceField, GenericReferenceField)
+
+    if issubclass(field.__class__, (ListField)):
+        return isinstance(field.field, generic_fields)
+
+    return False
+
+
+def field_is_reference_list(field):
+    """ Returns True if the field is a :ListField: subclass
+    whose inner field is a reference field
+    """
+    reference_fields = (ReferenceField, CachedReferenceField, LazyReferenceField)
+
+    if issubclass(field.__class__, (ListField)):
+        return isinstance(field.field, reference_fields)
+
+    return False
+
+
+class RawDocument(dict):
+    """ A document fetched with as_pymongo for a MongoEngineObjectType, tagged
+    with it so abstract types (Node) resolve it to that object type
+    """
+
+    def __init__(self, object_type, son):
+        super(RawDocument, self).__init__(son)
+        self.object_type = object_type
@@ -48,10 +48,16 @@ setup(
         'singledispatch>=3.4.0.3',
         'iso8601'
     ],
+
+    extras_require={
+        'cache': ['blinker'],
+    },
     
     tests_require=[
         'pytest>=2.7.2',
         'mock',
-        'mongomock'
+        'mongomock',
+        'blinker',
+        'pytest-benchmark'
     ],
 )